@@ -1,30 +1,50 @@
-from flask import Flask, request, jsonify
+from flask import Flask, request, jsonify, Response, stream_with_context
 from flask_cors import CORS
 import os
+import json
 import logging
-from assistant import AIAssistant
+from assistant import AIAssistant, BACKGROUND_STARTUP
+from metrics import REGISTRY, instrument_flask  # ml_models/, put on sys.path by assistant
+from profiling import install_profiler
 
 # Configure logging
 logging.basicConfig(level=logging.INFO)
 logger = logging.getLogger(__name__)
 
 app = Flask(__name__)
-CORS(app, resources={r"/api/*": {"origins": "*"}}, supports_credentials=False)
+# The admin endpoints (/api/admin/profiling) are not opened to other origins
+CORS(app, resources={r"/api/(?!admin/).*": {"origins": "*"}}, supports_credentials=False)
 
 # Initialize AI Assistant
 try:
     csv_path = os.getenv('CSV_PATH', 'finalwebsite.csv')
-    assistant = AIAssistant(csv_path)
-    logger.info(f"AI Assistant initialized with CSV: {csv_path}")
+    assistant = AIAssistant(csv_path, background=BACKGROUND_STARTUP)
+    logger.info(f"AI Assistant {'starting' if BACKGROUND_STARTUP else 'initialized'} with CSV: {csv_path}")
 except Exception as e:
     logger.error(f"Failed to initialize AI Assistant: {str(e)}")
     assistant = None
 
+# Request counters, latency histograms and GET /api/metrics (Prometheus)
+instrument_flask(app)
+if assistant:
+    REGISTRY.add_collector(assistant.metric_samples)
+# Opt-in cProfile / slow-request stack sampling (PROFILE_* settings, toggled at /api/admin/profiling)
+install_profiler(app)
+
 @app.route("/health", methods=["GET"])
+@app.route("/health/live", methods=["GET"])
 def health():
-    """Health check endpoint"""
+    """Liveness: the process is up and answering (possibly with fallback responses)"""
     return jsonify({"status": "ok"})
 
+@app.route("/health/ready", methods=["GET"])
+def ready():
+    """Readiness: 200 once the dataset is loaded ("degraded" without a classifier), 503 before or if startup failed"""
+    if not assistant:
+        return jsonify({"ready": False, "error": "Assistant not initialized"}), 503
+    status = assistant.status()
+    return jsonify(status), 200 if status["ready"] else 503
+
 @app.route("/api/ai/chat", methods=["POST"])
 def chat():
     """AI chat endpoint"""
@@ -61,6 +81,53 @@ def chat():
             "debug": {"error": str(e)}
         }), 500
 
+def _sse(event, data):
+    """Format one Server-Sent Event"""
+    return f"event: {event}\ndata: {json.dumps(data, default=str)}\n\n"
+
+@app.route("/api/ai/chat/stream", methods=["POST"])
+def chat_stream():
+    """
+    Streaming AI chat endpoint (Server-Sent Events).
+    Emits `recommendations` first, then `token` events as the answer is
+    generated, and finally `done` (or `error`).
+    """
+    if not assistant:
+        return jsonify({
+            "answer": "AI Assistant is not available. Please check the service configuration.",
+            "recommendations": [],
+            "debug": {"error": "Assistant not initialized"}
+        }), 500
+
+    data = request.get_json(silent=True)
+    if not data or "message" not in data:
+        return jsonify({
+            "answer": "Please provide a message in the request.",
+            "recommendations": [],
+            "debug": {"error": "Missing message field"}
+        }), 400
+
+    user_message = data["message"]
+    product_context = data.get("product_context")
+    logger.info(f"Received streaming chat message: {user_message[:100]}...")
+
+    def generate():
+        for event, payload in assistant.chat_stream(user_message, product_context):
+            yield _sse(event, payload)
+
+    return Response(
+        stream_with_context(generate()),
+        mimetype="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
+@app.route("/api/ai/cache/stats", methods=["GET"])
+def cache_stats():
+    """Response cache size and hit/miss counters"""
+    if not assistant:
+        return jsonify({"error": "Assistant not initialized"}), 500
+    return jsonify(assistant.response_cache.stats())
+
 if __name__ == "__main__":
     port = int(os.getenv('PORT', 5002))
     app.run(debug=True, host="0.0.0.0", port=port)
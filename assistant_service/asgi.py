@@ -0,0 +1,445 @@
+"""
+Asyncio (ASGI) serving mode for the AI assistant.
+
+    uvicorn asgi:app --host 0.0.0.0 --port 5002
+    ASSISTANT_SERVER=asgi gunicorn -c gunicorn.conf.py   (several processes)
+
+Serves the same endpoints and payloads as app.py, but every chat is a coroutine
+sharing one pooled AsyncGroq connection, so a slow LLM call no longer pins a
+worker thread. Recommendations are computed in a thread while the LLM request
+is in flight. Concurrency is bounded: once MAX_CONCURRENT_CHATS calls are
+running and MAX_QUEUED_CHATS are waiting, new chats get a 503.
+"""
+import os
+import json
+import time
+import asyncio
+import logging
+
+from assistant import (
+    AIAssistant, BACKGROUND_STARTUP, load_groq_api_key, LLM_MODEL, LLM_TEMPERATURE, LLM_MAX_TOKENS
+)
+from fake_llm import FakeAsyncGroq
+from metrics import CONTENT_TYPE, REGISTRY, STAGE_SECONDS, observe_request, timed
+
+logger = logging.getLogger(__name__)
+
+# Upstream LLM calls running at once, and chats allowed to wait for a slot
+MAX_CONCURRENT_CHATS = int(os.getenv('MAX_CONCURRENT_CHATS', '100'))
+MAX_QUEUED_CHATS = int(os.getenv('MAX_QUEUED_CHATS', '400'))
+# Seconds a chat may take end to end (queueing + LLM call)
+CHAT_TIMEOUT = float(os.getenv('CHAT_TIMEOUT', '30'))
+# Keep-alive connections shared by all chats in this process
+GROQ_POOL_SIZE = int(os.getenv('GROQ_POOL_SIZE', '100'))
+
+CORS_HEADERS = [
+    (b"access-control-allow-origin", b"*"),
+]
+
+ERROR_ANSWER = "I'm sorry, I encountered an error processing your request. Please try again."
+TIMEOUT_ANSWER = "Sorry, the AI assistant took too long to respond. Please try again."
+BUSY_ANSWER = "The AI assistant is busy right now. Please try again in a moment."
+
+# Paths reported as-is in the request metrics (anything else is "unmatched")
+ROUTES = {"/health", "/health/live", "/health/ready", "/api/ai/chat", "/api/ai/chat/stream", "/api/ai/cache/stats", "/api/metrics"}
+
+
+class Overloaded(Exception):
+    """Raised when the chat queue is full"""
+
+
+def create_llm_client():
+    """AsyncGroq client with a pooled HTTP connection (FakeAsyncGroq when FAKE_LLM=1)"""
+    if os.getenv('FAKE_LLM') == '1':
+        return FakeAsyncGroq()
+
+    api_key = load_groq_api_key()
+    if not api_key:
+        logger.warning("GROQ_API_KEY not found. AI responses will be limited.")
+        return None
+
+    import httpx
+    from groq import AsyncGroq, DefaultAsyncHttpxClient
+
+    http_client = DefaultAsyncHttpxClient(
+        limits=httpx.Limits(max_connections=GROQ_POOL_SIZE, max_keepalive_connections=GROQ_POOL_SIZE)
+    )
+    return AsyncGroq(api_key=api_key, http_client=http_client, timeout=CHAT_TIMEOUT)
+
+
+class AsyncChatService:
+    """Async chat on top of AIAssistant's prompt building, cache and recommendations"""
+
+    def __init__(self, assistant, client, max_concurrent=MAX_CONCURRENT_CHATS,
+                 max_queued=MAX_QUEUED_CHATS, timeout=CHAT_TIMEOUT):
+        self.assistant = assistant
+        self.client = client
+        self.max_pending = max_concurrent + max_queued
+        self.timeout = timeout
+        self.pending = 0
+        self._semaphore = asyncio.Semaphore(max_concurrent)
+
+    async def _acquire_slot(self, deadline):
+        """Wait for an LLM slot until the deadline; refuse immediately when the queue is full"""
+        if self.pending >= self.max_pending:
+            raise Overloaded()
+        self.pending += 1
+        try:
+            await asyncio.wait_for(self._semaphore.acquire(), max(deadline - time.monotonic(), 0))
+        except BaseException:
+            self.pending -= 1
+            raise
+
+    def _release_slot(self):
+        self._semaphore.release()
+        self.pending -= 1
+
+    def _start_recommendations(self, product):
+        return asyncio.ensure_future(asyncio.to_thread(self.assistant._recommendations_for, product))
+
+    async def chat(self, user_message, product_context=None):
+        """Returns (status, payload) with the same payload shape as AIAssistant.chat"""
+        if self.client is None or not self.assistant.is_started:
+            return 200, await asyncio.to_thread(self.assistant._fallback_response, user_message, product_context)
+
+        deadline = time.monotonic() + self.timeout
+        recommendations_task = None
+        try:
+            prepared = await asyncio.to_thread(self.assistant._prepare_chat, user_message, product_context)
+            recommendations_task = self._start_recommendations(prepared["product"])
+
+            answer = await asyncio.to_thread(self.assistant.response_cache.get, prepared["cache_key"])
+            cached = answer is not None
+
+            if not cached:
+                await self._acquire_slot(deadline)
+                try:
+                    with timed("llm"):
+                        response = await asyncio.wait_for(
+                            self.client.chat.completions.create(
+                                model=LLM_MODEL,
+                                messages=prepared["messages"],
+                                temperature=LLM_TEMPERATURE,
+                                max_tokens=LLM_MAX_TOKENS
+                            ),
+                            max(deadline - time.monotonic(), 0)
+                        )
+                finally:
+                    self._release_slot()
+
+                answer = response.choices[0].message.content
+                if answer:
+                    await asyncio.to_thread(self.assistant.response_cache.set, prepared["cache_key"], answer)
+
+            recommendations = await recommendations_task
+            return 200, {
+                "answer": answer,
+                "recommendations": recommendations,
+                "debug": {
+                    "product_detected": prepared["product_detected"],
+                    "recommendations_count": len(recommendations),
+                    "cached": cached
+                }
+            }
+
+        except Overloaded:
+            return 503, await self._error_payload(BUSY_ANSWER, "Too many concurrent chats", recommendations_task)
+        except asyncio.TimeoutError:
+            return 504, await self._error_payload(TIMEOUT_ANSWER, "LLM request timed out", recommendations_task)
+        except Exception as e:
+            logger.error(f"Chat processing error: {str(e)}")
+            return 200, await self._error_payload(ERROR_ANSWER, str(e), recommendations_task)
+
+    async def _error_payload(self, answer, error, recommendations_task):
+        """Error response that still carries recommendations if they were computed"""
+        recommendations = []
+        if recommendations_task is not None:
+            try:
+                recommendations = await recommendations_task
+            except Exception:
+                pass
+        return {"answer": answer, "recommendations": recommendations, "debug": {"error": error}}
+
+    async def chat_stream(self, user_message, product_context=None):
+        """Async generator of (event, data) pairs, like AIAssistant.chat_stream"""
+        if self.client is None or not self.assistant.is_started:
+            for event in await asyncio.to_thread(
+                lambda: list(self.assistant.chat_stream(user_message, product_context))
+            ):
+                yield event
+            return
+
+        deadline = time.monotonic() + self.timeout
+        acquired = False
+        stream_task = None
+        try:
+            prepared = await asyncio.to_thread(self.assistant._prepare_chat, user_message, product_context)
+            recommendations_task = self._start_recommendations(prepared["product"])
+
+            answer = await asyncio.to_thread(self.assistant.response_cache.get, prepared["cache_key"])
+            cached = answer is not None
+
+            if not cached:
+                # Start the LLM call, then send recommendations while it connects
+                await self._acquire_slot(deadline)
+                acquired = True
+                started = time.perf_counter()
+                stream_task = asyncio.ensure_future(asyncio.wait_for(
+                    self.client.chat.completions.create(
+                        model=LLM_MODEL,
+                        messages=prepared["messages"],
+                        temperature=LLM_TEMPERATURE,
+                        max_tokens=LLM_MAX_TOKENS,
+                        stream=True
+                    ),
+                    max(deadline - time.monotonic(), 0)
+                ))
+
+            recommendations = await recommendations_task
+            yield "recommendations", {"recommendations": recommendations}
+
+            if cached:
+                yield "token", {"text": answer}
+            else:
+                parts = []
+                stream = await stream_task
+                chunks = stream.__aiter__()
+                while True:
+                    try:
+                        chunk = await asyncio.wait_for(chunks.__anext__(), max(deadline - time.monotonic(), 0))
+                    except StopAsyncIteration:
+                        break
+                    if not chunk.choices:
+                        continue
+                    text = chunk.choices[0].delta.content
+                    if text:
+                        if not parts:
+                            STAGE_SECONDS.observe(time.perf_counter() - started, stage="llm_first_token")
+                        parts.append(text)
+                        yield "token", {"text": text}
+
+                answer = "".join(parts)
+                if answer:
+                    await asyncio.to_thread(self.assistant.response_cache.set, prepared["cache_key"], answer)
+
+            yield "done", {
+                "debug": {
+                    "product_detected": prepared["product_detected"],
+                    "recommendations_count": len(recommendations),
+                    "cached": cached
+                }
+            }
+
+        except Overloaded:
+            yield "error", {"answer": BUSY_ANSWER, "debug": {"error": "Too many concurrent chats"}}
+        except asyncio.TimeoutError:
+            yield "error", {"answer": TIMEOUT_ANSWER, "debug": {"error": "LLM request timed out"}}
+        except Exception as e:
+            logger.error(f"Chat streaming error: {str(e)}")
+            yield "error", {"answer": ERROR_ANSWER, "debug": {"error": str(e)}}
+        finally:
+            if stream_task is not None and not stream_task.done():
+                stream_task.cancel()
+            if acquired:
+                self._release_slot()
+
+
+async def _read_json(receive):
+    body = b""
+    more_body = True
+    while more_body:
+        message = await receive()
+        if message["type"] == "http.disconnect":
+            return None
+        body += message.get("body", b"")
+        more_body = message.get("more_body", False)
+    try:
+        return json.loads(body) if body else None
+    except ValueError:
+        return None
+
+
+async def _send_json(send, status, payload):
+    with timed("json_serialize"):
+        body = json.dumps(payload, default=str).encode("utf-8")
+    await send({
+        "type": "http.response.start",
+        "status": status,
+        "headers": [
+            (b"content-type", b"application/json"),
+            (b"content-length", str(len(body)).encode("ascii")),
+        ] + CORS_HEADERS,
+    })
+    await send({"type": "http.response.body", "body": body})
+
+
+class AssistantApp:
+    """Minimal ASGI application exposing the assistant endpoints"""
+
+    def __init__(self, csv_path=None):
+        self.csv_path = csv_path or os.getenv('CSV_PATH', 'finalwebsite.csv')
+        self.assistant = None
+        self.service = None
+
+    def preload(self):
+        """
+        Build the AIAssistant now (gunicorn master, before forking workers).
+        Each worker's startup then only creates its own LLM client.
+        """
+        try:
+            self.assistant = AIAssistant(self.csv_path, background=False)
+            logger.info(f"AI Assistant preloaded with CSV: {self.csv_path}")
+        except Exception as e:
+            logger.error(f"Failed to preload AI Assistant: {str(e)}")
+
+    async def startup(self):
+        assistant = self.assistant
+        if assistant is None:
+            try:
+                if BACKGROUND_STARTUP:
+                    # Returns at once; the loading thread sets assistant.started
+                    assistant = AIAssistant(self.csv_path, background=True)
+                else:
+                    assistant = await asyncio.to_thread(AIAssistant, self.csv_path)
+                logger.info(f"AI Assistant {'starting' if BACKGROUND_STARTUP else 'initialized'} with CSV: {self.csv_path}")
+            except Exception as e:
+                logger.error(f"Failed to initialize AI Assistant: {str(e)}")
+                return
+        self.service = AsyncChatService(assistant, create_llm_client())
+        REGISTRY.add_collector(assistant.metric_samples)
+
+    async def shutdown(self):
+        client = self.service.client if self.service else None
+        if client is not None:
+            await client.close()
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] == "lifespan":
+            await self._lifespan(receive, send)
+            return
+        if scope["type"] != "http":
+            return
+
+        method = scope["method"]
+        path = scope["path"]
+        started = time.perf_counter()
+
+        async def send_and_record(message):
+            # Like the Flask app: time until the response starts (first byte of a stream)
+            if message["type"] == "http.response.start":
+                endpoint = path if path in ROUTES else "unmatched"
+                observe_request(method, endpoint, message["status"], time.perf_counter() - started)
+            await send(message)
+
+        await self._route(method, path, receive, send_and_record)
+
+    async def _route(self, method, path, receive, send):
+        if method == "OPTIONS":
+            await send({
+                "type": "http.response.start",
+                "status": 204,
+                "headers": CORS_HEADERS + [
+                    (b"access-control-allow-methods", b"GET, POST, OPTIONS"),
+                    (b"access-control-allow-headers", b"Content-Type"),
+                ],
+            })
+            await send({"type": "http.response.body", "body": b""})
+            return
+
+        if path in ("/health", "/health/live") and method == "GET":
+            await _send_json(send, 200, {"status": "ok"})
+        elif path == "/health/ready" and method == "GET":
+            if not self.service:
+                await _send_json(send, 503, {"ready": False, "error": "Assistant not initialized"})
+            else:
+                status = self.service.assistant.status()
+                await _send_json(send, 200 if status["ready"] else 503, status)
+        elif path == "/api/ai/chat" and method == "POST":
+            await self._chat(receive, send)
+        elif path == "/api/ai/chat/stream" and method == "POST":
+            await self._chat_stream(receive, send)
+        elif path == "/api/ai/cache/stats" and method == "GET":
+            if not self.service:
+                await _send_json(send, 500, {"error": "Assistant not initialized"})
+            else:
+                await _send_json(send, 200, self.service.assistant.response_cache.stats())
+        elif path == "/api/metrics" and method == "GET":
+            body = REGISTRY.render().encode("utf-8")
+            await send({
+                "type": "http.response.start",
+                "status": 200,
+                "headers": [(b"content-type", CONTENT_TYPE.encode("ascii"))] + CORS_HEADERS,
+            })
+            await send({"type": "http.response.body", "body": body})
+        else:
+            await _send_json(send, 404, {"error": "Not found"})
+
+    async def _lifespan(self, receive, send):
+        while True:
+            message = await receive()
+            if message["type"] == "lifespan.startup":
+                await self.startup()
+                await send({"type": "lifespan.startup.complete"})
+            elif message["type"] == "lifespan.shutdown":
+                await self.shutdown()
+                await send({"type": "lifespan.shutdown.complete"})
+                return
+
+    async def _validate(self, receive, send):
+        """Parsed request body, or None after sending the error response"""
+        if not self.service:
+            await _send_json(send, 500, {
+                "answer": "AI Assistant is not available. Please check the service configuration.",
+                "recommendations": [],
+                "debug": {"error": "Assistant not initialized"}
+            })
+            return None
+
+        data = await _read_json(receive)
+        if not isinstance(data, dict) or "message" not in data:
+            await _send_json(send, 400, {
+                "answer": "Please provide a message in the request.",
+                "recommendations": [],
+                "debug": {"error": "Missing message field"}
+            })
+            return None
+        return data
+
+    async def _chat(self, receive, send):
+        data = await self._validate(receive, send)
+        if data is None:
+            return
+        logger.info(f"Received chat message: {str(data['message'])[:100]}...")
+        status, payload = await self.service.chat(data["message"], data.get("product_context"))
+        await _send_json(send, status, payload)
+
+    async def _chat_stream(self, receive, send):
+        data = await self._validate(receive, send)
+        if data is None:
+            return
+        logger.info(f"Received streaming chat message: {str(data['message'])[:100]}...")
+
+        await send({
+            "type": "http.response.start",
+            "status": 200,
+            "headers": [
+                (b"content-type", b"text/event-stream; charset=utf-8"),
+                (b"cache-control", b"no-cache"),
+                (b"x-accel-buffering", b"no"),
+            ] + CORS_HEADERS,
+        })
+        async for event, payload in self.service.chat_stream(data["message"], data.get("product_context")):
+            chunk = f"event: {event}\ndata: {json.dumps(payload, default=str)}\n\n"
+            await send({"type": "http.response.body", "body": chunk.encode("utf-8"), "more_body": True})
+        await send({"type": "http.response.body", "body": b""})
+
+
+logging.basicConfig(level=logging.INFO)
+app = AssistantApp()
+
+
+if __name__ == "__main__":
+    import uvicorn
+
+    port = int(os.getenv('PORT', 5002))
+    uvicorn.run("asgi:app", host="0.0.0.0", port=port)
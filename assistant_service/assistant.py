@@ -3,47 +3,128 @@ import pandas as pd
 import joblib
 import logging
 from groq import Groq
+from fake_llm import FakeGroq
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.linear_model import LogisticRegression
 from sklearn.model_selection import train_test_split
 import re
-import nltk
-from nltk.corpus import stopwords
-from nltk.stem import WordNetLemmatizer
+import sys
+import time
+import hashlib
+import json
+import threading
+from collections import Counter, defaultdict
 
-# Download NLTK data if not present
-try:
-    nltk.download('stopwords', quiet=True)
-    nltk.download('wordnet', quiet=True)
-    nltk.download('omw-1.4', quiet=True)
-except:
-    pass
+# Title preprocessing is shared with the training script in ml_models/
+ML_MODELS_DIR = os.path.abspath(os.getenv(
+    'ML_MODELS_DIR', os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'ml_models')
+))
+if ML_MODELS_DIR not in sys.path:
+    sys.path.append(ML_MODELS_DIR)
+
+from text_preprocessing import check_preprocessing, clean_texts, preprocessing_mode  # noqa: E402
+from ann_index import AnnIndex  # noqa: E402
+from catalog_store import open_catalog  # noqa: E402
+from artifact_store import MODEL_NAME, VECTORIZER_NAME, read_manifest  # noqa: E402
+from metrics import STAGE_SECONDS, cache_samples, timed  # noqa: E402
+from response_cache import ResponseCache, make_cache_key  # noqa: E402
 
 logger = logging.getLogger(__name__)
 
+# Load the dataset and classifier in a background thread so the service answers
+# (with fallback responses) while starting; 0 loads them before serving
+BACKGROUND_STARTUP = os.getenv('ASSISTANT_BACKGROUND_STARTUP', '1') == '1'
+
+# Cross-category fallback index built with `python ann_index.py build` in ml_models/
+ANN_INDEX_DIR = os.getenv('ANN_INDEX_DIR', os.path.join(ML_MODELS_DIR, 'ann_index'))
+
+# Words shorter than this are ignored when matching products to messages
+MIN_SIGNIFICANT_WORD_LENGTH = 4
+# Minimum number of significant title words a message must contain
+MIN_PRODUCT_MATCHES = 2
+
+_WORD_RE = re.compile(r"[a-z0-9]+")
+
+
+def _significant_words(text):
+    """Distinct lowercase words of a text that count towards a product match"""
+    return {w for w in _WORD_RE.findall(str(text).lower()) if len(w) >= MIN_SIGNIFICANT_WORD_LENGTH}
+
+
+def load_groq_api_key():
+    """GROQ_API_KEY from the environment, or from a local .env file"""
+    api_key = os.getenv('GROQ_API_KEY')
+    if not api_key:
+        # Try to load from .env file
+        try:
+            with open('.env', 'r') as f:
+                for line in f:
+                    if line.startswith('GROQ_API_KEY='):
+                        api_key = line.split('=', 1)[1].strip()
+                        break
+        except FileNotFoundError:
+            pass
+    return api_key
+
+
+# Groq completion parameters (part of the response cache key)
+LLM_MODEL = "llama-3.1-8b-instant"
+LLM_TEMPERATURE = 0.4
+LLM_MAX_TOKENS = 600
+
+# Stable part of the system prompt; product context is appended after it so the
+# prefix stays byte-identical between requests (and cacheable upstream)
+_SYSTEM_PROMPT_TEMPLATE = """You are an AI assistant for a sustainable e-commerce platform. You help users make eco-friendly purchasing decisions.
+
+{dataset_context}
+
+You can:
+- Analyze product sustainability
+- Recommend eco-friendly alternatives
+- Provide general advice about sustainable shopping
+- Answer questions about the product catalog
+
+When users ask about specific products or need alternatives, provide helpful recommendations based on the dataset.
+
+Keep responses concise and helpful. If you detect a product in the user's message, you may receive recommendations to suggest."""
+
+
 class AIAssistant:
-    def __init__(self, csv_path="finalwebsite.csv"):
+    def __init__(self, csv_path="finalwebsite.csv", background=False):
+        """
+        With background=True the dataset, ANN index and classifier are loaded by
+        a daemon thread: the instance answers at once (fallback responses until
+        `started` is set) and the classifier is swapped in when it is available.
+        """
         self.csv_path = csv_path
         self.df = None
-        self.vectorizer = None
-        self.model = None
+        # (vectorizer, model), replaced as a whole so readers never see a mismatched pair
+        self._classifier = None
         self.groq_client = None
+        self._token_index = {}
+        self._products = []
+        self._products_by_asin = {}
+        self.ann_index = None
+        self._dataset_mtime = None
+        self._dataset_context = "No dataset available."
+        self._system_prompt_prefix = _SYSTEM_PROMPT_TEMPLATE.format(dataset_context=self._dataset_context)
+        self.response_cache = ResponseCache.from_env()
+        # Set when startup loading has finished, successfully or not (see is_ready)
+        self.started = threading.Event()
+        # One reload of a changed dataset at a time
+        self._refresh_lock = threading.Lock()
+        self.startup_phase = "starting"
+        self.startup_seconds = None
+        self.startup_error = None
         
-        # Initialize Groq client
+        # Initialize Groq client (FAKE_LLM=1 uses the local stand-in)
         try:
-            api_key = os.getenv('GROQ_API_KEY')
-            if not api_key:
-                # Try to load from .env file
-                try:
-                    with open('.env', 'r') as f:
-                        for line in f:
-                            if line.startswith('GROQ_API_KEY='):
-                                api_key = line.split('=', 1)[1].strip()
-                                break
-                except FileNotFoundError:
-                    pass
-            
-            if not api_key:
+            api_key = load_groq_api_key()
+            
+            if os.getenv('FAKE_LLM') == '1':
+                self.groq_client = FakeGroq()
+                logger.info("Using fake LLM client")
+            elif not api_key:
                 logger.warning("GROQ_API_KEY not found. AI responses will be limited.")
                 self.groq_client = None
             else:
@@ -53,68 +134,201 @@ class AIAssistant:
             logger.error(f"Failed to initialize Groq client: {str(e)}")
             self.groq_client = None
         
-        # Load or train ML model
-        self._load_or_train_model()
-        
-        # Load dataset
-        self._load_dataset()
+        if background:
+            threading.Thread(target=self._initialize, name="assistant-startup", daemon=True).start()
+        else:
+            self._initialize()
+    
+    @property
+    def vectorizer(self):
+        classifier = self._classifier
+        return classifier[0] if classifier else None
+    
+    @property
+    def model(self):
+        classifier = self._classifier
+        return classifier[1] if classifier else None
+    
+    @property
+    def is_started(self):
+        return self.started.is_set()
+    
+    @property
+    def is_ready(self):
+        """
+        True when startup succeeded and the dataset is loaded. Without a
+        classifier the instance is degraded but serves (fallback answers, ANN
+        alternatives).
+        """
+        return self.is_started and self.startup_phase == "ready" and self.df is not None
+    
+    def wait_until_started(self, timeout=None):
+        """Block until startup has finished (check is_ready for its outcome); returns False on timeout"""
+        return self.started.wait(timeout)
+    
+    def status(self):
+        """Startup state for the readiness endpoint"""
+        return {
+            "ready": self.is_ready,
+            "degraded": self.is_ready and self._classifier is None,
+            "phase": self.startup_phase,
+            "dataset_loaded": self.df is not None,
+            "model_loaded": self._classifier is not None,
+            "ann_index_loaded": self.ann_index is not None,
+            "startup_seconds": self.startup_seconds,
+            "error": self.startup_error,
+        }
+    
+    def _initialize(self):
+        """Load the dataset, ANN index and classifier, then set `started`"""
+        started = time.perf_counter()
+        try:
+            self.startup_phase = "loading_dataset"
+            self._load_dataset()
+            if self.df is None:
+                raise RuntimeError(f"Dataset could not be loaded from {self.csv_path}")
+            
+            # Optional ANN index for alternatives in related categories
+            self.startup_phase = "loading_ann_index"
+            if os.path.exists(os.path.join(ANN_INDEX_DIR, 'meta.json')):
+                try:
+                    self.ann_index = AnnIndex.load(ANN_INDEX_DIR)
+                    logger.info(f"ANN index loaded: {len(self.ann_index)} products")
+                except Exception as e:
+                    logger.warning(f"Failed to load ANN index: {str(e)}")
+            
+            # Load or train ML model
+            self.startup_phase = "loading_model"
+            self._classifier = self._load_or_train_model()
+            
+            if self._classifier is None:
+                logger.warning("No eco classifier could be loaded or trained; serving degraded")
+            
+            # Stopwords/lemmatizer are loaded lazily: not on the first request
+            clean_texts(["warm up"])
+            self.startup_phase = "ready"
+        except Exception as e:
+            logger.error(f"AI Assistant startup failed: {str(e)}")
+            self.startup_error = str(e)
+            self.startup_phase = "failed"
+        finally:
+            self.startup_seconds = round(time.perf_counter() - started, 3)
+            logger.info(f"AI Assistant startup finished in {self.startup_seconds}s ({self.startup_phase})")
+            self.started.set()
     
     def _load_dataset(self):
         """Load the product dataset"""
         try:
-            self.df = pd.read_csv(self.csv_path)
+            self._dataset_mtime = os.path.getmtime(self.csv_path)
+            # Memory-mapped columnar copy of the CSV, shared with the backend's loader
+            self.df = open_catalog(self.csv_path).to_frame()
             logger.info(f"Dataset loaded: {len(self.df)} products")
         except Exception as e:
             logger.error(f"Failed to load dataset: {str(e)}")
             self.df = None
+        self._build_product_index()
+        self._dataset_context = self._build_dataset_context()
+        self._system_prompt_prefix = _SYSTEM_PROMPT_TEMPLATE.format(dataset_context=self._dataset_context)
+    
+    def _refresh_dataset_if_changed(self):
+        """Reload the dataset (and everything derived from it) when the CSV changes"""
+        if not self.is_started:
+            # The startup thread is loading it
+            return
+        try:
+            mtime = os.path.getmtime(self.csv_path)
+        except OSError:
+            return
+        if mtime == self._dataset_mtime:
+            return
+        # Another request thread is reloading it: keep serving the current one
+        if not self._refresh_lock.acquire(blocking=False):
+            return
+        try:
+            if mtime != self._dataset_mtime:
+                logger.info("Dataset file changed, reloading")
+                self._load_dataset()
+        finally:
+            self._refresh_lock.release()
+    
+    def _build_product_index(self):
+        """Build a significant word -> product positions index for product detection"""
+        token_index = defaultdict(list)
+        products = []
+        self._products_by_asin = {}
+        if self.df is not None:
+            if 'asin' in self.df.columns:
+                self._products_by_asin = {str(r['asin']): r for r in self.df.to_dict('records')}
+            columns = zip(self.df['title'], self.df['price'], self.df['categoryName'])
+            for position, (title, price, category_name) in enumerate(columns):
+                products.append((title, price, category_name))
+                for word in _significant_words(title):
+                    token_index[word].append(position)
+        self._token_index = dict(token_index)
+        self._products = products
     
     def _load_or_train_model(self):
-        """Load existing model or train a new one"""
+        """Load existing model or train a new one; returns (vectorizer, model) or None"""
         models_dir = "assistant_service/models"
         os.makedirs(models_dir, exist_ok=True)
         
         vectorizer_path = os.path.join(models_dir, "vectorizer.pkl")
         model_path = os.path.join(models_dir, "classifier.pkl")
+        preprocessing_path = os.path.join(models_dir, "preprocessing.json")
         
         try:
             # Try to load existing models
             if os.path.exists(vectorizer_path) and os.path.exists(model_path):
-                self.vectorizer = joblib.load(vectorizer_path)
-                self.model = joblib.load(model_path)
+                # Trained on titles cleaned differently (e.g. on a host with the NLTK corpora): retrain
+                preprocessing = None
+                if os.path.exists(preprocessing_path):
+                    with open(preprocessing_path, 'r') as f:
+                        preprocessing = json.load(f)
+                check_preprocessing(preprocessing, what="assistant classifier")
+                classifier = (joblib.load(vectorizer_path), joblib.load(model_path))
                 logger.info("Loaded existing ML models")
-                return
+                return classifier
         except Exception as e:
             logger.warning(f"Failed to load existing models: {str(e)}")
         
-        # Train new models if loading failed
-        self._train_model()
+        # Train new models if loading failed, else use the backend's published classifier
+        return self._train_model() or self._load_shared_model()
+    
+    def _load_shared_model(self):
+        """The classifier published in ml_models/ (train_model.py / artifact_store.py); returns (vectorizer, model) or None"""
+        try:
+            manifest = read_manifest(ML_MODELS_DIR)
+            if manifest:
+                model_name, vectorizer_name = manifest["model"], manifest["vectorizer"]
+                preprocessing = manifest.get("preprocessing")
+            else:
+                model_name, vectorizer_name, preprocessing = MODEL_NAME, VECTORIZER_NAME, None
+            model_path = os.path.join(ML_MODELS_DIR, model_name)
+            vectorizer_path = os.path.join(ML_MODELS_DIR, vectorizer_name)
+            if not (os.path.exists(model_path) and os.path.exists(vectorizer_path)):
+                return None
+            check_preprocessing(preprocessing, what="published classifier")
+            classifier = (joblib.load(vectorizer_path), joblib.load(model_path))
+            logger.info(f"Loaded the published classifier from {ML_MODELS_DIR}")
+            return classifier
+        except Exception as e:
+            logger.warning(f"Failed to load the published classifier: {str(e)}")
+            return None
     
     def _train_model(self):
-        """Train a minimal TF-IDF + LogisticRegression model"""
+        """Train a minimal TF-IDF + LogisticRegression model; returns (vectorizer, model) or None"""
         try:
             if self.df is None:
                 self._load_dataset()
             
-            if self.df is None or 'EcoLabel' not in self.df.columns:
+            df = self.df
+            if df is None or 'EcoLabel' not in df.columns:
                 logger.error("Dataset not available or missing EcoLabel column")
-                return
+                return None
             
-            # Text preprocessing
-            def clean_text(text):
-                if pd.isna(text):
-                    return ""
-                text = str(text).lower()
-                text = re.sub(r'[^a-z\s]', '', text)
-                words = text.split()
-                stop_words = set(stopwords.words('english'))
-                lemmatizer = WordNetLemmatizer()
-                words = [lemmatizer.lemmatize(w) for w in words if w not in stop_words]
-                return " ".join(words)
-            
-            # Prepare data
-            self.df['title_clean'] = self.df['title'].apply(clean_text)
-            X = self.df['title_clean']
-            y = self.df['EcoLabel']
+            # Prepare data (the dataset itself may already be serving requests)
+            X = pd.Series(clean_texts(df['title'].tolist(), n_jobs=1), index=df.index)
+            y = df['EcoLabel']
             
             # Train-test split
             X_train, X_test, y_train, y_test = train_test_split(
@@ -122,35 +336,53 @@ class AIAssistant:
             )
             
             # TF-IDF Vectorizer
-            self.vectorizer = TfidfVectorizer(
+            vectorizer = TfidfVectorizer(
                 stop_words="english",
                 max_features=5000,
                 ngram_range=(1, 2)
             )
-            X_train_tfidf = self.vectorizer.fit_transform(X_train)
+            X_train_tfidf = vectorizer.fit_transform(X_train)
             
             # Logistic Regression
-            self.model = LogisticRegression(
+            model = LogisticRegression(
                 max_iter=1000,
                 random_state=42,
                 class_weight='balanced'
             )
-            self.model.fit(X_train_tfidf, y_train)
+            model.fit(X_train_tfidf, y_train)
             
             # Save models
             models_dir = "assistant_service/models"
             os.makedirs(models_dir, exist_ok=True)
-            joblib.dump(self.vectorizer, os.path.join(models_dir, "vectorizer.pkl"))
-            joblib.dump(self.model, os.path.join(models_dir, "classifier.pkl"))
+            joblib.dump(vectorizer, os.path.join(models_dir, "vectorizer.pkl"))
+            joblib.dump(model, os.path.join(models_dir, "classifier.pkl"))
+            with open(os.path.join(models_dir, "preprocessing.json"), 'w') as f:
+                json.dump(preprocessing_mode(), f)
             
             logger.info("ML model trained and saved successfully")
+            return vectorizer, model
             
         except Exception as e:
             logger.error(f"Failed to train model: {str(e)}")
-            self.vectorizer = None
-            self.model = None
+            return None
+    
+    def metric_samples(self):
+        """Response cache counters and model/dataset state for /api/metrics"""
+        samples = cache_samples("response", self.response_cache.stats())
+        samples.append(("assistant_model_loaded", "gauge", "1 when the eco classifier is loaded",
+                        [({}, int(self._classifier is not None))]))
+        samples.append(("assistant_ready", "gauge", "1 once startup has loaded the dataset",
+                        [({}, int(self.is_ready))]))
+        samples.append(("assistant_dataset_rows", "gauge", "Products in the assistant dataset",
+                        [({}, 0 if self.df is None else len(self.df))]))
+        return samples
     
     def _get_dataset_context(self):
+        """Dataset context for AI, computed once per dataset version"""
+        self._refresh_dataset_if_changed()
+        return self._dataset_context
+    
+    def _build_dataset_context(self):
         """Generate dataset context for AI"""
         if self.df is None:
             return "No dataset available."
@@ -186,19 +418,26 @@ class AIAssistant:
     
     def _get_recommendations(self, product_title, product_price, category_name):
         """Get eco-friendly recommendations for a product"""
-        if self.df is None or self.model is None or self.vectorizer is None:
+        if self.df is None:
             return []
+        classifier = self._classifier
+        if classifier is None:
+            # The ANN index carries its own eco labels
+            return self._cross_category_recommendations(product_title, product_price)
+        vectorizer, model = classifier
         
         try:
             # Filter same category
             same_cat = self.df[self.df['categoryName'] == category_name]
             if same_cat.empty:
-                return []
+                return self._cross_category_recommendations(product_title, product_price)
             
             # Predict eco-labels for products in same category
             titles = same_cat['title'].astype(str).tolist()
-            X = self.vectorizer.transform(titles)
-            preds = self.model.predict(X)
+            with timed("vectorize"):
+                X = vectorizer.transform(clean_texts(titles))
+            with timed("inference"):
+                preds = model.predict(X)
             
             # Add predictions to dataframe
             same_cat = same_cat.copy()
@@ -212,6 +451,8 @@ class AIAssistant:
             
             # Sort by price and return top 3
             recommendations = eco_products.sort_values('price').head(3)
+            if recommendations.empty:
+                return self._cross_category_recommendations(product_title, product_price)
             
             return recommendations.to_dict('records')
             
@@ -219,41 +460,66 @@ class AIAssistant:
             logger.error(f"Failed to get recommendations: {str(e)}")
             return []
     
+    def _cross_category_recommendations(self, product_title, product_price, top_n=3):
+        """Similar cheaper eco-friendly products from related categories (ANN index)"""
+        if self.ann_index is None or not self._products_by_asin:
+            return []
+        
+        # Over-fetch: some indexed products may no longer be in the dataset
+        with timed("ann_query"):
+            matches = self.ann_index.query(product_title, k=top_n * 3, max_price=product_price)
+        recommendations = []
+        for item, similarity in matches:
+            product = self._products_by_asin.get(str(self.ann_index.asin[item]))
+            if product is not None:
+                recommendations.append(dict(product, similarity=round(similarity, 4)))
+            if len(recommendations) == top_n:
+                break
+        return recommendations
+    
     def _detect_product_in_message(self, message):
-        """Simple product detection in user message"""
-        if self.df is None:
+        """Detect the catalog product best matching the user message"""
+        if self.df is None or not self._token_index:
             return None, None, None
         
-        message_lower = message.lower()
+        # Count significant title words shared with the message, per product
+        scores = Counter()
+        for word in _significant_words(message):
+            scores.update(self._token_index.get(word, ()))
         
-        # Look for product titles in the message
-        for _, row in self.df.iterrows():
-            title_words = row['title'].lower().split()
-            # Check if any significant words from title appear in message
-            matches = sum(1 for word in title_words if len(word) > 3 and word in message_lower)
-            if matches >= 2:  # At least 2 significant word matches
-                return row['title'], row['price'], row['categoryName']
+        if not scores:
+            return None, None, None
         
-        return None, None, None
-    
-    def _fallback_response(self, user_message, product_context=None):
-        """Provide fallback responses when Groq is not available"""
-        message_lower = user_message.lower()
+        # Best match wins; ties go to the product listed first
+        position, matches = max(scores.items(), key=lambda item: (item[1], -item[0]))
+        if matches < MIN_PRODUCT_MATCHES:
+            return None, None, None
         
+        return self._products[position]
+    
+    def _resolve_product(self, user_message, product_context=None):
+        """Product the message is about: (title, price, category, eco_label)"""
         # Use product context if provided, otherwise detect from message
         if product_context:
-            product_title = product_context.get('title')
-            product_price = product_context.get('price')
-            category_name = product_context.get('category')
-            eco_label = product_context.get('ecoLabel', 0)
-        else:
-            product_title, product_price, category_name = self._detect_product_in_message(user_message)
-            eco_label = 0
-        
-        recommendations = []
-        
-        if product_title:
-            recommendations = self._get_recommendations(product_title, product_price, category_name)
+            return (
+                product_context.get('title'),
+                product_context.get('price'),
+                product_context.get('category'),
+                product_context.get('ecoLabel', 0),
+            )
+        product_title, product_price, category_name = self._detect_product_in_message(user_message)
+        return product_title, product_price, category_name, 0
+    
+    def _recommendations_for(self, product):
+        """Recommendations for a (title, price, category) tuple; empty if no product"""
+        product_title, product_price, category_name = product
+        if not product_title:
+            return []
+        return self._get_recommendations(product_title, product_price, category_name)
+    
+    def _fallback_answer(self, user_message, recommendations):
+        """Keyword-based answer used when Groq is not available"""
+        message_lower = user_message.lower()
         
         # Simple keyword-based responses
         if any(word in message_lower for word in ['eco', 'sustainable', 'green', 'environment']):
@@ -276,87 +542,114 @@ class AIAssistant:
         else:
             answer = "I'm a sustainability assistant! I can help you find eco-friendly products and alternatives. Ask me about specific products or sustainability topics."
         
+        return answer
+    
+    def _fallback_response(self, user_message, product_context=None):
+        """Provide fallback responses when Groq is not available (or startup is not finished)"""
+        product_title = None
+        recommendations = []
+        
+        # The dataset and its indexes are only consistent once startup is done
+        if self.is_started:
+            product_title, product_price, category_name, _ = self._resolve_product(user_message, product_context)
+            if product_title:
+                recommendations = self._get_recommendations(product_title, product_price, category_name)
+        
+        debug = {
+            "fallback_mode": True,
+            "product_detected": product_title is not None,
+            "recommendations_count": len(recommendations)
+        }
+        if not self.is_started:
+            debug["warming_up"] = True
+        
         return {
-            "answer": answer,
+            "answer": self._fallback_answer(user_message, recommendations),
             "recommendations": recommendations,
-            "debug": {
-                "fallback_mode": True,
-                "product_detected": product_title is not None,
-                "recommendations_count": len(recommendations)
-            }
+            "debug": debug
         }
     
-    def chat(self, user_message, product_context=None):
-        """Process chat message and return AI response with recommendations"""
-        try:
-            if not self.groq_client:
-                # Fallback response when Groq is not available
-                return self._fallback_response(user_message, product_context)
-            
-            # Get dataset context
-            dataset_context = self._get_dataset_context()
-            
-            # Use product context if provided, otherwise detect from message
-            if product_context:
-                product_title = product_context.get('title')
-                product_price = product_context.get('price')
-                category_name = product_context.get('category')
-                eco_label = product_context.get('ecoLabel', 0)
-            else:
-                product_title, product_price, category_name = self._detect_product_in_message(user_message)
-                eco_label = 0
-            
-            recommendations = []
-            
-            if product_title:
-                recommendations = self._get_recommendations(product_title, product_price, category_name)
-            
-            # Prepare system prompt
-            product_info = ""
-            if product_context:
-                eco_status = ["Harmful", "Moderate", "Eco-friendly"][eco_label] if eco_label in [0, 1, 2] else "Unknown"
-                product_info = f"""
+    def _build_system_prompt(self, product_context, product_title, product_price, category_name, eco_label):
+        """Cached prompt prefix followed by the (optional) current product"""
+        product_info = ""
+        if product_context:
+            eco_status = ["Harmful", "Moderate", "Eco-friendly"][eco_label] if eco_label in [0, 1, 2] else "Unknown"
+            product_info = f"""
 Current Product Context:
 - Product: {product_title}
 - Price: ${product_price}
 - Category: {category_name}
 - Eco-label: {eco_status}
 """
+        
+        return self._system_prompt_prefix + "\n" + product_info
+    
+    def _prepare_chat(self, user_message, product_context=None):
+        """Everything needed before calling Groq: product, prompt and cache key"""
+        # Pick up CSV changes; the cached prompt prefix is rebuilt with it
+        self._refresh_dataset_if_changed()
+        
+        product_title, product_price, category_name, eco_label = self._resolve_product(user_message, product_context)
+        
+        system_prompt = self._build_system_prompt(
+            product_context, product_title, product_price, category_name, eco_label
+        )
+        
+        # Identical questions about the same product reuse the previous answer;
+        # the prompt hash keys out answers built on an older dataset
+        cache_key = make_cache_key(
+            user_message,
+            product_context,
+            model=LLM_MODEL,
+            temperature=LLM_TEMPERATURE,
+            max_tokens=LLM_MAX_TOKENS,
+            prompt=hashlib.sha1(system_prompt.encode("utf-8")).hexdigest(),
+        )
+        
+        return {
+            "product": (product_title, product_price, category_name),
+            "product_detected": product_title is not None,
+            "messages": [
+                {"role": "system", "content": system_prompt},
+                {"role": "user", "content": user_message}
+            ],
+            "cache_key": cache_key,
+        }
+    
+    def chat(self, user_message, product_context=None):
+        """Process chat message and return AI response with recommendations"""
+        try:
+            if not self.groq_client or not self.is_started:
+                # Fallback response when Groq is not available or still starting up
+                return self._fallback_response(user_message, product_context)
             
-            system_prompt = f"""You are an AI assistant for a sustainable e-commerce platform. You help users make eco-friendly purchasing decisions.
-
-{dataset_context}
-{product_info}
-
-You can:
-- Analyze product sustainability
-- Recommend eco-friendly alternatives
-- Provide general advice about sustainable shopping
-- Answer questions about the product catalog
-
-When users ask about specific products or need alternatives, provide helpful recommendations based on the dataset.
-
-Keep responses concise and helpful. If you detect a product in the user's message, you may receive recommendations to suggest."""
+            prepared = self._prepare_chat(user_message, product_context)
+            recommendations = self._recommendations_for(prepared["product"])
             
-            # Get AI response
-            response = self.groq_client.chat.completions.create(
-                model="llama-3.1-8b-instant",
-                messages=[
-                    {"role": "system", "content": system_prompt},
-                    {"role": "user", "content": user_message}
-                ],
-                temperature=0.4,
-                max_tokens=600
-            )
+            answer = self.response_cache.get(prepared["cache_key"])
+            cached = answer is not None
             
-            answer = response.choices[0].message.content
+            if not cached:
+                # Get AI response
+                with timed("llm"):
+                    response = self.groq_client.chat.completions.create(
+                        model=LLM_MODEL,
+                        messages=prepared["messages"],
+                        temperature=LLM_TEMPERATURE,
+                        max_tokens=LLM_MAX_TOKENS
+                    )
+                
+                answer = response.choices[0].message.content
+                if answer:
+                    self.response_cache.set(prepared["cache_key"], answer)
             
             return {
                 "answer": answer,
                 "recommendations": recommendations,
                 "debug": {
-                    "product_detected": product_title is not None,
-                    "recommendations_count": len(recommendations)
+                    "product_detected": prepared["product_detected"],
+                    "recommendations_count": len(recommendations),
+                    "cached": cached
                 }
             }
             
@@ -367,3 +660,66 @@ Keep responses concise and helpful. If you detect a product in the user's messag
                 "recommendations": [],
                 "debug": {"error": str(e)}
             }
+    
+    def chat_stream(self, user_message, product_context=None):
+        """
+        Streaming variant of chat().
+        Yields (event, data) pairs: one "recommendations" event as soon as they are
+        known, "token" events as the answer is generated, then "done" (or "error").
+        """
+        try:
+            if not self.groq_client or not self.is_started:
+                fallback = self._fallback_response(user_message, product_context)
+                yield "recommendations", {"recommendations": fallback["recommendations"]}
+                yield "token", {"text": fallback["answer"]}
+                yield "done", {"debug": fallback["debug"]}
+                return
+            
+            prepared = self._prepare_chat(user_message, product_context)
+            recommendations = self._recommendations_for(prepared["product"])
+            yield "recommendations", {"recommendations": recommendations}
+            
+            answer = self.response_cache.get(prepared["cache_key"])
+            cached = answer is not None
+            
+            if cached:
+                yield "token", {"text": answer}
+            else:
+                started = time.perf_counter()
+                stream = self.groq_client.chat.completions.create(
+                    model=LLM_MODEL,
+                    messages=prepared["messages"],
+                    temperature=LLM_TEMPERATURE,
+                    max_tokens=LLM_MAX_TOKENS,
+                    stream=True
+                )
+                
+                parts = []
+                for chunk in stream:
+                    if not chunk.choices:
+                        continue
+                    text = chunk.choices[0].delta.content
+                    if text:
+                        if not parts:
+                            STAGE_SECONDS.observe(time.perf_counter() - started, stage="llm_first_token")
+                        parts.append(text)
+                        yield "token", {"text": text}
+                
+                answer = "".join(parts)
+                if answer:
+                    self.response_cache.set(prepared["cache_key"], answer)
+            
+            yield "done", {
+                "debug": {
+                    "product_detected": prepared["product_detected"],
+                    "recommendations_count": len(recommendations),
+                    "cached": cached
+                }
+            }
+            
+        except Exception as e:
+            logger.error(f"Chat streaming error: {str(e)}")
+            yield "error", {
+                "answer": "I'm sorry, I encountered an error processing your request. Please try again.",
+                "debug": {"error": str(e)}
+            }
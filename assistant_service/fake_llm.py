@@ -0,0 +1,112 @@
+"""
+Local stand-in for the Groq client, for tests and benchmarks.
+
+FakeGroq exposes the same `chat.completions.create(...)` surface used by
+AIAssistant, including `stream=True`, and never touches the network.
+FakeAsyncGroq is the awaitable counterpart used by the ASGI service.
+Set FAKE_LLM=1 to make the assistant use it instead of Groq.
+"""
+import time
+import asyncio
+from types import SimpleNamespace
+
+DEFAULT_ANSWER = (
+    "Here are some eco-friendly alternatives worth considering. "
+    "Look for reusable, recycled or plant-based materials and durable products "
+    "that replace single-use items."
+)
+
+
+def _chunk(text):
+    return SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=text), index=0)])
+
+
+def _completion(text):
+    return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=text), index=0)])
+
+
+def split_tokens(text):
+    """Split text into word-sized pieces, keeping the whitespace like a real token stream"""
+    tokens = []
+    start = 0
+    for i in range(1, len(text)):
+        if text[i] == " ":
+            tokens.append(text[start:i])
+            start = i
+    if text:
+        tokens.append(text[start:])
+    return tokens
+
+
+class FakeCompletions:
+    def __init__(self, client):
+        self._client = client
+
+    def create(self, model=None, messages=None, temperature=None, max_tokens=None, stream=False, **kwargs):
+        client = self._client
+        client.call_count += 1
+        client.last_call = {"model": model, "messages": messages, "stream": stream}
+        answer = client.answer(messages) if callable(client.answer) else client.answer
+        tokens = split_tokens(answer)
+
+        if stream:
+            return self._stream(tokens)
+
+        time.sleep(client.first_token_delay + client.token_delay * len(tokens))
+        return _completion(answer)
+
+    def _stream(self, tokens):
+        client = self._client
+        time.sleep(client.first_token_delay)
+        for token in tokens:
+            yield _chunk(token)
+            time.sleep(client.token_delay)
+
+
+class FakeGroq:
+    """
+    Minimal Groq client double.
+    `answer` may be a string or a callable taking the messages list.
+    Delays are in seconds and simulate time-to-first-token and per-token generation.
+    """
+
+    def __init__(self, answer=DEFAULT_ANSWER, first_token_delay=0.0, token_delay=0.0):
+        self.answer = answer
+        self.first_token_delay = first_token_delay
+        self.token_delay = token_delay
+        self.call_count = 0
+        self.last_call = None
+        self.chat = SimpleNamespace(completions=FakeCompletions(self))
+
+
+class FakeAsyncCompletions(FakeCompletions):
+    async def create(self, model=None, messages=None, temperature=None, max_tokens=None, stream=False, **kwargs):
+        client = self._client
+        client.call_count += 1
+        client.last_call = {"model": model, "messages": messages, "stream": stream}
+        answer = client.answer(messages) if callable(client.answer) else client.answer
+        tokens = split_tokens(answer)
+
+        if stream:
+            return self._stream(tokens)
+
+        await asyncio.sleep(client.first_token_delay + client.token_delay * len(tokens))
+        return _completion(answer)
+
+    async def _stream(self, tokens):
+        client = self._client
+        await asyncio.sleep(client.first_token_delay)
+        for token in tokens:
+            yield _chunk(token)
+            await asyncio.sleep(client.token_delay)
+
+
+class FakeAsyncGroq(FakeGroq):
+    """Awaitable variant of FakeGroq (mirrors groq.AsyncGroq)"""
+
+    def __init__(self, answer=DEFAULT_ANSWER, first_token_delay=0.0, token_delay=0.0):
+        super().__init__(answer, first_token_delay, token_delay)
+        self.chat = SimpleNamespace(completions=FakeAsyncCompletions(self))
+
+    async def close(self):
+        pass
@@ -0,0 +1,71 @@
+"""
+gunicorn settings for the AI assistant (run from assistant_service/):
+
+    gunicorn -c gunicorn.conf.py                          # Flask app (app.py), threaded workers
+    ASSISTANT_SERVER=asgi gunicorn -c gunicorn.conf.py    # asyncio app (asgi.py), uvicorn workers
+
+By default every worker answers as soon as it is forked and loads the dataset
+and classifier in a background thread (/health/ready turns 200 when done).
+With ASSISTANT_BACKGROUND_STARTUP=0 they are loaded once in the master
+(preload_app) and shared by the forked workers instead, and nothing is served
+until then. For new code, `../run_all.sh reload` starts a new master
+(`kill -USR2`) and then stops the old one gracefully; `kill -HUP` would only
+re-fork the preloaded code.
+"""
+import os
+import gc
+import sys
+import multiprocessing
+
+SERVER = os.getenv("ASSISTANT_SERVER", "wsgi")
+BACKGROUND_STARTUP = os.getenv("ASSISTANT_BACKGROUND_STARTUP", "1") == "1"
+
+bind = os.getenv("BIND", f"0.0.0.0:{os.getenv('PORT', '5002')}")
+
+# Chats mostly wait on the LLM: a few processes, each with many threads (or one event loop)
+workers = int(os.getenv("GUNICORN_WORKERS", str(min(4, multiprocessing.cpu_count()))))
+threads = int(os.getenv("GUNICORN_THREADS", "16"))
+
+if SERVER == "asgi":
+    wsgi_app = "asgi:app"
+    worker_class = "uvicorn_worker.UvicornWorker"
+else:
+    wsgi_app = "app:app"
+    worker_class = "gthread"
+
+# A loading thread started in the master would not survive the fork
+preload_app = not BACKGROUND_STARTUP
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "120"))
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", "30"))
+keepalive = int(os.getenv("GUNICORN_KEEPALIVE", "5"))
+
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", "0"))
+max_requests_jitter = max(1, max_requests // 10) if max_requests else 0
+
+pidfile = os.getenv("GUNICORN_PIDFILE") or None
+
+ML_MODELS_DIR = os.path.abspath(os.getenv(
+    "ML_MODELS_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "ml_models")
+))
+accesslog = os.getenv("GUNICORN_ACCESSLOG", "-")
+loglevel = os.getenv("GUNICORN_LOGLEVEL", "info")
+
+
+def on_starting(server):
+    # Metric snapshots of the previous run's workers must not be summed in (METRICS_DIR, see ml_models/metrics.py)
+    if ML_MODELS_DIR not in sys.path:
+        sys.path.append(ML_MODELS_DIR)
+    import metrics
+    metrics.clear_directory(os.getenv("METRICS_DIR"))
+
+
+def when_ready(server):
+    if not preload_app:
+        server.log.info(f"Assistant starting in the background ({SERVER}): {workers} workers")
+        return
+    if SERVER == "asgi":
+        # asgi.py loads the assistant in its lifespan startup, i.e. per worker; do it once here
+        import asgi
+        asgi.app.preload()
+    gc.freeze()
+    server.log.info(f"Assistant preloaded ({SERVER}): {workers} workers")
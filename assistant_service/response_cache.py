@@ -0,0 +1,73 @@
+import os
+import re
+import json
+import hashlib
+from cache_store import CacheStore  # ml_models/, put on sys.path by assistant.py
+
+_WHITESPACE_RE = re.compile(r"\s+")
+_EDGE_PUNCTUATION_RE = re.compile(r"^[^\w]+|[^\w]+$")
+
+
+def normalize_message(message):
+    """Lowercase, collapse whitespace and drop leading/trailing punctuation"""
+    text = _WHITESPACE_RE.sub(" ", str(message).lower()).strip()
+    return _EDGE_PUNCTUATION_RE.sub("", text)
+
+
+def make_cache_key(message, product_context=None, **params):
+    """Stable key for a chat request: normalized message + product context + model parameters"""
+    payload = json.dumps(
+        {
+            "message": normalize_message(message),
+            "product_context": product_context or None,
+            "params": params,
+        },
+        sort_keys=True,
+        default=str,
+    )
+    return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+
+class ResponseCache:
+    """
+    In-memory LRU cache with TTL for LLM answers, optionally backed by SQLite
+    so entries survive restarts and are shared between processes.
+    """
+
+    def __init__(self, max_entries=1024, ttl=3600, db_path=None, max_db_entries=100000):
+        self._store = CacheStore(
+            "response_cache", max_entries=max_entries, ttl=ttl, db_path=db_path,
+            max_db_entries=max_db_entries,
+        )
+
+    @classmethod
+    def from_env(cls):
+        """Build a cache from RESPONSE_CACHE_SIZE, RESPONSE_CACHE_TTL and RESPONSE_CACHE_DB"""
+        return cls(
+            max_entries=int(os.getenv('RESPONSE_CACHE_SIZE', '1024')),
+            ttl=float(os.getenv('RESPONSE_CACHE_TTL', '3600')),
+            db_path=os.getenv('RESPONSE_CACHE_DB') or None,
+        )
+
+    def get(self, key):
+        """Return the cached value or None"""
+        return self._store.get(key)
+
+    def set(self, key, value):
+        self._store.set(key, value)
+
+    def clear(self):
+        self._store.clear()
+
+    def stats(self):
+        stats = self._store.stats()
+        return {
+            "entries": stats["entries"],
+            "max_entries": stats["max_entries"],
+            "ttl_seconds": stats["ttl_seconds"],
+            "persistent": stats["shared"],
+            "hits": stats["hits"],
+            "disk_hits": stats["shared_hits"],
+            "misses": stats["misses"],
+            "hit_rate": stats["hit_rate"],
+        }
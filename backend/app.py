@@ -4,11 +4,13 @@ from routes.predict_routes import predict_bp
 from routes.health_routes import health_bp
 from routes.product_routes import product_bp
 from routes.recommend_routes import recommend_bp  # 👈 new route
+from services.instrumentation import init_metrics, install_profiler
 
 
 def create_app():
     app = Flask(__name__)
-    CORS(app, resources={r"/api/*": {"origins": "*"}}, supports_credentials=False)
+    # The admin endpoints (/api/admin/profiling) are not opened to other origins
+    CORS(app, resources={r"/api/(?!admin/).*": {"origins": "*"}}, supports_credentials=False)
 
     # Default route to avoid 404 on "/"
     @app.route("/")
@@ -19,7 +21,12 @@ def create_app():
                 "/api/health",
                 "/api/products",
                 "/api/predict",
-                "/api/recommend"
+                "/api/predict/batch",
+                "/api/predict/cache/stats",
+                "/api/recommend",
+                "/api/recommend/cache/stats",
+                "/api/metrics",
+                "/api/admin/profiling"
             ]
         })
 
@@ -29,6 +36,11 @@ def create_app():
     app.register_blueprint(product_bp, url_prefix="/api")
     app.register_blueprint(recommend_bp, url_prefix="/api")  # 👈 register recommend
 
+    # Request counters, latency histograms and GET /api/metrics (Prometheus)
+    init_metrics(app)
+    # Opt-in cProfile / slow-request stack sampling (PROFILE_* settings, toggled at /api/admin/profiling)
+    install_profiler(app)
+
     return app
 
 
@@ -0,0 +1,59 @@
+"""
+gunicorn settings for the backend (run from backend/):
+
+    gunicorn -c gunicorn.conf.py
+
+The app is preloaded in the master and then forked, so workers share the
+loaded model and catalog. New model artifacts and catalog edits are picked up
+by the running workers (MODEL_RELOAD_INTERVAL, CATALOG_RELOAD_INTERVAL).
+
+New code needs a new master: `kill -HUP` only re-forks the workers from the
+code the master already loaded. `kill -USR2 $(cat $GUNICORN_PIDFILE)` starts
+a new master next to the old one (it writes $GUNICORN_PIDFILE.2 once up), then
+`kill -TERM` the old master to stop it gracefully; `../run_all.sh reload`
+does both.
+"""
+import os
+import gc
+import sys
+import multiprocessing
+
+wsgi_app = "wsgi:app"
+bind = os.getenv("BIND", f"0.0.0.0:{os.getenv('PORT', '5001')}")
+
+# Requests are CPU bound (vectorizing, ranking): about one process per core
+workers = int(os.getenv("GUNICORN_WORKERS", str(multiprocessing.cpu_count())))
+threads = int(os.getenv("GUNICORN_THREADS", "2"))
+worker_class = "gthread" if threads > 1 else "sync"
+
+preload_app = True
+timeout = int(os.getenv("GUNICORN_TIMEOUT", "60"))
+graceful_timeout = int(os.getenv("GUNICORN_GRACEFUL_TIMEOUT", "30"))
+keepalive = int(os.getenv("GUNICORN_KEEPALIVE", "5"))
+
+# Recycle workers after this many requests (0 disables), jittered so they don't restart together
+max_requests = int(os.getenv("GUNICORN_MAX_REQUESTS", "0"))
+max_requests_jitter = max(1, max_requests // 10) if max_requests else 0
+
+pidfile = os.getenv("GUNICORN_PIDFILE") or None
+
+ML_MODELS_DIR = os.path.abspath(os.getenv(
+    "ML_MODELS_DIR", os.path.join(os.path.dirname(os.path.abspath(__file__)), "..", "ml_models")
+))
+accesslog = os.getenv("GUNICORN_ACCESSLOG", "-")
+loglevel = os.getenv("GUNICORN_LOGLEVEL", "info")
+
+
+def on_starting(server):
+    # Metric snapshots of the previous run's workers must not be summed in (METRICS_DIR, see ml_models/metrics.py)
+    if ML_MODELS_DIR not in sys.path:
+        sys.path.append(ML_MODELS_DIR)
+    import metrics
+    metrics.clear_directory(os.getenv("METRICS_DIR"))
+
+
+def when_ready(server):
+    # Everything loaded so far is long-lived: keep the garbage collector from
+    # touching (and so copying) those pages in every worker
+    gc.freeze()
+    server.log.info(f"Backend preloaded: {workers} workers x {threads} threads")
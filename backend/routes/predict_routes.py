@@ -1,18 +1,11 @@
+import math
 from flask import Blueprint, request, jsonify
-import joblib
-import os
 from services.recommend import recommend_alternatives
+from services.predict import predict_eco, predict_many, prediction_cache
+from metrics import timed
 
 predict_bp = Blueprint("predict", __name__)
 
-# Load model and vectorizer
-BASE_DIR = os.path.dirname(os.path.dirname(__file__))  # backend/
-MODEL_PATH = os.path.join(BASE_DIR, "..", "ml_models", "eco_model.pkl")
-VECTORIZER_PATH = os.path.join(BASE_DIR, "..", "ml_models", "vectorizer.pkl")
-
-model = joblib.load(MODEL_PATH)
-vectorizer = joblib.load(VECTORIZER_PATH)
-
 # Map labels to messages
 LABEL_MESSAGES = {
     0: "Harmful ⚠️",
@@ -20,6 +13,20 @@ LABEL_MESSAGES = {
     2: "Eco-friendly ✅"
 }
 
+# Upper bound on items accepted by /predict/batch
+MAX_BATCH_SIZE = 1000
+
+def _parse_price(value):
+    """Price as a finite float, or None (booleans and non-numeric strings are rejected)"""
+    if isinstance(value, bool):
+        return None
+    try:
+        price = float(value)
+    except (TypeError, ValueError):
+        return None
+    return price if math.isfinite(price) else None
+
+
 @predict_bp.route("/predict", methods=["POST"])
 def predict():
     """
@@ -34,12 +41,13 @@ def predict():
             return jsonify({"error": "Invalid request. Provide title, price and categoryName."}), 400
 
         title = data["title"]
-        price = float(data["price"])
+        price = _parse_price(data["price"])
+        if price is None:
+            return jsonify({"error": "Invalid price. Provide a number."}), 400
         category_name = data["categoryName"]
 
-        # Vectorize input and predict
-        features = vectorizer.transform([title])
-        prediction = int(model.predict(features)[0])  # 0=Harmful, 1=Moderate, 2=Eco-friendly
+        # Score the title (cached per normalized title and model version)
+        prediction, _ = predict_eco(title)  # 0=Harmful, 1=Moderate, 2=Eco-friendly
 
         response = {
             "title": title,
@@ -51,10 +59,78 @@ def predict():
 
         # If harmful or moderate → fetch recommendations
         if prediction in [0, 1]:
-            recommendations = recommend_alternatives(title, price, category_name)
+            with timed("recommend"):
+                recommendations = recommend_alternatives(title, price, category_name)
             response["recommendations"] = recommendations
 
         return jsonify(response), 200
 
     except Exception as e:
-        return jsonify({"error": str(e)}), 500
\ No newline at end of file
+        return jsonify({"error": str(e)}), 500
+
+
+@predict_bp.route("/predict/batch", methods=["POST"])
+def predict_batch():
+    """
+    Score many products in one request.
+    Titles not in the prediction cache are vectorized as one sparse matrix
+    and scored with a single predict_proba call.
+    Request JSON: {
+        "items": [{ "title": "...", "price": 25, "categoryName": "..." }, ...],
+        "include_recommendations": false
+    }
+    """
+    try:
+        data = request.get_json()
+
+        if not data or not isinstance(data.get("items"), list) or not data["items"]:
+            return jsonify({"error": "Invalid request. Provide a non-empty items list."}), 400
+
+        items = data["items"]
+        if len(items) > MAX_BATCH_SIZE:
+            return jsonify({"error": f"Too many items. Maximum batch size is {MAX_BATCH_SIZE}."}), 400
+
+        prices = []
+        for i, item in enumerate(items):
+            if not isinstance(item, dict) or "title" not in item or "price" not in item or "categoryName" not in item:
+                return jsonify({"error": f"Invalid item at index {i}. Provide title, price and categoryName."}), 400
+            price = _parse_price(item["price"])
+            if price is None:
+                return jsonify({"error": f"Invalid price at index {i}. Provide a number."}), 400
+            prices.append(price)
+
+        include_recommendations = data.get("include_recommendations", False)
+        if not isinstance(include_recommendations, bool):
+            return jsonify({"error": "Invalid include_recommendations. Provide true or false."}), 400
+
+        titles = [str(item["title"]) for item in items]
+
+        # Vectorize and score the whole batch at once
+        predictions, confidences = predict_many(titles)
+
+        results = []
+        for item, title, price, prediction, confidence in zip(items, titles, prices, predictions, confidences):
+            prediction = int(prediction)
+            result = {
+                "title": title,
+                "price": price,
+                "categoryName": item["categoryName"],
+                "eco_label": prediction,
+                "confidence": float(confidence),
+                "message": LABEL_MESSAGES[prediction]
+            }
+            if include_recommendations and prediction in [0, 1]:
+                with timed("recommend"):
+                    result["recommendations"] = recommend_alternatives(title, price, item["categoryName"])
+            results.append(result)
+
+        return jsonify({"results": results, "count": len(results)}), 200
+
+    except Exception as e:
+        return jsonify({"error": str(e)}), 500
+
+
+@predict_bp.route("/predict/cache/stats", methods=["GET"])
+def prediction_cache_stats():
+    """Prediction cache counters (hit rate, size) for sizing PREDICTION_CACHE_SIZE"""
+    return jsonify(prediction_cache.stats()), 200
@@ -1,27 +1,137 @@
-from flask import Blueprint, jsonify
-import os
-import pandas as pd
+from flask import Blueprint, jsonify, request, current_app, Response
+from services.product_store import PRODUCTS_PATH, get_catalog, get_eco_labels, filter_positions, get_page
+from metrics import timed
 
 # Blueprint for product routes
 product_bp = Blueprint("products", __name__)
 
-# Path to products.csv (pointing to finalwebsite.csv for consistency)
-BASE_DIR = os.path.dirname(os.path.dirname(__file__))  # backend/
-PRODUCTS_PATH = os.path.join(BASE_DIR, "data", "finalwebsite.csv")
+MAX_LIMIT = 1000
+
+# Precomputed per row (ml_models/catalog_scoring.py), added to every product
+ECO_FIELDS = ("EcoLabel", "EcoConfidence")
+
+
+def _parse_float(name):
+    value = request.args.get(name)
+    return float(value) if value not in (None, "") else None
+
+
+def _parse_query():
+    """
+    Read pagination, filter and projection parameters from the query string.
+    Raises ValueError on malformed values.
+    """
+    limit = request.args.get("limit")
+    limit = int(limit) if limit not in (None, "") else None
+    offset = int(request.args.get("offset") or 0)
+    if offset < 0 or (limit is not None and not 0 < limit <= MAX_LIMIT):
+        raise ValueError(f"limit must be 1-{MAX_LIMIT} and offset >= 0")
+
+    fields = request.args.get("fields")
+    fields = tuple(f.strip() for f in fields.split(",") if f.strip()) if fields else None
+
+    eco_label = request.args.get("eco_label")
+    eco_label = int(eco_label) if eco_label not in (None, "") else None
+    if eco_label is not None and eco_label not in (0, 1, 2):
+        raise ValueError("eco_label must be 0, 1 or 2")
+
+    return {
+        "limit": limit,
+        "offset": offset,
+        "category": request.args.get("category") or None,
+        "search": (request.args.get("search") or "").strip() or None,
+        "asin": request.args.get("asin") or None,
+        "min_price": _parse_float("min_price"),
+        "max_price": _parse_float("max_price"),
+        "min_stars": _parse_float("min_stars"),
+        "eco_label": eco_label,
+        "fields": fields,
+    }
 
 
 @product_bp.route("/products", methods=["GET"])
 def get_products():
     """
-    Fetch all products from finalwebsite.csv and return as JSON.
+    Fetch products from finalwebsite.csv and return as JSON.
+    Query params (all optional):
+      limit, offset            -> pagination (no limit returns every match)
+      category                 -> exact category name (case-insensitive)
+      search                   -> text contained in the title or category name (case-insensitive)
+      asin                     -> a single product
+      min_price, max_price     -> price range (inclusive)
+      min_stars                -> minimum rating
+      eco_label                -> 0 (harmful), 1 (moderate) or 2 (eco-friendly)
+      fields                   -> comma-separated columns to return
+    Products carry their precomputed EcoLabel and EcoConfidence.
+    Responses carry an ETag; send it back as If-None-Match to get a 304.
     """
     try:
-        df = pd.read_csv(PRODUCTS_PATH)
+        try:
+            query = _parse_query()
+        except ValueError as e:
+            return jsonify({"error": f"Invalid query parameters: {e}"}), 400
+
+        version, catalog = get_catalog(PRODUCTS_PATH)
+        model_version, eco_labels, confidences = get_eco_labels(catalog)
+
+        if query["fields"]:
+            unknown = [f for f in query["fields"] if f not in catalog.columns and f not in ECO_FIELDS]
+            if unknown:
+                return jsonify({"error": f"Unknown fields: {', '.join(unknown)}"}), 400
+
+        def build():
+            with timed("catalog_filter"):
+                positions = filter_positions(
+                    catalog,
+                    category=query["category"],
+                    min_price=query["min_price"],
+                    max_price=query["max_price"],
+                    min_stars=query["min_stars"],
+                    eco_label=query["eco_label"],
+                    eco_labels=eco_labels,
+                    search=query["search"],
+                    asin=query["asin"],
+                )
+            start = query["offset"]
+            end = len(positions) if query["limit"] is None else start + query["limit"]
+            page_positions = positions[start:end]
+
+            fields = query["fields"]
+            columns = [f for f in fields if f not in ECO_FIELDS] if fields else None
+            if columns == []:
+                page = [{} for _ in page_positions]
+            else:
+                with timed("catalog_records"):
+                    page = catalog.records(page_positions, fields=columns)
+            if eco_labels is not None:
+                eco_values = {
+                    "EcoLabel": eco_labels[page_positions].tolist(),
+                    "EcoConfidence": confidences[page_positions].tolist(),
+                }
+                for name in ECO_FIELDS:
+                    if fields and name not in fields:
+                        continue
+                    for record, value in zip(page, eco_values[name]):
+                        record[name] = value
+
+            payload = {
+                "products": page,
+                "total": int(len(positions)),
+                "offset": start,
+                "limit": query["limit"],
+                "next_offset": end if end < len(positions) else None,
+            }
+            return current_app.json.dumps(payload)
 
-        # Convert DataFrame to list of dicts
-        products = df.to_dict(orient="records")
+        key = (tuple(sorted(query.items())), model_version)
+        etag, body = get_page(version, key, build)
 
-        return jsonify({"products": products}), 200
+        if request.if_none_match.contains(etag):
+            response = Response(status=304)
+        else:
+            response = Response(body, status=200, mimetype="application/json")
+        response.set_etag(etag)
+        return response
 
     except FileNotFoundError:
         return jsonify({"error": "finalwebsite.csv not found"}), 404
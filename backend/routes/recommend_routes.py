@@ -1,5 +1,5 @@
 from flask import Blueprint, request, jsonify
-from services.recommend import recommend_alternatives
+from services.recommend import recommend_alternatives, recommendation_cache
 
 recommend_bp = Blueprint("recommend", __name__)
 
@@ -25,4 +25,10 @@ def recommend():
         return jsonify({"recommendations": recommendations}), 200
 
     except Exception as e:
-        return jsonify({"error": str(e)}), 500
\ No newline at end of file
+        return jsonify({"error": str(e)}), 500
+
+
+@recommend_bp.route("/recommend/cache/stats", methods=["GET"])
+def recommendation_cache_stats():
+    """Recommendation cache counters (hits, coalesced lookups) for sizing RECOMMEND_CACHE_SIZE"""
+    return jsonify(recommendation_cache.stats()), 200
\ No newline at end of file
@@ -0,0 +1,65 @@
+import os
+import logging
+import threading
+import numpy as np
+from services.model_registry import get_models
+from catalog_scoring import labels_path, read_labels, write_labels, score_catalog
+from metrics import timed
+
+logger = logging.getLogger(__name__)
+
+_lock = threading.Lock()
+_cache = {}
+
+
+def _score_with(bundle):
+    def score(titles):
+        probabilities = bundle.model.predict_proba(bundle.transform(titles))
+        best = probabilities.argmax(axis=1)
+        return bundle.model.classes_[best], probabilities[np.arange(len(titles)), best]
+    return score
+
+
+def _labels_mtime(path):
+    try:
+        return os.path.getmtime(path)
+    except OSError:
+        return None
+
+
+def get_labels(catalog_path: str, catalog_version, load_rows, bundle=None):
+    """
+    (eco_labels, confidences) arrays aligned with the catalog rows, read from the
+    precomputed labels file (ml_models/catalog_scoring.py). Rows that are missing,
+    whose title changed, or that were scored by another model version are scored
+    here, and the file is updated so other workers reuse them.
+    `load_rows()` returns the catalog's (asins, titles); it is only called when
+    the labels are not cached yet.
+    """
+    bundle = bundle or get_models()
+    path = labels_path(catalog_path)
+    key = (catalog_version, bundle.version, _labels_mtime(path))
+
+    cached = _cache.get(catalog_path)
+    if cached is not None and cached[0] == key:
+        return cached[1], cached[2]
+
+    with _lock:
+        cached = _cache.get(catalog_path)
+        if cached is not None and cached[0] == key:
+            return cached[1], cached[2]
+
+        asins, titles = load_rows()
+        with timed("catalog_scoring"):
+            labels, scored = score_catalog(asins, titles, bundle.version, _score_with(bundle), read_labels(path))
+        if scored:
+            logger.info(f"Scored {scored} catalog rows on demand (precompute with ml_models/catalog_scoring.py)")
+            try:
+                write_labels(labels, path)
+            except OSError as e:
+                logger.warning(f"Could not update {path}: {str(e)}")
+
+        eco_labels = labels["EcoLabel"].to_numpy()
+        confidences = labels["EcoConfidence"].to_numpy()
+        _cache[catalog_path] = ((catalog_version, bundle.version, _labels_mtime(path)), eco_labels, confidences)
+        return eco_labels, confidences
@@ -0,0 +1,39 @@
+import logging
+from services.model_registry import get_models  # also puts ml_models/ on sys.path
+from services.predict import prediction_cache
+from services.recommend import recommendation_cache
+from services.product_store import get_catalog, page_cache
+from metrics import REGISTRY, cache_samples, instrument_flask
+from profiling import install_profiler  # noqa: F401  (re-exported for app.py)
+
+logger = logging.getLogger(__name__)
+
+
+def _backend_samples():
+    """Prediction/recommendation/page cache counters, model version and catalog version at scrape time"""
+    samples = cache_samples("prediction", prediction_cache.stats())
+    samples.extend(cache_samples("product_pages", page_cache.stats()))
+    recommendation_stats = recommendation_cache.stats()
+    samples.extend(cache_samples("recommendations", recommendation_stats))
+    samples.append(("cache_coalesced_total", "counter", "Lookups that waited for an identical one in flight",
+                    [({"cache": "recommendations"}, recommendation_stats["coalesced"])]))
+
+    try:
+        version = get_models().version
+        samples.append(("model_info", "gauge", "Model version being served", [({"version": version}, 1)]))
+    except Exception as e:
+        logger.error(f"Model version unavailable for metrics: {str(e)}")
+
+    try:
+        version, catalog = get_catalog()
+        samples.append(("catalog_info", "gauge", "Catalog version being served", [({"version": version}, 1)]))
+        samples.append(("catalog_rows", "gauge", "Products in the catalog", [({}, len(catalog))]))
+    except FileNotFoundError:
+        pass
+    return samples
+
+
+def init_metrics(app):
+    """Instrument the backend app and serve GET /api/metrics"""
+    REGISTRY.add_collector(_backend_samples)
+    return instrument_flask(app)
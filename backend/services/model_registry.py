@@ -0,0 +1,187 @@
+import os
+import sys
+import time
+import logging
+import threading
+from collections import namedtuple
+import joblib
+
+logger = logging.getLogger(__name__)
+
+# Paths point to root/ml_models (override with ML_MODELS_DIR)
+BASE_DIR = os.path.dirname(os.path.dirname(__file__))  # backend/
+ML_MODELS_DIR = os.path.abspath(os.getenv("ML_MODELS_DIR", os.path.join(BASE_DIR, "..", "ml_models")))
+MODEL_PATH = os.path.join(ML_MODELS_DIR, "eco_model.pkl")
+VECTORIZER_PATH = os.path.join(ML_MODELS_DIR, "vectorizer.pkl")
+
+# Shared preprocessing lives next to the training code in ml_models/
+if ML_MODELS_DIR not in sys.path:
+    sys.path.append(ML_MODELS_DIR)
+
+from text_preprocessing import check_preprocessing, clean_texts  # noqa: E402
+from artifact_store import read_manifest, served_version  # noqa: E402
+from eco_inference import EcoInferenceEngine  # noqa: E402
+from metrics import timed  # noqa: E402
+
+# MODEL_MMAP=1 memory-maps numpy arrays so forked workers share the pages
+MMAP_MODE = "r" if os.getenv("MODEL_MMAP", "0") == "1" else None
+
+# Seconds between checks for new artifacts on disk (0 disables hot-reload)
+RELOAD_INTERVAL = float(os.getenv("MODEL_RELOAD_INTERVAL", "5"))
+
+# Single titles are scored by the sklearn-free engine when a compact export is published
+# (FAST_INFERENCE=0 forces the sklearn path)
+FAST_INFERENCE = os.getenv("FAST_INFERENCE", "1") == "1"
+
+
+class ModelBundle(namedtuple("ModelBundle", ["version", "model", "vectorizer", "engine"], defaults=(None,))):
+    __slots__ = ()
+
+    def transform(self, titles):
+        """Clean titles exactly like train_model.py does, then vectorize"""
+        with timed("vectorize"):
+            return self.vectorizer.transform(clean_texts(titles))
+
+    def predict_one(self, title):
+        """(eco_label, confidence) for one title"""
+        if self.engine is not None:
+            # The engine vectorizes and scores in one pass
+            with timed("inference"):
+                label, confidence = self.engine.predict_one(title)
+            return int(label), confidence
+        features = self.transform([title])
+        with timed("inference"):
+            proba = self.model.predict_proba(features)[0]
+        best = proba.argmax()
+        return int(self.model.classes_[best]), float(proba[best])
+
+
+# Held for a whole reload (loading, hooks, swap)
+_lock = threading.Lock()
+_bundle = None
+_last_check = 0.0
+_reload_hooks = []
+_reload_thread = None
+_reload_thread_lock = threading.Lock()
+
+
+def _current_artifacts():
+    """
+    (version, model_path, vectorizer_path, compact_path, preprocessing) of the
+    artifacts to serve. A published manifest (artifact_store.publish_artifacts)
+    names a consistent versioned set and the preprocessing it was trained with;
+    otherwise the plain .pkl files are versioned by mtime, there is no compact
+    export and the preprocessing is text_preprocessing.DEFAULT_MODE (None).
+    """
+    manifest = read_manifest(ML_MODELS_DIR)
+    if manifest:
+        compact = manifest.get("compact")
+        return (
+            manifest["version"],
+            os.path.join(ML_MODELS_DIR, manifest["model"]),
+            os.path.join(ML_MODELS_DIR, manifest["vectorizer"]),
+            os.path.join(ML_MODELS_DIR, compact) if compact else None,
+            manifest.get("preprocessing"),
+        )
+    return served_version(ML_MODELS_DIR), MODEL_PATH, VECTORIZER_PATH, None, None
+
+
+def _load_engine(compact_path):
+    if not FAST_INFERENCE or not compact_path:
+        return None
+    try:
+        return EcoInferenceEngine.load(compact_path)
+    except Exception as e:
+        logger.error(f"Failed to load compact model, scoring with sklearn: {str(e)}")
+        return None
+
+
+def _load_bundle():
+    version, model_path, vectorizer_path, compact_path, preprocessing = _current_artifacts()
+    # A model trained on differently cleaned titles must not be served (raises PreprocessingMismatch)
+    check_preprocessing(preprocessing, what=f"model {version}")
+    model = joblib.load(model_path, mmap_mode=MMAP_MODE)
+    vectorizer = joblib.load(vectorizer_path, mmap_mode=MMAP_MODE)
+    return ModelBundle(version, model, vectorizer, _load_engine(compact_path))
+
+
+def register_reload_hook(hook):
+    """
+    Call `hook(bundle)` with every new model version, before requests see it
+    (rebuild whatever depends on the model there, then swap it in).
+    """
+    _reload_hooks.append(hook)
+
+
+def reload(force: bool = False):
+    """
+    Load the artifacts again if they changed on disk (or always with force=True).
+    The reload hooks run with the new bundle first, then it is swapped in
+    atomically: requests keep the old bundle (and the indexes built for it)
+    until everything is ready. Returns the current bundle.
+    """
+    global _bundle, _last_check
+    with _lock:
+        _last_check = time.monotonic()
+        if not force and _bundle is not None:
+            try:
+                if _current_artifacts()[0] == _bundle.version:
+                    return _bundle
+            except OSError:
+                # Artifacts are being replaced; keep serving the current ones
+                return _bundle
+
+        try:
+            bundle = _load_bundle()
+        except Exception as e:
+            if _bundle is None:
+                raise
+            logger.error(f"Failed to load new model artifacts, keeping {_bundle.version}: {str(e)}")
+            return _bundle
+
+        previous = _bundle
+        if previous is None:
+            # First load: nothing is served yet, and hooks may call get_models()
+            _bundle = bundle
+        _run_hooks(bundle)
+        _bundle = bundle
+
+    if previous is not None:
+        logger.info(f"Model reloaded: {previous.version} -> {bundle.version}")
+    return bundle
+
+
+def _run_hooks(bundle):
+    for hook in _reload_hooks:
+        try:
+            hook(bundle)
+        except Exception as e:
+            logger.error(f"Model reload hook failed: {str(e)}")
+
+
+def _reload_in_background():
+    """Check for new artifacts (and run the hooks) in a thread, so no request waits for it"""
+    global _last_check, _reload_thread
+    with _reload_thread_lock:
+        if _reload_thread is not None and _reload_thread.is_alive():
+            return
+        _last_check = time.monotonic()
+        _reload_thread = threading.Thread(target=reload, name="model-reload", daemon=True)
+        _reload_thread.start()
+
+
+def get_models():
+    """
+    Return the current ModelBundle. At most every RELOAD_INTERVAL seconds a
+    background check picks up new artifacts; this call never waits for it.
+    """
+    bundle = _bundle
+    if bundle is None:
+        return reload()
+    if RELOAD_INTERVAL > 0 and time.monotonic() - _last_check >= RELOAD_INTERVAL:
+        _reload_in_background()
+    return bundle
+
+
+def model_version():
+    return get_models().version
@@ -1,21 +1,44 @@
-import joblib
-import os
+from services.model_registry import get_models, register_reload_hook
+from services.prediction_cache import PredictionCache
+from metrics import timed
 
-# Paths point to root/ml_models
-BASE_PATH = os.path.abspath(os.path.join(os.path.dirname(__file__), "../../ml_models"))
-MODEL_PATH = os.path.join(BASE_PATH, "eco_model.pkl")
-VECTORIZER_PATH = os.path.join(BASE_PATH, "vectorizer.pkl")
+# Repeated titles skip vectorizing and scoring (entries are per model version)
+prediction_cache = PredictionCache.from_env()
+register_reload_hook(lambda bundle: prediction_cache.invalidate(bundle.version))
 
-# Load once on startup
-vectorizer = joblib.load(VECTORIZER_PATH)
-model = joblib.load(MODEL_PATH)
 
 def predict_eco(description: str):
     """Predict eco-friendliness of a product description.
     Returns: (eco_label, confidence)
         eco_label: 0 = Harmful, 1 = Moderate, 2 = Eco-friendly
     """
-    X = vectorizer.transform([description])
-    eco_label = int(model.predict(X)[0])  # 0, 1, or 2
-    confidence = float(model.predict_proba(X).max())
-    return eco_label, confidence
\ No newline at end of file
+    bundle = get_models()
+    cached = prediction_cache.get(description, bundle.version)
+    if cached is not None:
+        return cached
+
+    result = bundle.predict_one(description)
+    prediction_cache.set(description, bundle.version, result)
+    return result
+
+
+def predict_many(titles):
+    """
+    (eco_labels, confidences) for many titles. Cache misses are vectorized
+    and scored together in one predict_proba call.
+    """
+    bundle = get_models()
+    results = [prediction_cache.get(title, bundle.version) for title in titles]
+    missing = [i for i, result in enumerate(results) if result is None]
+
+    if missing:
+        features = bundle.transform([titles[i] for i in missing])
+        with timed("inference"):
+            probabilities = bundle.model.predict_proba(features)
+        best = probabilities.argmax(axis=1)
+        for row, i in enumerate(missing):
+            result = (int(bundle.model.classes_[best[row]]), float(probabilities[row, best[row]]))
+            prediction_cache.set(titles[i], bundle.version, result)
+            results[i] = result
+
+    return [label for label, _ in results], [confidence for _, confidence in results]
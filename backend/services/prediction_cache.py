@@ -0,0 +1,59 @@
+import os
+import re
+import hashlib
+from services.model_registry import ML_MODELS_DIR  # noqa: F401  (puts ml_models/ on sys.path)
+from cache_store import CacheStore
+
+_WHITESPACE_RE = re.compile(r"\s+")
+
+
+def normalize_title(title):
+    """Lowercase and collapse whitespace (the model's cleaning does the same first)"""
+    return _WHITESPACE_RE.sub(" ", str(title).lower()).strip()
+
+
+def title_key(title):
+    return hashlib.sha1(normalize_title(title).encode("utf-8")).hexdigest()
+
+
+class PredictionCache:
+    """
+    LRU cache with TTL of (eco_label, confidence) per normalized title, for one
+    model version at a time. Optionally backed by SQLite so workers share hits.
+    """
+
+    def __init__(self, max_entries=10000, ttl=86400, db_path=None, max_db_entries=1000000):
+        self._store = CacheStore(
+            "prediction_cache", max_entries=max_entries, ttl=ttl, db_path=db_path,
+            max_db_entries=max_db_entries, prune_every=1000,
+        )
+
+    @classmethod
+    def from_env(cls):
+        """Build a cache from PREDICTION_CACHE_SIZE, PREDICTION_CACHE_TTL and PREDICTION_CACHE_DB"""
+        return cls(
+            max_entries=int(os.getenv("PREDICTION_CACHE_SIZE", "10000")),
+            ttl=float(os.getenv("PREDICTION_CACHE_TTL", "86400")),
+            db_path=os.getenv("PREDICTION_CACHE_DB") or None,
+        )
+
+    @property
+    def enabled(self):
+        return self._store.enabled
+
+    def get(self, title, version):
+        """Cached (eco_label, confidence) for this title and model version, or None"""
+        value = self._store.get(title_key(title), namespace=version)
+        return None if value is None else (int(value[0]), float(value[1]))
+
+    def set(self, title, version, value):
+        self._store.set(title_key(title), (int(value[0]), float(value[1])), namespace=version)
+
+    def invalidate(self, version=None):
+        """Forget every entry (a new model version was loaded)"""
+        self._store.invalidate(version)
+
+    def stats(self):
+        stats = self._store.stats()
+        stats["model_version"] = stats.pop("namespace")
+        return stats
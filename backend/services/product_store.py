@@ -0,0 +1,95 @@
+import os
+import hashlib
+import logging
+import numpy as np
+from services.model_registry import get_models  # also puts ml_models/ on sys.path
+from services.catalog_labels import get_labels
+from catalog_store import open_catalog
+from cache_store import CacheStore
+
+logger = logging.getLogger(__name__)
+
+# Paths (PRODUCTS_PATH overrides the catalog CSV, e.g. a scaled one for benchmarks)
+BASE_DIR = os.path.dirname(os.path.dirname(__file__))  # backend/
+PRODUCTS_PATH = os.getenv("PRODUCTS_PATH", os.path.join(BASE_DIR, "data", "finalwebsite.csv"))
+
+# Serialized pages kept for the current catalog version (query key -> (etag, body))
+MAX_CACHED_PAGES = 256
+
+page_cache = CacheStore("product_pages", max_entries=MAX_CACHED_PAGES, ttl=0)
+
+
+def get_catalog(path: str = PRODUCTS_PATH):
+    """
+    Return (version, ColumnarCatalog) for the catalog.
+    The CSV is converted to memory-mapped columns once (shared by every worker)
+    and only again when it changes.
+    Raises FileNotFoundError if the catalog is missing.
+    """
+    catalog = open_catalog(path)
+    return catalog.version, catalog
+
+
+def get_eco_labels(catalog, path: str = PRODUCTS_PATH):
+    """
+    (model_version, eco_labels, confidences) for every catalog row, from the
+    precomputed labels; (None, None, None) if no model can be loaded.
+    """
+    try:
+        bundle = get_models()
+        eco_labels, confidences = get_labels(
+            path, catalog.version, lambda: (catalog["asin"].take(), catalog["title"].take()), bundle
+        )
+        return bundle.version, eco_labels, confidences
+    except Exception as e:
+        logger.error(f"Eco labels unavailable for the catalog: {str(e)}")
+        return None, None, None
+
+
+def filter_positions(catalog, category=None, min_price=None, max_price=None, min_stars=None,
+                     eco_label=None, eco_labels=None, search=None, asin=None):
+    """Return the row positions matching all given filters (None means no filter)."""
+    mask = np.ones(len(catalog), dtype=bool)
+    if category:
+        codes = catalog["categoryName"].code_of(category, case_sensitive=False)
+        mask &= np.isin(catalog["categoryName"].codes, codes)
+    if asin:
+        mask &= np.fromiter((value == asin for value in catalog["asin"].take()), dtype=bool, count=len(catalog))
+    if search:
+        # Case-insensitive substring of the title or the category name
+        needle = search.lower()
+        column = catalog["categoryName"]
+        codes = [i for i, name in enumerate(column.categories) if needle in name.lower()]
+        in_title = np.fromiter(
+            (isinstance(title, str) and needle in title.lower() for title in catalog["title"].take()),
+            dtype=bool, count=len(catalog),
+        )
+        mask &= in_title | np.isin(column.codes, codes)
+    if min_price is not None:
+        mask &= catalog.numeric("price") >= min_price
+    if max_price is not None:
+        mask &= catalog.numeric("price") <= max_price
+    if min_stars is not None:
+        mask &= catalog.numeric("stars") >= min_stars
+    if eco_label is not None:
+        if eco_labels is None:
+            return np.empty(0, dtype=np.int64)
+        mask &= eco_labels == eco_label
+    return mask.nonzero()[0]
+
+
+def get_page(version, key, build):
+    """
+    Return (etag, body) for a serialized page of the given catalog version.
+    `build` is called on a miss and must return the serialized body; results are
+    kept per catalog version so repeated queries skip filtering and serialization.
+    """
+    cached = page_cache.get(key, namespace=version)
+    if cached is not None:
+        return cached
+
+    body = build()
+    etag = hashlib.sha1(body.encode("utf-8")).hexdigest()
+    # Dropped by the cache if the catalog was reloaded while building
+    page_cache.set(key, (etag, body), namespace=version)
+    return etag, body
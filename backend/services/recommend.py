@@ -1,53 +1,307 @@
 import os
+import bisect
+import logging
+import time
+import threading
+from collections import namedtuple
+import numpy as np
 import pandas as pd
-import joblib
+from sklearn.preprocessing import normalize
+from services.model_registry import ML_MODELS_DIR, get_models, register_reload_hook
+from ann_index import AnnIndex
+from catalog_store import open_catalog, fingerprint
+from services.catalog_labels import get_labels
+from services.product_store import PRODUCTS_PATH
+from services.prediction_cache import normalize_title
+from services.recommendation_cache import RecommendationCache
+from metrics import timed
 
-# Paths
-BASE_DIR = os.path.dirname(os.path.dirname(__file__))  # backend/
-PRODUCTS_PATH = os.path.join(BASE_DIR, "data", "finalwebsite.csv")
-MODEL_PATH = os.path.join(BASE_DIR, "..", "ml_models", "eco_model.pkl")
-VECTORIZER_PATH = os.path.join(BASE_DIR, "..", "ml_models", "vectorizer.pkl")
+logger = logging.getLogger(__name__)
 
-# Load model and vectorizer once
-model = joblib.load(MODEL_PATH)
-vectorizer = joblib.load(VECTORIZER_PATH)
+# Load dataset once (memory-mapped columnar copy of the CSV)
+_catalog = open_catalog(PRODUCTS_PATH)
+df = _catalog.to_frame()
+df_path = PRODUCTS_PATH
+# Fingerprint of the CSV the index was built from (catalog_store.fingerprint)
+_catalog_version = _catalog.version
 
-# Load dataset once
-df = pd.read_csv(PRODUCTS_PATH)
+# Seconds between checks for catalog edits, which rebuild the index (0 disables)
+CATALOG_RELOAD_INTERVAL = float(os.getenv("CATALOG_RELOAD_INTERVAL", "5"))
+_last_catalog_check = time.monotonic()
+_catalog_thread = None
+_catalog_thread_lock = threading.Lock()
 
+# "relevance" ranks cheaper eco items by title similarity; "price" returns the cheapest ones
+RANKING = os.getenv("RECOMMEND_RANKING", "relevance")
 
-def recommend_alternatives(product_title: str, product_price: float, category_name: str, top_n: int = 3):
+# Popularity signals added to the similarity score (each scaled to 0..1 first)
+RELEVANCE_WEIGHTS = {
+    "stars": 0.10,
+    "reviews": 0.05,
+    "boughtInLastMonth": 0.05,
+}
+
+# Per category, eco-friendly items sorted by price ascending:
+#   prices  - for the bisect on the price cut
+#   records - product dicts returned to the client
+#   vectors - L2-normalized TF-IDF rows (CSR) in the same order
+#   quality - weighted popularity score per item
+#   bundle  - the model bundle whose vectorizer produced `vectors`
+CategoryIndex = namedtuple("CategoryIndex", ["prices", "records", "vectors", "quality", "bundle"])
+
+# Eco-friendly index: categoryName -> CategoryIndex
+_index = {}
+_index_lock = threading.Lock()
+# Held for a whole rebuild, so a catalog reload and a model reload never interleave
+_rebuild_lock = threading.Lock()
+# The model bundle the index was last built with (the reload hook runs before
+# get_models() returns the new one)
+_index_bundle = None
+
+# Cross-category fallback (ml_models/ann_index.py build), used when a category
+# has no cheaper eco item. ANN_PROBES trades recall for latency.
+ANN_INDEX_DIR = os.getenv("ANN_INDEX_DIR", os.path.join(ML_MODELS_DIR, "ann_index"))
+ANN_PROBES = int(os.getenv("ANN_PROBES", "2"))
+
+#   ann      - the AnnIndex over all catalog titles
+#   eligible - per ANN item: eco-friendly under the current model and in the catalog
+#   records  - asin -> product dict for eligible items
+CrossCategoryIndex = namedtuple("CrossCategoryIndex", ["ann", "eligible", "records"])
+_cross_index = None
+
+# Identical lookups share one result per index (see _lookup_key); concurrent
+# ones share one computation. Emptied whenever the index is rebuilt.
+recommendation_cache = RecommendationCache.from_env()
+
+
+def _quality_scores(products: pd.DataFrame, weights=RELEVANCE_WEIGHTS):
+    """Weighted sum of stars (/5) and log-scaled reviews / boughtInLastMonth"""
+    quality = np.zeros(len(products))
+    for column, weight in weights.items():
+        if not weight or column not in products.columns:
+            continue
+        values = pd.to_numeric(products[column], errors="coerce").fillna(0).clip(lower=0).to_numpy(dtype=float)
+        if column == "stars":
+            values = values / 5.0
+        else:
+            values = np.log1p(values)
+            if values.max() > 0:
+                values = values / values.max()
+        quality += weight * values
+    return quality
+
+
+def build_index(products: pd.DataFrame, bundle=None, products_path: str = PRODUCTS_PATH):
+    """
+    Keep only eco-friendly (label=2) items per category, sorted by price
+    ascending, so cheaper candidates are a prefix found with bisect. Labels are
+    the catalog's precomputed ones (services/catalog_labels.py). Title vectors
+    are kept for relevance ranking.
+    """
+    if products.empty:
+        return {}
+
+    bundle = bundle or get_models()
+    titles = products["title"].astype(str).tolist()
+    features = bundle.transform(titles)
+    preds, _ = get_labels(
+        products_path, fingerprint(products_path),
+        lambda: (products["asin"].astype(str).tolist(), titles), bundle,
+    )
+    labelled = products.assign(EcoLabel=preds, _row=np.arange(len(products)), _quality=_quality_scores(products))
+
+    eco_products = labelled[(labelled["EcoLabel"] == 2) & labelled["price"].notna()]
+    eco_products = eco_products.sort_values(by="price", ascending=True, kind="mergesort")
+
+    vectors = normalize(features.tocsr(), norm="l2", copy=False)
+
+    index = {}
+    for category_name, group in eco_products.groupby("categoryName", sort=False, observed=True):
+        index[category_name] = CategoryIndex(
+            prices=group["price"].astype(float).tolist(),
+            records=group.drop(columns=["_row", "_quality"]).to_dict(orient="records"),
+            vectors=vectors[group["_row"].to_numpy()],
+            quality=group["_quality"].to_numpy(),
+            bundle=bundle,
+        )
+    return index
+
+
+def _load_ann_index(directory: str = ANN_INDEX_DIR):
+    if not os.path.exists(os.path.join(directory, "meta.json")):
+        return None
+    try:
+        return AnnIndex.load(directory)
+    except Exception as e:
+        logger.error(f"Failed to load ANN index from {directory}: {str(e)}")
+        return None
+
+
+def build_cross_index(index, ann=None):
+    """
+    Align the ANN items with the eco-friendly products of `index`, so the
+    fallback follows the current model's labels rather than the ones stored
+    when the ANN index was built.
+    """
+    if ann is None:
+        return None
+    records = {}
+    for entry in index.values():
+        for record in entry.records:
+            records[str(record["asin"])] = record
+    eligible = np.fromiter((asin in records for asin in ann.asin.tolist()), dtype=bool, count=len(ann))
+    return CrossCategoryIndex(ann, eligible, records)
+
+
+def reload_index(products_path: str = PRODUCTS_PATH):
     """
-    Recommend cheaper eco-friendly (label=2) alternatives from products.csv in same category
+    Re-read the catalog (and the ANN index) and rebuild the eco-friendly index.
+    The new index is swapped in atomically; requests in flight keep the old one.
+    Called when the catalog CSV changes (see _check_catalog_in_background).
     """
+    global df, df_path, _catalog_version, _index, _cross_index
+    with _rebuild_lock:
+        catalog = open_catalog(products_path)
+        products = catalog.to_frame()
+        index = build_index(products, _index_bundle, products_path=products_path)
+        cross_index = build_cross_index(index, _load_ann_index())
+        with _index_lock:
+            df = products
+            df_path = products_path
+            _catalog_version = catalog.version
+            _index = index
+            _cross_index = cross_index
+        recommendation_cache.invalidate(index)
+    return len(index)
+
+
+def _rebuild_for_model(bundle):
+    """Labels depend on the model, so rebuild the index when a new one is loaded."""
+    global _index, _cross_index, _index_bundle
+    with _rebuild_lock:
+        index = build_index(df, bundle, products_path=df_path)
+        cross_index = build_cross_index(index, _cross_index.ann if _cross_index else None)
+        with _index_lock:
+            _index = index
+            _cross_index = cross_index
+            _index_bundle = bundle
+        recommendation_cache.invalidate(index)
+
+
+def _reload_if_catalog_changed():
     try:
-        # Filter products from the same category
-        same_cat = df[df["categoryName"] == category_name]
+        if fingerprint(df_path) == _catalog_version:
+            return
+        logger.info(f"Catalog {df_path} changed, rebuilding the recommendation index")
+        reload_index(df_path)
+    except Exception as e:
+        logger.error(f"Failed to reload the recommendation index: {str(e)}")
+
+
+def _check_catalog_in_background():
+    """At most every CATALOG_RELOAD_INTERVAL seconds, look for catalog edits in a thread (no request waits)"""
+    global _last_catalog_check, _catalog_thread
+    if CATALOG_RELOAD_INTERVAL <= 0 or time.monotonic() - _last_catalog_check < CATALOG_RELOAD_INTERVAL:
+        return
+    with _catalog_thread_lock:
+        if _catalog_thread is not None and _catalog_thread.is_alive():
+            return
+        _last_catalog_check = time.monotonic()
+        _catalog_thread = threading.Thread(target=_reload_if_catalog_changed, name="catalog-reload", daemon=True)
+        _catalog_thread.start()
+
+
+_index_bundle = get_models()
+_index = build_index(df, _index_bundle)
+_cross_index = build_cross_index(_index, _load_ann_index())
+register_reload_hook(_rebuild_for_model)
+
 
-        if same_cat.empty:
-            return []
+def _rank_by_relevance(entry: CategoryIndex, product_title: str, cut: int, top_n: int):
+    """Positions of the top_n cheaper items by title similarity + popularity, best first"""
+    query = entry.bundle.transform([product_title])
+    with timed("rank"):
+        # One sparse matrix-vector product scores every item in the category
+        similarity = (entry.vectors @ query.T).toarray().ravel()[:cut]
+        scores = similarity + entry.quality[:cut]
 
-        # Predict EcoLabel for these products
-        titles = same_cat["title"].astype(str).tolist()
-        X = vectorizer.transform(titles)
-        preds = model.predict(X)
+        if top_n < cut:
+            candidates = np.argpartition(-scores, top_n - 1)[:top_n]
+        else:
+            candidates = np.arange(cut)
+        # Best score first; ties keep price order (cheaper first)
+        order = candidates[np.lexsort((candidates, -scores[candidates]))]
+    return order, similarity
 
-        # Add prediction column
-        same_cat = same_cat.assign(EcoLabel=preds)
 
-        # ✅ Only keep eco-friendly (label=2)
-        eco_products = same_cat[same_cat["EcoLabel"] == 2]
+def _lookup_key(index, product_title: str, product_price: float, category_name: str, top_n: int):
+    """
+    Everything the result depends on. Within a category that is where the
+    price cuts the sorted prices (any price between the same two items gives
+    the same answer) and, for relevance ranking, the normalized title; the
+    cross-category fallback filters on the exact price.
+    """
+    entry = index.get(category_name)
+    cut = bisect.bisect_left(entry.prices, product_price) if entry is not None else 0
+    if cut == 0:
+        return ("cross_category", normalize_title(product_title), product_price, top_n)
+    if RANKING == "price":
+        return ("category", category_name, min(cut, top_n), None, top_n)
+    return ("category", category_name, cut, normalize_title(product_title), top_n)
+
 
-        # Only recommend cheaper ones
-        cheaper = eco_products[eco_products["price"] < product_price]
+def _compute_alternatives(index, product_title: str, product_price: float, category_name: str, top_n: int):
+    entry = index.get(category_name)
+    recommendations = []
 
-        # Sort by price ascending
-        cheaper_sorted = cheaper.sort_values(by="price", ascending=True)
+    if entry is not None:
+        # Everything left of the cut is strictly cheaper than the product
+        cut = bisect.bisect_left(entry.prices, product_price)
+        count = min(top_n, cut)
 
-        # Pick top N
-        recommendations = cheaper_sorted.head(top_n).to_dict(orient="records")
+        if count > 0 and RANKING == "price":
+            # Cheapest first, pick top N
+            recommendations = entry.records[:count]
+        elif count > 0:
+            order, similarity = _rank_by_relevance(entry, product_title, cut, count)
+            recommendations = [dict(entry.records[i], similarity=round(float(similarity[i]), 4)) for i in order]
 
-        return recommendations
+    if not recommendations:
+        recommendations = _cross_category_alternatives(product_title, product_price, top_n)
+    return recommendations
+
+
+def recommend_alternatives(product_title: str, product_price: float, category_name: str, top_n: int = 3):
+    """
+    Recommend cheaper eco-friendly (label=2) alternatives from products.csv in same category,
+    most similar to the product title first (RECOMMEND_RANKING=price: cheapest first)
+    """
+    try:
+        _check_catalog_in_background()
+        index = _index
+        recommendations = recommendation_cache.get_or_compute(
+            _lookup_key(index, product_title, product_price, category_name, top_n),
+            index,
+            lambda: _compute_alternatives(index, product_title, product_price, category_name, top_n),
+        )
+        # The cached list is shared between requests
+        return list(recommendations)
 
     except Exception as e:
-        return {"error": str(e)}
\ No newline at end of file
+        return {"error": str(e)}
+
+
+def _cross_category_alternatives(product_title: str, product_price: float, top_n: int):
+    """Most similar cheaper eco-friendly products from any category (ANN lookup)"""
+    cross_index = _cross_index
+    if cross_index is None:
+        return []
+
+    ann = cross_index.ann
+    with timed("ann_query"):
+        matches = ann.query(product_title, k=top_n, max_price=product_price, labels=None,
+                            mask=cross_index.eligible, n_probes=ANN_PROBES)
+    return [
+        dict(cross_index.records[str(ann.asin[item])], similarity=round(similarity, 4))
+        for item, similarity in matches
+    ]
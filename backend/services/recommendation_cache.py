@@ -0,0 +1,100 @@
+import os
+import threading
+from services.model_registry import ML_MODELS_DIR  # noqa: F401  (puts ml_models/ on sys.path)
+from cache_store import CacheStore
+
+
+class _Call:
+    """One in-flight computation that concurrent identical lookups wait for"""
+
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+
+class RecommendationCache:
+    """
+    LRU cache of recommendation lists for one eco-friendly index at a time,
+    with single-flight: concurrent lookups of a key that is being computed
+    wait for that computation instead of repeating it. The cache is emptied
+    whenever a different index (new catalog or model) is passed in.
+    """
+
+    def __init__(self, max_entries=10000):
+        # In memory only: results hold the index's product dicts
+        self._store = CacheStore("recommendation_cache", max_entries=max_entries, ttl=0)
+        self._inflight = {}
+        self._lock = threading.Lock()
+        # The current index is kept referenced so its id() (the store namespace) cannot be reused
+        self._version = None
+        self.misses = 0
+        self.coalesced = 0
+
+    @classmethod
+    def from_env(cls):
+        """Build a cache from RECOMMEND_CACHE_SIZE (0 keeps only the single-flight)"""
+        return cls(max_entries=int(os.getenv("RECOMMEND_CACHE_SIZE", "10000")))
+
+    def _check_version(self, version):
+        """Lookups on a new index must not join computations on the old one"""
+        if self._version is not version:
+            self._inflight = {}
+            self._version = version
+
+    def get_or_compute(self, key, version, compute):
+        """Cached value of `key` for this index version, or `compute()` run once for all waiting callers"""
+        with self._lock:
+            self._check_version(version)
+            value = self._store.get(key, namespace=id(version))
+            if value is not None:
+                return value
+
+            call = self._inflight.get(key)
+            leader = call is None
+            if leader:
+                call = self._inflight[key] = _Call()
+                self.misses += 1
+            else:
+                self.coalesced += 1
+
+        if not leader:
+            call.done.wait()
+            if call.error is not None:
+                raise call.error
+            return call.value
+
+        try:
+            call.value = compute()
+        except Exception as e:
+            call.error = e
+            raise
+        finally:
+            with self._lock:
+                if self._inflight.get(key) is call:
+                    del self._inflight[key]
+                if call.error is None and self._version is version:
+                    self._store.set(key, call.value, namespace=id(version))
+            call.done.set()
+        return call.value
+
+    def invalidate(self, version=None):
+        """Forget every entry (the index was rebuilt)"""
+        with self._lock:
+            self._check_version(version)
+            self._store.invalidate(id(version))
+
+    def stats(self):
+        with self._lock:
+            stats = self._store.stats()
+            lookups = stats["hits"] + self.misses + self.coalesced
+            return {
+                "entries": stats["entries"],
+                "max_entries": stats["max_entries"],
+                "in_flight": len(self._inflight),
+                "hits": stats["hits"],
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "invalidations": stats["invalidations"],
+                "hit_rate": (stats["hits"] + self.coalesced) / lookups if lookups else 0.0,
+            }
@@ -0,0 +1,34 @@
+"""
+WSGI entry point for production serving.
+
+    gunicorn -c gunicorn.conf.py
+
+gunicorn imports this module once in the master (preload_app), so the model,
+the memory-mapped catalog, its eco labels and the recommendation index are
+loaded before the workers are forked and every worker starts warm, sharing
+those pages copy-on-write.
+"""
+import logging
+from app import create_app
+from services.model_registry import get_models
+from services.product_store import get_catalog, get_eco_labels
+
+logging.basicConfig(level=logging.INFO)
+logger = logging.getLogger(__name__)
+
+
+def warm_up():
+    """Load everything the first requests would otherwise pay for"""
+    bundle = get_models()
+    try:
+        _, catalog = get_catalog()
+        get_eco_labels(catalog)
+    except FileNotFoundError as e:
+        logger.warning(f"Catalog not found, /api/products will fail: {str(e)}")
+    # Predict once so lazily built state (text cleaning, engine) is initialized
+    bundle.predict_one("reusable bamboo toothbrush")
+    logger.info(f"Backend warmed up with model {bundle.version}")
+
+
+app = create_app()  # importing the routes also builds the recommendation index
+warm_up()
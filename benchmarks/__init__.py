@@ -0,0 +1,12 @@
+"""
+Latency / throughput benchmarks for the backend and the AI assistant.
+
+Drives the Flask apps through their test clients (no network, the assistant
+answers with the local fake LLM) and reports p50/p95/p99 latency and
+throughput for /api/predict, /api/recommend, /api/products and /api/ai/chat,
+at catalog sizes scaled synthetically from backend/data/finalwebsite.csv.
+
+    python -m benchmarks                                   # source catalog size
+    python -m benchmarks --rows 3691,50000 --output runs/today.json
+    python -m benchmarks --compare runs/baseline.json      # exit 1 on regression
+"""
@@ -0,0 +1,70 @@
+"""
+Synthetic catalogs of any size, scaled from the real product CSV.
+
+Rows beyond the source size are copies of source rows with a new asin, the
+price jittered by +-20% and two extra words from the same category appended
+to the title, so titles stay realistic but distinct (no free cache hits).
+Generated files are kept in benchmarks/.data/ and reused.
+"""
+import os
+import re
+import uuid
+import numpy as np
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+SOURCE_CATALOG = os.path.join(ROOT, "backend", "data", "finalwebsite.csv")
+DATA_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), ".data")
+
+_WORD_RE = re.compile(r"[A-Za-z]{4,}")
+
+
+def source_rows(source=SOURCE_CATALOG):
+    with open(source, "rb") as f:
+        return sum(1 for _ in f) - 1
+
+
+def _category_words(df):
+    words = {}
+    for category, titles in df.groupby("categoryName", observed=True)["title"]:
+        vocabulary = sorted({w.lower() for t in titles.astype(str) for w in _WORD_RE.findall(t)})
+        words[category] = np.array(vocabulary or ["item"], dtype=object)
+    return words
+
+
+def scale_catalog(df, rows, seed=0):
+    """DataFrame of exactly `rows` products derived from `df`"""
+    if rows <= len(df):
+        return df.sample(n=rows, random_state=seed).sort_index()
+
+    rng = np.random.default_rng(seed)
+    words = _category_words(df)
+    copies = -(-rows // len(df))
+    parts = [df]
+    for copy in range(1, copies):
+        part = df.copy()
+        part["asin"] = part["asin"].astype(str) + f"-{copy}"
+        part["price"] = (part["price"] * rng.uniform(0.8, 1.2, len(part))).round(2)
+        part["title"] = [
+            f"{title} {' '.join(rng.choice(words[category], 2))}"
+            for title, category in zip(part["title"].astype(str), part["categoryName"])
+        ]
+        parts.append(part)
+    return pd.concat(parts, ignore_index=True).iloc[:rows]
+
+
+def ensure_catalog(rows=None, seed=0, source=SOURCE_CATALOG, data_dir=DATA_DIR):
+    """Path of a catalog CSV with `rows` products (the source itself when rows is its size or None)"""
+    if not rows or rows == source_rows(source):
+        return source
+
+    path = os.path.join(data_dir, f"catalog_{rows}_{seed}.csv")
+    if os.path.exists(path) and os.path.getmtime(path) >= os.path.getmtime(source):
+        return path
+
+    os.makedirs(data_dir, exist_ok=True)
+    catalog = scale_catalog(pd.read_csv(source), rows, seed)
+    tmp_path = f"{path}.tmp-{uuid.uuid4().hex[:6]}"
+    catalog.to_csv(tmp_path, index=False)
+    os.replace(tmp_path, path)
+    return path
@@ -0,0 +1,101 @@
+"""
+Timing loop, latency statistics and run-to-run comparison.
+"""
+import time
+import threading
+import numpy as np
+
+# Latency percentiles reported (and compared) per endpoint
+PERCENTILES = (50, 95, 99)
+
+# Differences smaller than this are noise, whatever the relative change
+MIN_REGRESSION_MS = 0.5
+
+
+def measure(make_client, send, payloads, warmup=10, concurrency=1):
+    """
+    Send the first `warmup` payloads untimed, then time each of the others
+    through `send(client, payload)` (returns the HTTP status). With
+    concurrency > 1 the timed payloads are split over that many threads, each
+    with its own client from `make_client()`.
+    Returns the stats dict from summarize().
+    """
+    client = make_client()
+    for payload in payloads[:warmup]:
+        send(client, payload)
+    timed = payloads[warmup:]
+
+    latencies = [[] for _ in range(concurrency)]
+    errors = [0] * concurrency
+
+    def worker(slot):
+        own_client = client if slot == 0 else make_client()
+        for payload in timed[slot::concurrency]:
+            started = time.perf_counter()
+            status = send(own_client, payload)
+            latencies[slot].append(time.perf_counter() - started)
+            if status >= 400:
+                errors[slot] += 1
+
+    started = time.perf_counter()
+    if concurrency == 1:
+        worker(0)
+    else:
+        threads = [threading.Thread(target=worker, args=(slot,)) for slot in range(concurrency)]
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+    elapsed = time.perf_counter() - started
+
+    return summarize([t for slot in latencies for t in slot], elapsed, sum(errors))
+
+
+def summarize(latencies, elapsed, errors=0):
+    """Latency percentiles (ms) and throughput (requests/s) of one run"""
+    values = np.asarray(latencies, dtype=float) * 1000.0
+    stats = {"requests": int(len(values)), "errors": int(errors)}
+    if not len(values):
+        return stats
+    for p in PERCENTILES:
+        stats[f"p{p}_ms"] = round(float(np.percentile(values, p)), 3)
+    stats["mean_ms"] = round(float(values.mean()), 3)
+    stats["max_ms"] = round(float(values.max()), 3)
+    stats["throughput_rps"] = round(len(values) / elapsed, 2) if elapsed > 0 else None
+    return stats
+
+
+def _key(entry):
+    return entry["catalog_rows"], entry["endpoint"]
+
+
+def compare(current, baseline, tolerance=0.2):
+    """
+    Regressions of `current` against `baseline` (both run reports), as
+    messages. A percentile more than `tolerance` (relative) and
+    MIN_REGRESSION_MS slower, throughput more than `tolerance` lower, or new
+    errors count as regressions. Entries missing from either run are skipped.
+    """
+    previous = {_key(entry): entry for entry in baseline.get("results", [])}
+    regressions = []
+    for entry in current.get("results", []):
+        before = previous.get(_key(entry))
+        if before is None:
+            continue
+        label = f"{entry['endpoint']} @ {entry['catalog_rows']} rows"
+
+        for p in PERCENTILES:
+            name = f"p{p}_ms"
+            now, then = entry.get(name), before.get(name)
+            if now is None or then is None:
+                continue
+            if now > then * (1 + tolerance) and now - then > MIN_REGRESSION_MS:
+                regressions.append(f"{label}: {name} {then} -> {now} (+{(now / then - 1) * 100:.0f}%)")
+
+        now, then = entry.get("throughput_rps"), before.get("throughput_rps")
+        if now and then and now < then / (1 + tolerance):
+            regressions.append(f"{label}: throughput {then} -> {now} req/s")
+
+        if entry.get("errors", 0) > before.get("errors", 0):
+            regressions.append(f"{label}: errors {before.get('errors', 0)} -> {entry['errors']}")
+    return regressions
@@ -0,0 +1,160 @@
+"""
+Benchmark runner: builds the catalogs, runs every service in its own
+process, prints a summary, writes the JSON report and compares it with a
+baseline run.
+
+    python -m benchmarks --rows 3691,20000 --requests 300 --output runs/new.json
+    python -m benchmarks --compare runs/baseline.json --tolerance 0.25
+
+Caches are disabled by default (PREDICTION_CACHE_SIZE=0, RECOMMEND_CACHE_SIZE=0,
+RESPONSE_CACHE_SIZE=0) so every request pays for the full path; --caches
+keeps the defaults.
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import platform
+import subprocess
+
+from benchmarks.catalog import ROOT, ensure_catalog, source_rows
+from benchmarks.harness import PERCENTILES, compare
+from benchmarks.worker import SERVICE_ENDPOINTS
+
+REPORT_VERSION = 1
+
+
+def _git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "--short", "HEAD"], cwd=ROOT, capture_output=True,
+                              text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def _service_env(service, catalog, caches):
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(filter(None, [ROOT, env.get("PYTHONPATH")]))
+    env["FAKE_LLM"] = "1"
+    if service == "backend":
+        env["PRODUCTS_PATH"] = catalog
+    else:
+        env["CSV_PATH"] = catalog
+    if not caches:
+        env["PREDICTION_CACHE_SIZE"] = "0"
+        env["RECOMMEND_CACHE_SIZE"] = "0"
+        env.pop("PREDICTION_CACHE_DB", None)
+        env["RESPONSE_CACHE_SIZE"] = "0"
+        env.pop("RESPONSE_CACHE_DB", None)
+    return env
+
+
+def run_service(service, catalog, endpoints, args):
+    """Run the worker for one service and catalog; returns its parsed report"""
+    command = [
+        sys.executable, "-m", "benchmarks.worker", service, catalog,
+        "--endpoints", ",".join(endpoints),
+        "--requests", str(args.requests),
+        "--warmup", str(args.warmup),
+        "--concurrency", str(args.concurrency),
+        "--seed", str(args.seed),
+        "--llm-delay", str(args.llm_delay),
+    ]
+    # The assistant keeps its models under assistant_service/models relative to the cwd
+    completed = subprocess.run(command, cwd=ROOT, env=_service_env(service, catalog, args.caches),
+                               stdout=subprocess.PIPE, stderr=None if args.verbose else subprocess.PIPE,
+                               text=True)
+    if completed.returncode != 0:
+        if completed.stderr:
+            sys.stderr.write(completed.stderr[-4000:])
+        raise RuntimeError(f"{service} benchmark failed (exit code {completed.returncode})")
+    return json.loads(completed.stdout.strip().splitlines()[-1])
+
+
+def print_summary(report):
+    columns = [f"p{p}_ms" for p in PERCENTILES] + ["throughput_rps", "errors"]
+    print(f"{'endpoint':<10} {'rows':>8} " + " ".join(f"{c:>14}" for c in columns))
+    for entry in report["results"]:
+        values = " ".join(f"{str(entry.get(c, '-')):>14}" for c in columns)
+        print(f"{entry['endpoint']:<10} {entry['catalog_rows']:>8} {values}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark the backend and AI assistant endpoints")
+    parser.add_argument("--rows", default=None,
+                        help="comma-separated catalog sizes (default: the source catalog size)")
+    parser.add_argument("--endpoints", default=None,
+                        help="comma-separated subset of predict,recommend,products,chat")
+    parser.add_argument("--requests", type=int, default=200, help="timed requests per endpoint")
+    parser.add_argument("--warmup", type=int, default=10, help="untimed requests per endpoint first")
+    parser.add_argument("--concurrency", type=int, default=1, help="client threads per endpoint")
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--llm-delay", type=float, default=0.0, help="fake LLM latency in seconds")
+    parser.add_argument("--caches", action="store_true",
+                        help="keep the prediction/recommendation/response caches enabled")
+    parser.add_argument("--output", default=None, help="write the JSON report here")
+    parser.add_argument("--compare", default=None, help="baseline JSON report to check for regressions")
+    parser.add_argument("--tolerance", type=float, default=0.2,
+                        help="relative slowdown tolerated before failing (default: 0.2)")
+    parser.add_argument("--verbose", action="store_true", help="show the services' logs")
+    args = parser.parse_args()
+
+    sizes = [int(r) for r in args.rows.split(",")] if args.rows else [source_rows()]
+    selected = set(args.endpoints.split(",")) if args.endpoints else None
+
+    report = {
+        "version": REPORT_VERSION,
+        "created": time.strftime("%Y-%m-%dT%H:%M:%S%z"),
+        "git_commit": _git_commit(),
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "config": {
+            "requests": args.requests,
+            "warmup": args.warmup,
+            "concurrency": args.concurrency,
+            "seed": args.seed,
+            "llm_delay": args.llm_delay,
+            "caches": args.caches,
+        },
+        "startup": [],
+        "results": [],
+    }
+
+    for rows in sizes:
+        print(f"📦 Catalog with {rows} rows...")
+        catalog = ensure_catalog(rows, args.seed)
+        for service, endpoints in SERVICE_ENDPOINTS.items():
+            endpoints = [e for e in endpoints if selected is None or e in selected]
+            if not endpoints:
+                continue
+            print(f"⏱️  {service}: {', '.join(endpoints)}")
+            result = run_service(service, catalog, endpoints, args)
+            report["startup"].append({"catalog_rows": rows, "service": service,
+                                      "seconds": result["startup_seconds"]})
+            for entry in result["results"]:
+                report["results"].append(dict(catalog_rows=rows, **entry))
+
+    print()
+    print_summary(report)
+
+    if args.output:
+        os.makedirs(os.path.dirname(os.path.abspath(args.output)), exist_ok=True)
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=2)
+        print(f"\n💾 Report written to {args.output}")
+
+    if args.compare:
+        with open(args.compare, "r") as f:
+            baseline = json.load(f)
+        regressions = compare(report, baseline, args.tolerance)
+        if regressions:
+            print(f"\n❌ {len(regressions)} regression(s) against {args.compare}:")
+            for message in regressions:
+                print(f"  {message}")
+            sys.exit(1)
+        print(f"\n✅ No regressions against {args.compare} (tolerance {args.tolerance:.0%})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,170 @@
+"""
+Runs the scenarios of one service in this process and prints the results as
+JSON on stdout. run.py starts a fresh interpreter per service and catalog:
+the backend and the assistant both have an `app` module, and both keep the
+catalog in module state.
+
+    python -m benchmarks.worker backend path/to/catalog.csv --endpoints predict,products
+    python -m benchmarks.worker assistant path/to/catalog.csv --endpoints chat
+"""
+import os
+import sys
+import json
+import time
+import argparse
+import contextlib
+import numpy as np
+import pandas as pd
+
+from benchmarks.catalog import ROOT
+from benchmarks.harness import measure
+
+SERVICE_DIRS = {
+    "backend": os.path.join(ROOT, "backend"),
+    "assistant": os.path.join(ROOT, "assistant_service"),
+}
+
+SERVICE_ENDPOINTS = {
+    "backend": ("predict", "recommend", "products"),
+    "assistant": ("chat",),
+}
+
+CHAT_TEMPLATES = (
+    "Is the {title} eco-friendly?",
+    "Can you suggest a cheaper sustainable alternative to {title}?",
+    "What should I buy instead of {title}?",
+)
+
+PAGE_SIZE = 50
+
+
+# ------------------------
+# Workloads (deterministic for a given catalog and seed)
+# ------------------------
+def _sample_products(catalog_path, n, rng):
+    products = pd.read_csv(catalog_path, usecols=["title", "price", "categoryName"]).dropna()
+    rows = products.iloc[rng.integers(0, len(products), n)]
+    return [
+        {"title": str(title), "price": float(price), "categoryName": str(category)}
+        for title, price, category in zip(rows["title"], rows["price"], rows["categoryName"])
+    ]
+
+
+def _product_queries(catalog_path, n, rng):
+    """Mix of plain pages, category pages, price/eco filters and projections"""
+    products = pd.read_csv(catalog_path, usecols=["price", "categoryName"])
+    categories = products["categoryName"].dropna().unique()
+    prices = products["price"].dropna().to_numpy()
+    pages = max(1, len(products) // PAGE_SIZE)
+
+    queries = []
+    for kind in rng.integers(0, 4, n):
+        query = {"limit": PAGE_SIZE, "offset": int(rng.integers(0, pages)) * PAGE_SIZE}
+        if kind == 1:
+            query = {"limit": PAGE_SIZE, "category": str(rng.choice(categories))}
+        elif kind == 2:
+            low, high = sorted(rng.choice(prices, 2))
+            query = {"limit": PAGE_SIZE, "min_price": float(low), "max_price": float(high), "eco_label": 2}
+        elif kind == 3:
+            query["fields"] = "asin,title,price"
+        queries.append(query)
+    return queries
+
+
+def _chat_messages(products):
+    messages = []
+    for i, product in enumerate(products):
+        short_title = " ".join(product["title"].split()[:8])
+        payload = {"message": CHAT_TEMPLATES[i % len(CHAT_TEMPLATES)].format(title=short_title)}
+        if i % 2:
+            payload["product_context"] = {
+                "title": product["title"],
+                "price": product["price"],
+                "category": product["categoryName"],
+                "ecoLabel": 0,
+            }
+        messages.append(payload)
+    return messages
+
+
+# ------------------------
+# Services
+# ------------------------
+def _post(path):
+    return lambda client, payload: client.post(path, json=payload).status_code
+
+
+def _get(path):
+    return lambda client, payload: client.get(path, query_string=payload).status_code
+
+
+def load_backend():
+    from app import create_app
+    return create_app(), {
+        "predict": _post("/api/predict"),
+        "recommend": _post("/api/recommend"),
+        "products": _get("/api/products"),
+    }
+
+
+def load_assistant(llm_delay=0.0):
+    import app
+    from fake_llm import FakeGroq
+
+    if app.assistant is None:
+        raise RuntimeError("AI Assistant failed to initialize")
+    # Time the full startup, not just the import (ASSISTANT_BACKGROUND_STARTUP)
+    app.assistant.wait_until_started()
+    app.assistant.groq_client = FakeGroq(first_token_delay=llm_delay)
+    return app.app, {"chat": _post("/api/ai/chat")}
+
+
+def run(service, catalog_path, endpoints, requests=200, warmup=10, concurrency=1, seed=0, llm_delay=0.0):
+    sys.path.insert(0, SERVICE_DIRS[service])
+
+    started = time.perf_counter()
+    if service == "backend":
+        flask_app, senders = load_backend()
+    else:
+        flask_app, senders = load_assistant(llm_delay)
+    startup_seconds = time.perf_counter() - started
+
+    rng = np.random.default_rng(seed)
+    products = _sample_products(catalog_path, requests + warmup, rng)
+    workloads = {
+        "predict": products,
+        "recommend": products,
+        "products": _product_queries(catalog_path, requests + warmup, rng),
+        "chat": _chat_messages(products),
+    }
+
+    results = []
+    for endpoint in endpoints:
+        stats = measure(flask_app.test_client, senders[endpoint], workloads[endpoint], warmup, concurrency)
+        results.append(dict(endpoint=endpoint, **stats))
+    return {"startup_seconds": round(startup_seconds, 3), "results": results}
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark one service in this process")
+    parser.add_argument("service", choices=sorted(SERVICE_DIRS))
+    parser.add_argument("catalog")
+    parser.add_argument("--endpoints", default=None, help="comma-separated (default: all of the service)")
+    parser.add_argument("--requests", type=int, default=200)
+    parser.add_argument("--warmup", type=int, default=10)
+    parser.add_argument("--concurrency", type=int, default=1)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--llm-delay", type=float, default=0.0, help="fake LLM latency in seconds")
+    args = parser.parse_args()
+
+    endpoints = args.endpoints.split(",") if args.endpoints else list(SERVICE_ENDPOINTS[args.service])
+    stdout = sys.stdout
+    # The services may print while loading; stdout carries only the JSON result
+    with contextlib.redirect_stdout(sys.stderr):
+        report = run(args.service, os.path.abspath(args.catalog), endpoints, args.requests,
+                     args.warmup, args.concurrency, args.seed, args.llm_delay)
+    stdout.write(json.dumps(report) + "\n")
+
+
+if __name__ == "__main__":
+    main()
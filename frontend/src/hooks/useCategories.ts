@@ -13,12 +13,7 @@ export const useCategories = () => {
       setLoading(true);
       setError(null);
       try {
-        const { products } = await productService.getProducts({ limit: 100000 });
-        const counts: Record<string, number> = {};
-        for (const p of products) {
-          const key = (p.categoryName || '').trim() || 'Uncategorized';
-          counts[key] = (counts[key] || 0) + 1;
-        }
+        const counts = await productService.getCategoryCounts();
         const items: Category[] = Object.entries(counts)
           .sort((a, b) => b[1] - a[1])
           .map(([name, count]) => ({ id: name, name, image: getCategoryImage(name), productCount: count }));
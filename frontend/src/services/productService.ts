@@ -110,58 +110,84 @@ export class ProductService {
     }
   }
 
-  async getProducts(params?: {
-    category?: string;
-    search?: string;
-    page?: number;
-    limit?: number;
-  }): Promise<ProductsResponse> {
-    const page = params?.page ?? 1;
-    const limit = params?.limit ?? 1000;
-    let products: Product[] = [];
-    try {
-      // Backend returns { products: Product[] }
-      const raw = await apiService.get<{ products: Array<Record<string, unknown>> }>(API_ENDPOINTS.PRODUCTS);
-      products = (raw.products || []).map((r) => this.normalizeProduct(r));
-    } catch {
-      console.warn('API not available, loading from CSV fallback');
-      products = await this.loadFromCsvFallback();
-    }
-
-    // Apply client-side filters consistently for both API and CSV paths
-    if (params?.category) {
+  // Filtering and pagination for the CSV fallback (the API does both server-side)
+  private filterAndPage(products: Product[], params: { category?: string; search?: string }, page: number, limit: number): ProductsResponse {
+    let filtered = products;
+    if (params.category) {
       const wanted = params.category.toLowerCase();
-      products = products.filter(p => (p.categoryName || '').toLowerCase() === wanted);
+      filtered = filtered.filter(p => (p.categoryName || '').toLowerCase() === wanted);
     }
-    if (params?.search) {
+    if (params.search) {
       const q = params.search.toLowerCase();
-      products = products.filter(p =>
+      filtered = filtered.filter(p =>
         (p.title || '').toLowerCase().includes(q)
         || (p.categoryName || '').toLowerCase().includes(q)
       );
     }
-
-    // Pagination
     const start = (page - 1) * limit;
-    const paged = products.slice(start, start + limit);
-
     return {
-      products: paged,
-      total: products.length,
+      products: filtered.slice(start, start + limit),
+      total: filtered.length,
       page,
       limit,
     };
   }
 
+  async getProducts(params?: {
+    category?: string;
+    search?: string;
+    page?: number;
+    limit?: number;
+  }): Promise<ProductsResponse> {
+    const page = params?.page ?? 1;
+    // The backend serves at most 1000 products per request
+    const limit = Math.min(params?.limit ?? 1000, 1000);
+    try {
+      // Backend filters and paginates: { products, total, offset, limit, next_offset }
+      const query: Record<string, string> = {
+        limit: String(limit),
+        offset: String((page - 1) * limit),
+      };
+      if (params?.category) query.category = params.category;
+      if (params?.search) query.search = params.search;
+      const raw = await apiService.get<{ products: Array<Record<string, unknown>>; total: number }>(API_ENDPOINTS.PRODUCTS, query);
+      const products = (raw.products || []).map((r) => this.normalizeProduct(r));
+      return { products, total: raw.total ?? products.length, page, limit };
+    } catch {
+      console.warn('API not available, loading from CSV fallback');
+      const products = await this.loadFromCsvFallback();
+      return this.filterAndPage(products, params ?? {}, page, limit);
+    }
+  }
+
   async getProductById(id: string): Promise<Product | null> {
     try {
-      // No backend endpoint for single by id; fetch all and find locally
-      const list = await this.getProducts({ limit: 100000 });
-      return list.products.find(p => p.asin === id) || null;
+      const raw = await apiService.get<{ products: Array<Record<string, unknown>> }>(API_ENDPOINTS.PRODUCTS, { asin: id, limit: '1' });
+      const record = (raw.products || [])[0];
+      return record ? this.normalizeProduct(record) : null;
+    } catch {
+      console.warn('API not available, looking up the product in the CSV fallback');
+      const products = await this.loadFromCsvFallback();
+      return products.find(p => p.asin === id) || null;
+    }
+  }
+
+  // Number of products per category name, from the category column only
+  async getCategoryCounts(): Promise<Record<string, number>> {
+    let names: string[];
+    try {
+      const raw = await apiService.get<{ products: Array<{ categoryName?: string }> }>(API_ENDPOINTS.PRODUCTS, { fields: 'categoryName' });
+      names = (raw.products || []).map(r => String(r.categoryName || ''));
     } catch {
-      console.warn('Product not found:', id);
-      return null;
+      console.warn('API not available, counting categories from CSV fallback');
+      names = (await this.loadFromCsvFallback()).map(p => String(p.categoryName || ''));
+    }
+    const counts: Record<string, number> = {};
+    for (const name of names) {
+      const key = name.trim() || 'Uncategorized';
+      counts[key] = (counts[key] || 0) + 1;
     }
+    return counts;
   }
 
   async searchProducts(query: string): Promise<Product[]> {
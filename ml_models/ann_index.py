@@ -0,0 +1,303 @@
+"""
+Approximate nearest-neighbour index over product titles.
+
+Used to find eco-friendly alternatives in related categories when a
+product's own category has no cheaper eco item. Titles are embedded with
+TF-IDF -> TruncatedSVD (dense, L2-normalized) and hashed with random
+hyperplanes (LSH). A query only looks at the items sharing a bucket with it
+in each table, so it never scans the whole catalog:
+
+    <dir>/meta.json         parameters, model version used for the labels
+    <dir>/vectorizer.pkl    TF-IDF vectorizer for query titles
+    <dir>/projection.npy    SVD components (n_features x n_components)
+    <dir>/embeddings.npy    item embeddings (n_items x n_components, float32)
+    <dir>/planes.npy        LSH hyperplanes (n_tables x n_bits x n_components)
+    <dir>/hashes.npy        sorted bucket keys per table (n_tables x n_items)
+    <dir>/order.npy         item ids in bucket-key order per table
+    <dir>/asin.npy, price.npy, label.npy, category.npy   item metadata
+
+Recall vs latency: more tables / fewer bits / more probes -> more candidates,
+better recall, slower queries.
+
+    python ann_index.py build                 # index ../backend/data/finalwebsite.csv
+    python ann_index.py evaluate              # recall@k against exact search + latency
+    python ann_index.py query "bamboo toothbrush" --max-price 10
+"""
+import os
+import json
+import time
+import argparse
+import numpy as np
+
+DEFAULT_DIR = "ann_index"
+CATALOG_PATH = os.path.join("..", "backend", "data", "finalwebsite.csv")
+
+N_COMPONENTS = 128
+N_TABLES = 12
+N_BITS = 10
+N_PROBES = 2
+ECO_FRIENDLY = 2
+
+VECTORIZER_PARAMS = {
+    "stop_words": "english",
+    "max_features": 50000,
+    "ngram_range": (1, 2),
+    "sublinear_tf": True,
+}
+
+
+def _bucket_keys(projections):
+    """Sign bits of (..., n_bits) projections packed into integer bucket keys"""
+    weights = 1 << np.arange(projections.shape[-1], dtype=np.int64)
+    return (projections > 0).astype(np.int64) @ weights
+
+
+class AnnIndex:
+    """Random-hyperplane LSH over TruncatedSVD title embeddings"""
+
+    def __init__(self, meta, vectorizer, projection, embeddings, planes, hashes, order, asin, price, label, category):
+        self.meta = meta
+        self.version = meta.get("model_version")
+        self.vectorizer = vectorizer
+        self.projection = projection
+        self.embeddings = embeddings
+        self.planes = planes
+        self.hashes = hashes
+        self.order = order
+        self.asin = asin
+        self.price = price
+        self.label = label
+        self.category = category
+
+    def __len__(self):
+        return len(self.asin)
+
+    # ------------------------
+    # Build / save / load
+    # ------------------------
+    @classmethod
+    def build(cls, titles, asin, price, label, category, n_components=N_COMPONENTS,
+              n_tables=N_TABLES, n_bits=N_BITS, model_version=None, random_state=42):
+        """Fit the embedding on `titles` (raw) and hash every item"""
+        from sklearn.decomposition import TruncatedSVD
+        from sklearn.feature_extraction.text import TfidfVectorizer
+        from text_preprocessing import clean_texts
+
+        vectorizer = TfidfVectorizer(**VECTORIZER_PARAMS)
+        X = vectorizer.fit_transform(clean_texts(titles, n_jobs=-1))
+        n_components = max(1, min(n_components, X.shape[1] - 1, X.shape[0] - 1))
+        svd = TruncatedSVD(n_components=n_components, random_state=random_state)
+        svd.fit(X)
+        projection = np.ascontiguousarray(svd.components_.T, dtype=np.float32)
+
+        rng = np.random.default_rng(random_state)
+        planes = rng.standard_normal((n_tables, n_bits, n_components)).astype(np.float32)
+
+        meta = {
+            "n_items": len(titles),
+            "n_components": n_components,
+            "n_tables": n_tables,
+            "n_bits": n_bits,
+            "model_version": model_version,
+            "built_at": time.time(),
+        }
+        index = cls(meta, vectorizer, projection, None, planes, None, None,
+                    np.asarray(asin).astype(str), np.asarray(price, dtype=np.float64),
+                    np.asarray(label, dtype=np.int8), np.asarray(category).astype(str))
+        index.embeddings = index._embed(X)
+
+        keys = np.stack([_bucket_keys(index.embeddings @ table.T) for table in planes])
+        index.order = np.argsort(keys, axis=1, kind="stable")
+        index.hashes = np.take_along_axis(keys, index.order, axis=1)
+        return index
+
+    def save(self, directory=DEFAULT_DIR):
+        import joblib
+
+        os.makedirs(directory, exist_ok=True)
+        joblib.dump(self.vectorizer, os.path.join(directory, "vectorizer.pkl"))
+        arrays = {
+            "projection": self.projection, "embeddings": self.embeddings, "planes": self.planes,
+            "hashes": self.hashes, "order": self.order, "price": self.price, "label": self.label,
+            "asin": self.asin.astype("U"), "category": self.category.astype("U"),
+        }
+        for name, array in arrays.items():
+            np.save(os.path.join(directory, f"{name}.npy"), array)
+        # meta.json last: a directory without it is incomplete
+        with open(os.path.join(directory, "meta.json"), "w") as f:
+            json.dump(self.meta, f, indent=2)
+        return directory
+
+    @classmethod
+    def load(cls, directory=DEFAULT_DIR, mmap=True):
+        """Load a saved index; large arrays are memory-mapped unless mmap=False"""
+        import joblib
+
+        with open(os.path.join(directory, "meta.json"), "r") as f:
+            meta = json.load(f)
+        mode = "r" if mmap else None
+        arrays = {
+            name: np.load(os.path.join(directory, f"{name}.npy"), mmap_mode=mode, allow_pickle=False)
+            for name in ("projection", "embeddings", "planes", "hashes", "order",
+                         "asin", "price", "label", "category")
+        }
+        return cls(meta, joblib.load(os.path.join(directory, "vectorizer.pkl")), **arrays)
+
+    # ------------------------
+    # Queries
+    # ------------------------
+    def _embed(self, X):
+        # float32 on both sides; a float64 X would upcast the whole projection per call
+        embeddings = np.asarray(X.astype(np.float32) @ self.projection)
+        norms = np.linalg.norm(embeddings, axis=1, keepdims=True)
+        norms[norms == 0] = 1.0
+        return embeddings / norms
+
+    def embed(self, title):
+        """L2-normalized embedding of one raw title"""
+        from text_preprocessing import clean_text
+
+        return self._embed(self.vectorizer.transform([clean_text(title)]))[0]
+
+    def candidates(self, vector, n_probes=N_PROBES):
+        """
+        Item ids sharing a bucket with `vector` in any table. Each table is also
+        probed with the keys obtained by flipping each of the `n_probes` least
+        certain bits (multi-probe LSH).
+        """
+        projections = self.planes @ vector  # n_tables x n_bits
+        keys = _bucket_keys(projections)
+        found = []
+        for table, key in enumerate(keys):
+            probe_keys = [key]
+            if n_probes:
+                for bit in np.argsort(np.abs(projections[table]))[:n_probes]:
+                    probe_keys.append(key ^ (1 << int(bit)))
+            hashes = self.hashes[table]
+            for probe in probe_keys:
+                start = np.searchsorted(hashes, probe, side="left")
+                end = np.searchsorted(hashes, probe, side="right")
+                if end > start:
+                    found.append(self.order[table][start:end])
+        if not found:
+            return np.empty(0, dtype=np.int64)
+        return np.unique(np.concatenate(found))
+
+    def query(self, title, k=3, max_price=None, labels=(ECO_FRIENDLY,), exclude_categories=(),
+              mask=None, n_probes=N_PROBES, exact=False):
+        """
+        Up to k (item id, similarity) pairs most similar to `title`, best first,
+        restricted to items cheaper than max_price with a label in `labels`
+        (labels=None: any) and, if given, where the boolean `mask` is set.
+        exact=True scores every item instead (for evaluation).
+        """
+        vector = self.embed(title)
+        ids = np.arange(len(self)) if exact else self.candidates(vector, n_probes)
+        if len(ids) and mask is not None:
+            ids = ids[mask[ids]]
+        if len(ids) and max_price is not None:
+            ids = ids[self.price[ids] < max_price]
+        if len(ids) and labels is not None:
+            ids = ids[np.isin(self.label[ids], list(labels))]
+        if len(ids) and exclude_categories:
+            ids = ids[~np.isin(self.category[ids], list(exclude_categories))]
+        if not len(ids):
+            return []
+
+        similarity = self.embeddings[ids] @ vector
+        top = np.argsort(-similarity, kind="stable")[:k]
+        return [(int(ids[i]), float(similarity[i])) for i in top]
+
+
+# ------------------------
+# Commands
+# ------------------------
+def _label_catalog(titles, artifacts_dir):
+    """(model version, eco labels) from the served model"""
+    from compact_artifacts import _load_served_artifacts
+    from text_preprocessing import clean_texts
+
+    version, model, vectorizer = _load_served_artifacts(artifacts_dir)
+    return version, model.predict(vectorizer.transform(clean_texts(titles, n_jobs=-1)))
+
+
+def cmd_build(args):
+    import pandas as pd
+
+    catalog = pd.read_csv(args.catalog)
+    catalog = catalog[catalog["title"].notna()]
+    titles = catalog["title"].astype(str).tolist()
+
+    started = time.perf_counter()
+    version, labels = _label_catalog(titles, args.artifacts_dir)
+    index = AnnIndex.build(
+        titles, catalog["asin"], catalog["price"].fillna(np.inf), labels, catalog["categoryName"],
+        n_components=args.components, n_tables=args.tables, n_bits=args.bits, model_version=version,
+    )
+    index.save(args.index_dir)
+    print(f"🧭 Indexed {len(index)} products in {time.perf_counter() - started:.2f}s -> {args.index_dir}")
+
+
+def cmd_evaluate(args):
+    import pandas as pd
+
+    index = AnnIndex.load(args.index_dir)
+    titles = pd.read_csv(args.catalog)["title"].dropna().astype(str)
+    sample = titles.sample(min(args.queries, len(titles)), random_state=0).tolist()
+
+    hits = total = 0
+    approx_seconds = exact_seconds = 0.0
+    for title in sample:
+        started = time.perf_counter()
+        exact = {i for i, _ in index.query(title, args.k, labels=None, exact=True)}
+        exact_seconds += time.perf_counter() - started
+
+        started = time.perf_counter()
+        approx = {i for i, _ in index.query(title, args.k, labels=None, n_probes=args.probes)}
+        approx_seconds += time.perf_counter() - started
+
+        hits += len(exact & approx)
+        total += len(exact)
+
+    print(f"🎯 recall@{args.k}: {hits / max(total, 1):.3f} over {len(sample)} queries (probes={args.probes})")
+    print(f"⏱️  per query: ann {approx_seconds / len(sample) * 1000:.2f} ms, exact {exact_seconds / len(sample) * 1000:.2f} ms")
+
+
+def cmd_query(args):
+    index = AnnIndex.load(args.index_dir)
+    for item, similarity in index.query(args.title, args.k, max_price=args.max_price, n_probes=args.probes):
+        print(f"  {similarity:.3f}  £{index.price[item]:<8.2f} {index.category[item]:<30} {index.asin[item]}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Approximate nearest-neighbour index over product titles")
+    parser.add_argument("--index-dir", default=DEFAULT_DIR)
+    parser.add_argument("--catalog", default=CATALOG_PATH, help="products CSV (title, price, categoryName, asin)")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    build = sub.add_parser("build", help="embed, label and hash the catalog, then save the index")
+    build.add_argument("--artifacts-dir", default=".", help="directory with the served model artifacts")
+    build.add_argument("--components", type=int, default=N_COMPONENTS)
+    build.add_argument("--tables", type=int, default=N_TABLES, help="more tables: better recall, slower")
+    build.add_argument("--bits", type=int, default=N_BITS, help="more bits: smaller buckets, faster, lower recall")
+    build.set_defaults(func=cmd_build)
+
+    evaluate = sub.add_parser("evaluate", help="recall@k against exact search, and latency")
+    evaluate.add_argument("--k", type=int, default=10)
+    evaluate.add_argument("--queries", type=int, default=200)
+    evaluate.add_argument("--probes", type=int, default=N_PROBES)
+    evaluate.set_defaults(func=cmd_evaluate)
+
+    query = sub.add_parser("query", help="eco-friendly alternatives for a title")
+    query.add_argument("title")
+    query.add_argument("--k", type=int, default=5)
+    query.add_argument("--max-price", type=float, default=None)
+    query.add_argument("--probes", type=int, default=N_PROBES)
+    query.set_defaults(func=cmd_query)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
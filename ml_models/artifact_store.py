@@ -0,0 +1,171 @@
+"""
+Atomic publishing of served model artifacts.
+
+Every publish writes a versioned pair (eco_model-<version>.pkl,
+vectorizer-<version>.pkl) and then swaps artifacts.json to point at it with a
+single os.replace, so a reader never sees a new model next to an old
+vectorizer. The plain eco_model.pkl / vectorizer.pkl files are refreshed too
+for consumers that load them directly. When the pair can be exported in the
+compact format (compact_artifacts.py), eco_model_compact-<version>/ is
+written as well and listed in the manifest, as is the title preprocessing
+of the publishing process (text_preprocessing.preprocessing_mode), which
+servers check before loading the pair.
+"""
+import os
+import json
+import time
+import uuid
+import glob
+import hashlib
+import shutil
+import logging
+import joblib
+
+logger = logging.getLogger(__name__)
+
+MANIFEST_NAME = "artifacts.json"
+MODEL_NAME = "eco_model.pkl"
+VECTORIZER_NAME = "vectorizer.pkl"
+
+# Versioned pairs kept on disk so workers still loading an older one can finish
+KEEP_VERSIONS = 3
+
+
+def _atomic_write(path, write):
+    tmp_path = f"{path}.tmp-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+    try:
+        write(tmp_path)
+        os.replace(tmp_path, path)
+    finally:
+        if os.path.exists(tmp_path):
+            os.remove(tmp_path)
+
+
+def atomic_dump(obj, path):
+    """joblib.dump to a temporary file, then rename over `path`"""
+    _atomic_write(path, lambda tmp: joblib.dump(obj, tmp))
+
+
+def read_manifest(directory):
+    """The current manifest dict, or None if artifacts were never published this way"""
+    try:
+        with open(os.path.join(directory, MANIFEST_NAME), "r") as f:
+            return json.load(f)
+    except (FileNotFoundError, ValueError):
+        return None
+
+
+def served_version(directory):
+    """
+    Version of the artifacts served from `directory`: the manifest's version,
+    or for plain .pkl files a hash of their paths, mtimes and sizes.
+    """
+    manifest = read_manifest(directory)
+    if manifest:
+        return manifest["version"]
+    digest = hashlib.sha1()
+    for name in (MODEL_NAME, VECTORIZER_NAME):
+        path = os.path.join(os.path.abspath(directory), name)
+        stat = os.stat(path)
+        digest.update(f"{path}:{stat.st_mtime_ns}:{stat.st_size}".encode("utf-8"))
+    return digest.hexdigest()[:12]
+
+
+def publish_artifacts(model, vectorizer, directory=".", metadata=None, preprocessing=None):
+    """
+    Publish a model/vectorizer pair and return its version string.
+    `metadata` (e.g. training mode, accuracy) is stored in the manifest.
+    `preprocessing` defaults to this process's text_preprocessing mode, i.e.
+    the one the pair was trained with.
+    """
+    from text_preprocessing import preprocessing_mode
+
+    version = f"{time.strftime('%Y%m%d%H%M%S')}-{uuid.uuid4().hex[:6]}"
+    model_file = f"eco_model-{version}.pkl"
+    vectorizer_file = f"vectorizer-{version}.pkl"
+
+    atomic_dump(model, os.path.join(directory, model_file))
+    atomic_dump(vectorizer, os.path.join(directory, vectorizer_file))
+
+    manifest = {
+        "version": version,
+        "model": model_file,
+        "vectorizer": vectorizer_file,
+        "compact": _export_compact(model, vectorizer, directory, version),
+        "published_at": time.time(),
+        "preprocessing": preprocessing or preprocessing_mode(),
+        "metadata": metadata or {},
+    }
+
+    def write_manifest(tmp_path):
+        with open(tmp_path, "w") as f:
+            json.dump(manifest, f, indent=2, default=str)
+
+    # The manifest swap is the publish point
+    _atomic_write(os.path.join(directory, MANIFEST_NAME), write_manifest)
+
+    atomic_dump(model, os.path.join(directory, MODEL_NAME))
+    atomic_dump(vectorizer, os.path.join(directory, VECTORIZER_NAME))
+
+    _prune_versions(directory)
+    return version
+
+
+def _export_compact(model, vectorizer, directory, version):
+    """Compact export next to the pickles; returns its directory name or None if unsupported"""
+    from compact_artifacts import export_compact
+
+    compact_dir = f"eco_model_compact-{version}"
+    try:
+        export_compact(vectorizer, model, os.path.join(directory, compact_dir), source_version=version)
+    except ValueError as e:
+        logger.info(f"Skipping compact export: {str(e)}")
+        shutil.rmtree(os.path.join(directory, compact_dir), ignore_errors=True)
+        return None
+    return compact_dir
+
+
+# Versioned artifacts: (glob pattern, prefix, suffix) around the version
+_VERSIONED = (
+    ("eco_model-*.pkl", "eco_model-", ".pkl"),
+    ("vectorizer-*.pkl", "vectorizer-", ".pkl"),
+    ("eco_model_compact-*", "eco_model_compact-", ""),
+)
+
+
+def _prune_versions(directory):
+    """
+    Remove all but the newest KEEP_VERSIONS versioned artifacts. Versions are
+    ordered by when their files were written (several can be published in
+    the same second, and the version string's random part is not an order);
+    the version named in the manifest is never removed.
+    """
+    current = (read_manifest(directory) or {}).get("version")
+    files = {}
+    for pattern, prefix, suffix in _VERSIONED:
+        for path in glob.glob(os.path.join(directory, pattern)):
+            name = os.path.basename(path)
+            if not name.endswith(suffix):
+                continue
+            files.setdefault(name[len(prefix):len(name) - len(suffix)], []).append(path)
+
+    written = {}
+    for version, paths in files.items():
+        try:
+            written[version] = max(os.stat(path).st_mtime_ns for path in paths)
+        except OSError:
+            # Removed meanwhile (another publisher pruning)
+            written[version] = 0
+    newest_first = sorted(files, key=lambda v: (written[v], v), reverse=True)
+
+    for version in newest_first[KEEP_VERSIONS:]:
+        if version == current:
+            continue
+        for path in files[version]:
+            if os.path.isdir(path):
+                shutil.rmtree(path, ignore_errors=True)
+                continue
+            try:
+                os.remove(path)
+            except OSError:
+                pass
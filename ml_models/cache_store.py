@@ -0,0 +1,207 @@
+"""
+LRU + TTL cache shared by the serving code (backend predictions, product
+pages and recommendations; assistant answers).
+
+Entries live in memory (max_entries, least recently used evicted first) and,
+with a db_path, in a SQLite table too, so they survive restarts and are
+shared by every worker process using the same file.
+
+Entries belong to one namespace at a time, e.g. a model or catalog version:
+a lookup under another namespace drops the in-memory entries (they can never
+hit again) and pruning removes the other namespaces' rows.
+
+    cache = CacheStore("prediction_cache", max_entries=10000, ttl=86400, db_path="cache.db")
+    cache.set(key, [2, 0.97], namespace=model_version)
+    cache.get(key, namespace=model_version)      # -> [2, 0.97]
+
+Values stored in SQLite must be JSON-serializable (they come back as JSON,
+e.g. tuples as lists).
+"""
+import os
+import json
+import time
+import sqlite3
+import logging
+import threading
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+
+class CacheStore:
+    """Thread-safe LRU cache with TTL, optionally backed by SQLite"""
+
+    def __init__(self, table, max_entries=1024, ttl=3600, db_path=None, max_db_entries=100000, prune_every=100):
+        self.table = table
+        self.max_entries = max_entries
+        self.ttl = ttl
+        self.max_db_entries = max_db_entries
+        self.prune_every = prune_every
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self._namespace = None
+        self._db = None
+        self._db_writes = 0
+        self.hits = 0
+        self.shared_hits = 0
+        self.misses = 0
+        self.invalidations = 0
+
+        self._db_path = db_path
+        if db_path:
+            self._connect()
+            # A connection must not be shared with forked workers (gunicorn preload_app)
+            os.register_at_fork(after_in_child=self._connect)
+
+    def _connect(self):
+        try:
+            self._db = sqlite3.connect(self._db_path, check_same_thread=False, timeout=5)
+            self._db.execute("PRAGMA journal_mode=WAL")
+            self._db.execute(
+                f"CREATE TABLE IF NOT EXISTS {self.table} "
+                "(namespace TEXT NOT NULL, key TEXT NOT NULL, value TEXT NOT NULL, "
+                "created REAL NOT NULL, PRIMARY KEY (namespace, key))"
+            )
+            self._db.commit()
+            logger.info(f"Cache {self.table} shared through {self._db_path}")
+        except sqlite3.Error as e:
+            logger.error(f"Failed to open cache database {self._db_path}: {str(e)}")
+            self._db = None
+
+    @property
+    def enabled(self):
+        return self.max_entries > 0 or self._db is not None
+
+    @property
+    def shared(self):
+        return self._db is not None
+
+    def _expired(self, created):
+        return self.ttl > 0 and time.time() - created > self.ttl
+
+    def _switch(self, namespace):
+        """Entries of another namespace can never hit again: drop them"""
+        if self._namespace == namespace:
+            return
+        if self._namespace is not None:
+            self.invalidations += 1
+        self._entries.clear()
+        self._namespace = namespace
+
+    def get(self, key, namespace=""):
+        """Cached value for key in this namespace, or None"""
+        if not self.enabled:
+            return None
+        with self._lock:
+            self._switch(namespace)
+            entry = self._entries.get(key)
+            if entry is not None:
+                value, created = entry
+                if not self._expired(created):
+                    self._entries.move_to_end(key)
+                    self.hits += 1
+                    return value
+                del self._entries[key]
+
+            if self._db is not None:
+                try:
+                    row = self._db.execute(
+                        f"SELECT value, created FROM {self.table} WHERE namespace = ? AND key = ?",
+                        (str(namespace), key),
+                    ).fetchone()
+                except sqlite3.Error as e:
+                    logger.error(f"Cache {self.table} read failed: {str(e)}")
+                    row = None
+                if row is not None and not self._expired(row[1]):
+                    value = json.loads(row[0])
+                    self._remember(key, value, row[1])
+                    self.hits += 1
+                    self.shared_hits += 1
+                    return value
+
+            self.misses += 1
+            return None
+
+    def set(self, key, value, namespace=""):
+        """
+        Store a value. Writes for a namespace other than the current one (a
+        result computed just before a version change) are dropped.
+        """
+        if not self.enabled:
+            return
+        created = time.time()
+        with self._lock:
+            if self._namespace is None:
+                self._namespace = namespace
+            elif self._namespace != namespace:
+                return
+            self._remember(key, value, created)
+            if self._db is not None:
+                try:
+                    self._db.execute(
+                        f"INSERT OR REPLACE INTO {self.table} (namespace, key, value, created) VALUES (?, ?, ?, ?)",
+                        (str(namespace), key, json.dumps(value), created),
+                    )
+                    self._db_writes += 1
+                    if self._db_writes % self.prune_every == 0:
+                        self._prune_db(namespace, created)
+                    self._db.commit()
+                except (sqlite3.Error, TypeError, ValueError) as e:
+                    logger.error(f"Cache {self.table} write failed: {str(e)}")
+
+    def _remember(self, key, value, created):
+        if self.max_entries <= 0:
+            return
+        self._entries[key] = (value, created)
+        self._entries.move_to_end(key)
+        while len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def _prune_db(self, namespace, now):
+        self._db.execute(f"DELETE FROM {self.table} WHERE namespace != ?", (str(namespace),))
+        if self.ttl > 0:
+            self._db.execute(f"DELETE FROM {self.table} WHERE created < ?", (now - self.ttl,))
+        self._db.execute(
+            f"DELETE FROM {self.table} WHERE rowid NOT IN "
+            f"(SELECT rowid FROM {self.table} ORDER BY created DESC LIMIT ?)",
+            (self.max_db_entries,),
+        )
+
+    def invalidate(self, namespace=""):
+        """Make `namespace` the current one and forget every entry, in memory and (other namespaces) on disk"""
+        with self._lock:
+            self._switch(namespace)
+            self._entries.clear()
+            if self._db is not None:
+                try:
+                    self._db.execute(f"DELETE FROM {self.table} WHERE namespace != ?", (str(namespace),))
+                    self._db.commit()
+                except sqlite3.Error as e:
+                    logger.error(f"Cache {self.table} invalidation failed: {str(e)}")
+
+    def clear(self):
+        """Forget every entry of every namespace"""
+        with self._lock:
+            self._entries.clear()
+            if self._db is not None:
+                try:
+                    self._db.execute(f"DELETE FROM {self.table}")
+                    self._db.commit()
+                except sqlite3.Error as e:
+                    logger.error(f"Cache {self.table} clear failed: {str(e)}")
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "max_entries": self.max_entries,
+                "ttl_seconds": self.ttl,
+                "shared": self._db is not None,
+                "namespace": self._namespace,
+                "hits": self.hits,
+                "shared_hits": self.shared_hits,
+                "misses": self.misses,
+                "invalidations": self.invalidations,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
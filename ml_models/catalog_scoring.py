@@ -0,0 +1,132 @@
+"""
+Offline eco-label scoring of the whole product catalog.
+
+Labels every catalog row with the served model and stores the result next
+to the catalog, keyed by asin:
+
+    finalwebsite.csv  ->  finalwebsite.ecolabels.csv
+        asin, title_hash, EcoLabel, EcoConfidence, model_version
+
+Rerunning only re-scores rows that are new, whose title changed, or that
+were scored by another model version. The backend reads this file for
+/api/products and the recommender (and fills in stale rows the same way).
+
+    python catalog_scoring.py ../backend/data/finalwebsite.csv
+    python catalog_scoring.py ../backend/data/finalwebsite.csv --full
+"""
+import os
+import time
+import hashlib
+import argparse
+import numpy as np
+import pandas as pd
+from artifact_store import _atomic_write, served_version
+
+LABELS_SUFFIX = ".ecolabels.csv"
+LABEL_COLUMNS = ["asin", "title_hash", "EcoLabel", "EcoConfidence", "model_version"]
+
+
+def labels_path(csv_path):
+    return os.path.splitext(csv_path)[0] + LABELS_SUFFIX
+
+
+def title_hash(title):
+    return hashlib.sha1(str(title).encode("utf-8")).hexdigest()[:16]
+
+
+def read_labels(path):
+    """Stored labels (DataFrame with LABEL_COLUMNS), or None if there are none yet"""
+    try:
+        labels = pd.read_csv(path, dtype={"asin": str, "title_hash": str, "model_version": str})
+    except (FileNotFoundError, pd.errors.EmptyDataError):
+        return None
+    if set(LABEL_COLUMNS) - set(labels.columns):
+        return None
+    return labels.drop_duplicates(subset="asin", keep="last")
+
+
+def write_labels(labels, path):
+    """Write the labels file atomically (readers never see a partial one)"""
+    _atomic_write(path, lambda tmp: labels[LABEL_COLUMNS].to_csv(tmp, index=False))
+
+
+def score_catalog(asins, titles, version, score, previous=None):
+    """
+    Labels for every catalog row, in catalog order, reusing `previous` rows
+    whose title hash and model version still match. `score(titles)` returns
+    (labels, confidences) for the rows that need scoring.
+    Returns (DataFrame with LABEL_COLUMNS, number of rows scored).
+    """
+    labels = pd.DataFrame({
+        "asin": [str(a) for a in asins],
+        "title_hash": [title_hash(t) for t in titles],
+    })
+
+    if previous is not None and len(previous):
+        stored = previous.set_index("asin")
+        labels = labels.join(stored[["title_hash", "EcoLabel", "EcoConfidence", "model_version"]],
+                             on="asin", rsuffix="_stored")
+        stale = ((labels["title_hash_stored"] != labels["title_hash"])
+                 | (labels["model_version"] != version)
+                 | labels["EcoLabel"].isna()).to_numpy()
+        labels = labels.drop(columns=["title_hash_stored"])
+    else:
+        labels["EcoLabel"] = np.nan
+        labels["EcoConfidence"] = np.nan
+        labels["model_version"] = None
+        stale = np.ones(len(labels), dtype=bool)
+
+    positions = np.flatnonzero(stale)
+    if len(positions):
+        predicted, confidences = score([str(titles[i]) for i in positions])
+        labels.loc[stale, "EcoLabel"] = np.asarray(predicted)
+        labels.loc[stale, "EcoConfidence"] = np.asarray(confidences, dtype=float)
+        labels.loc[stale, "model_version"] = version
+
+    labels["EcoLabel"] = labels["EcoLabel"].astype(int)
+    labels["EcoConfidence"] = labels["EcoConfidence"].astype(float)
+    return labels[LABEL_COLUMNS], int(len(positions))
+
+
+def sklearn_scorer(model, vectorizer):
+    """score() for score_catalog: one vectorize + predict_proba pass over all titles"""
+    from text_preprocessing import clean_texts
+
+    def score(titles):
+        probabilities = model.predict_proba(vectorizer.transform(clean_texts(titles, n_jobs=-1)))
+        best = probabilities.argmax(axis=1)
+        return model.classes_[best], probabilities[np.arange(len(titles)), best]
+
+    return score
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Precompute eco labels for the product catalog")
+    parser.add_argument("catalog", help="catalog CSV with asin and title columns")
+    parser.add_argument("--artifacts-dir", default=".", help="directory with the served model artifacts")
+    parser.add_argument("--full", action="store_true", help="re-score every row")
+    args = parser.parse_args()
+
+    from compact_artifacts import _load_served_artifacts
+
+    catalog = pd.read_csv(args.catalog, usecols=["asin", "title"])
+    path = labels_path(args.catalog)
+    previous = None if args.full else read_labels(path)
+
+    _, model, vectorizer = _load_served_artifacts(args.artifacts_dir)
+    version = served_version(args.artifacts_dir)
+
+    started = time.perf_counter()
+    labels, scored = score_catalog(
+        catalog["asin"].tolist(), catalog["title"].fillna("").astype(str).tolist(),
+        version, sklearn_scorer(model, vectorizer), previous,
+    )
+    write_labels(labels, path)
+
+    counts = labels["EcoLabel"].value_counts().to_dict()
+    print(f"🏷️  Scored {scored} of {len(labels)} rows in {time.perf_counter() - started:.2f}s (model {version})")
+    print(f"   Harmful={counts.get(0, 0)}, Moderate={counts.get(1, 0)}, Eco-friendly={counts.get(2, 0)} -> {path}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,305 @@
+"""
+Columnar, memory-mapped copy of the product catalog CSV.
+
+Every service used to parse finalwebsite.csv itself (and every worker again).
+open_catalog() converts the CSV once into plain numpy columns next to it and
+memory-maps them, so all processes share the same read-only pages:
+
+    finalwebsite.columns/<fingerprint>/meta.json          columns, kinds, row count
+    finalwebsite.columns/<fingerprint>/<col>.npy          numeric / bool columns
+    finalwebsite.columns/<fingerprint>/<col>.codes.npy    categorical codes (int32, -1 = missing)
+    finalwebsite.columns/<fingerprint>/<col>.categories.json
+    finalwebsite.columns/<fingerprint>/<col>.blob.npy     UTF-8 bytes of a string column
+    finalwebsite.columns/<fingerprint>/<col>.offsets.npy  row i is blob[offsets[i]:offsets[i + 1]]
+    finalwebsite.columns/<fingerprint>/<col>.null.npy     missing strings (only if any)
+
+The fingerprint is the CSV's size and mtime, so editing the CSV produces a
+new conversion on the next open; the directory is renamed into place only
+once complete, so concurrent workers never see a partial one.
+
+    python catalog_store.py convert ../backend/data/finalwebsite.csv
+    python catalog_store.py info ../backend/data/finalwebsite.csv
+"""
+import os
+import json
+import uuid
+import shutil
+import argparse
+import numpy as np
+
+FORMAT_VERSION = 1
+CATEGORICAL_COLUMNS = ("categoryName",)
+
+# Older conversions kept so readers that opened them can finish
+KEEP_CONVERSIONS = 2
+
+
+def _store_dir(csv_path):
+    return os.path.splitext(os.path.abspath(csv_path))[0] + ".columns"
+
+
+def fingerprint(csv_path):
+    """Identifies one state of the CSV file (changes whenever it is rewritten)"""
+    stat = os.stat(csv_path)
+    return f"{stat.st_size:x}-{stat.st_mtime_ns:x}"
+
+
+class StringColumn:
+    """Strings stored as one UTF-8 blob plus row offsets; decoded on access"""
+
+    def __init__(self, blob, offsets, null=None):
+        self.blob = blob
+        self.offsets = offsets
+        self.null = null
+
+    def __len__(self):
+        return len(self.offsets) - 1
+
+    def __getitem__(self, row):
+        if self.null is not None and self.null[row]:
+            return float("nan")
+        start, end = self.offsets[row], self.offsets[row + 1]
+        return self.blob[start:end].tobytes().decode("utf-8")
+
+    def take(self, positions=None):
+        """List of str for the given row positions (all rows if None)"""
+        if positions is None:
+            data = self.blob.tobytes()
+            offsets = self.offsets.tolist()
+            values = [data[offsets[i]:offsets[i + 1]].decode("utf-8") for i in range(len(offsets) - 1)]
+            if self.null is not None:
+                for row in np.flatnonzero(self.null):
+                    values[row] = float("nan")
+            return values
+        return [self[int(row)] for row in positions]
+
+
+class CategoricalColumn:
+    """Integer codes into a small list of category names"""
+
+    def __init__(self, codes, categories):
+        self.codes = codes
+        self.categories = categories
+        self._category_array = np.array(categories + [float("nan")], dtype=object)
+
+    def __len__(self):
+        return len(self.codes)
+
+    def __getitem__(self, row):
+        return self._category_array[self.codes[row]]
+
+    def take(self, positions=None):
+        codes = self.codes if positions is None else self.codes[positions]
+        return self._category_array[codes].tolist()
+
+    def code_of(self, name, case_sensitive=True):
+        """Codes whose category equals `name` (several only when matching case-insensitively)"""
+        if case_sensitive:
+            return [i for i, c in enumerate(self.categories) if c == name]
+        name = name.lower()
+        return [i for i, c in enumerate(self.categories) if c.lower() == name]
+
+
+class NumericColumn:
+    """A memory-mapped numpy column"""
+
+    def __init__(self, values):
+        self.values = values
+
+    def __len__(self):
+        return len(self.values)
+
+    def __getitem__(self, row):
+        return self.values[row].item()
+
+    def take(self, positions=None):
+        values = self.values if positions is None else self.values[positions]
+        return values.tolist()
+
+
+class ColumnarCatalog:
+    """Read-only catalog backed by memory-mapped columns"""
+
+    def __init__(self, directory, meta, columns):
+        self.directory = directory
+        self.meta = meta
+        self.version = meta["fingerprint"]
+        self.columns = list(meta["columns"])
+        self._columns = columns
+
+    def __len__(self):
+        return self.meta["rows"]
+
+    def __contains__(self, name):
+        return name in self._columns
+
+    def __getitem__(self, name):
+        return self._columns[name]
+
+    @classmethod
+    def load(cls, directory, mmap=True):
+        with open(os.path.join(directory, "meta.json"), "r") as f:
+            meta = json.load(f)
+        if meta.get("format_version") != FORMAT_VERSION:
+            raise ValueError(f"Unsupported catalog format version: {meta.get('format_version')}")
+
+        mode = "r" if mmap else None
+
+        def array(name):
+            return np.load(os.path.join(directory, f"{name}.npy"), mmap_mode=mode, allow_pickle=False)
+
+        columns = {}
+        for name, kind in meta["columns"].items():
+            if kind == "category":
+                with open(os.path.join(directory, f"{name}.categories.json"), "r") as f:
+                    columns[name] = CategoricalColumn(array(f"{name}.codes"), json.load(f))
+            elif kind == "string":
+                null = array(f"{name}.null") if os.path.exists(os.path.join(directory, f"{name}.null.npy")) else None
+                columns[name] = StringColumn(array(f"{name}.blob"), array(f"{name}.offsets"), null)
+            else:
+                columns[name] = NumericColumn(array(name))
+        return cls(directory, meta, columns)
+
+    def numeric(self, name):
+        """The raw numpy array of a numeric column (zero-copy)"""
+        return self._columns[name].values
+
+    def records(self, positions=None, fields=None):
+        """Row dicts (like DataFrame.to_dict('records')) for the given positions"""
+        fields = fields or self.columns
+        values = [self._columns[name].take(positions) for name in fields]
+        return [dict(zip(fields, row)) for row in zip(*values)]
+
+    def to_frame(self, columns=None, categorical=True):
+        """
+        pandas DataFrame of the catalog. Numeric columns wrap the mapped arrays
+        without copying; strings are decoded into Python objects. Categorical
+        columns stay pandas Categoricals over the stored codes unless
+        categorical=False.
+        """
+        import pandas as pd
+
+        data = {}
+        for name in columns or self.columns:
+            column = self._columns[name]
+            if isinstance(column, CategoricalColumn) and categorical:
+                data[name] = pd.Categorical.from_codes(np.asarray(column.codes), categories=column.categories)
+            elif isinstance(column, CategoricalColumn):
+                data[name] = pd.array(column.take(), dtype=object)
+            elif isinstance(column, StringColumn):
+                data[name] = pd.array(column.take(), dtype=object)
+            else:
+                data[name] = column.values
+        return pd.DataFrame(data, copy=False)
+
+
+def convert(csv_path, directory=None):
+    """Convert the CSV into a columnar directory; returns its path"""
+    import pandas as pd
+
+    version = fingerprint(csv_path)
+    store = _store_dir(csv_path)
+    directory = directory or os.path.join(store, version)
+    df = pd.read_csv(csv_path)
+
+    tmp_dir = f"{directory}.tmp-{os.getpid()}-{uuid.uuid4().hex[:6]}"
+    os.makedirs(tmp_dir)
+    try:
+        kinds = {}
+        for name in df.columns:
+            series = df[name]
+            if name in CATEGORICAL_COLUMNS:
+                categorical = pd.Categorical(series)
+                np.save(os.path.join(tmp_dir, f"{name}.codes.npy"), categorical.codes.astype(np.int32))
+                with open(os.path.join(tmp_dir, f"{name}.categories.json"), "w") as f:
+                    json.dump([str(c) for c in categorical.categories], f)
+                kinds[name] = "category"
+            elif series.dtype.kind in "biuf":
+                np.save(os.path.join(tmp_dir, f"{name}.npy"), series.to_numpy())
+                kinds[name] = "numeric"
+            else:
+                null = series.isna().to_numpy()
+                encoded = [b"" if missing else str(value).encode("utf-8") for value, missing in zip(series, null)]
+                offsets = np.zeros(len(encoded) + 1, dtype=np.int64)
+                np.cumsum([len(e) for e in encoded], out=offsets[1:])
+                np.save(os.path.join(tmp_dir, f"{name}.blob.npy"), np.frombuffer(b"".join(encoded), dtype=np.uint8))
+                np.save(os.path.join(tmp_dir, f"{name}.offsets.npy"), offsets)
+                if null.any():
+                    np.save(os.path.join(tmp_dir, f"{name}.null.npy"), null)
+                kinds[name] = "string"
+
+        meta = {
+            "format_version": FORMAT_VERSION,
+            "fingerprint": version,
+            "source": os.path.basename(csv_path),
+            "rows": len(df),
+            "columns": kinds,
+        }
+        with open(os.path.join(tmp_dir, "meta.json"), "w") as f:
+            json.dump(meta, f, indent=2)
+
+        try:
+            os.rename(tmp_dir, directory)
+        except OSError:
+            # Another process finished the same conversion first
+            if not os.path.exists(os.path.join(directory, "meta.json")):
+                raise
+    finally:
+        shutil.rmtree(tmp_dir, ignore_errors=True)
+
+    _prune_conversions(store, keep=version)
+    return directory
+
+
+def _prune_conversions(store, keep):
+    if not os.path.isdir(store):
+        return
+    entries = sorted(
+        (e for e in os.scandir(store) if e.is_dir() and ".tmp-" not in e.name and e.name != keep),
+        key=lambda e: e.stat().st_mtime,
+    )
+    for entry in entries[:max(0, len(entries) - (KEEP_CONVERSIONS - 1))]:
+        shutil.rmtree(entry.path, ignore_errors=True)
+
+
+_opened = {}
+
+
+def open_catalog(csv_path):
+    """
+    The ColumnarCatalog for the current contents of `csv_path`, converting the
+    CSV first if needed. Cached per process until the CSV changes.
+    Raises FileNotFoundError if the CSV is missing.
+    """
+    version = fingerprint(csv_path)
+    key = os.path.abspath(csv_path)
+    cached = _opened.get(key)
+    if cached is not None and cached.version == version:
+        return cached
+
+    directory = os.path.join(_store_dir(csv_path), version)
+    if not os.path.exists(os.path.join(directory, "meta.json")):
+        convert(csv_path, directory)
+    catalog = ColumnarCatalog.load(directory)
+    _opened[key] = catalog
+    return catalog
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Columnar copy of the product catalog CSV")
+    parser.add_argument("command", choices=["convert", "info"])
+    parser.add_argument("csv", help="catalog CSV (e.g. ../backend/data/finalwebsite.csv)")
+    args = parser.parse_args()
+
+    if args.command == "convert":
+        directory = convert(args.csv)
+        print(f"📦 Columnar catalog written to {directory}")
+    else:
+        catalog = open_catalog(args.csv)
+        print(f"📦 {catalog.directory}: {len(catalog)} rows")
+        for name, kind in catalog.meta["columns"].items():
+            print(f"  {name:<20} {kind}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,273 @@
+"""
+Compact, memory-mappable export of the TF-IDF + linear eco-label model.
+
+The pickled TfidfVectorizer carries a Python dict of up to 15k n-gram
+strings that every worker has to unpickle. The compact format stores plain
+numpy arrays instead, which np.load can memory-map in milliseconds:
+
+    <dir>/meta.json       format version, tokenizer settings, stop words
+    <dir>/vocab.npy       n-gram terms as sorted UTF-8 bytes (|S dtype)
+    <dir>/idf.npy         IDF weights, in vocab order
+    <dir>/coef.npy        classifier coefficients (n_classes x n_terms), in vocab order
+    <dir>/intercept.npy   classifier intercepts
+    <dir>/classes.npy     class labels
+
+Columns are reordered to follow the sorted vocabulary, so a term's position
+found with np.searchsorted is directly its feature index.
+
+    python compact_artifacts.py export              # served artifacts -> eco_model_compact/
+    python compact_artifacts.py verify              # compare with sklearn on the whole dataset
+"""
+import os
+import re
+import json
+import argparse
+from collections import Counter
+import numpy as np
+
+FORMAT_VERSION = 1
+DEFAULT_DIR = "eco_model_compact"
+DATA_PATH = "finalwebsite_with_ecolabel.csv"
+
+
+def _multi_class(model, n_classes):
+    """'ovr' or 'multinomial', matching how the fitted model computes predict_proba"""
+    if n_classes <= 2:
+        return "binary"
+    if type(model).__name__ != "LogisticRegression":
+        return "ovr"  # SGDClassifier and other linear one-vs-rest models
+    multi_class = getattr(model, "multi_class", "auto")
+    if multi_class == "ovr" or getattr(model, "solver", None) == "liblinear":
+        return "ovr"
+    return "multinomial"
+
+
+def export_compact(vectorizer, model, out_dir=DEFAULT_DIR, source_version=None):
+    """
+    Write a fitted TfidfVectorizer + linear classifier in the compact format.
+    Raises ValueError for configurations the compact scorer cannot reproduce.
+    """
+    if type(vectorizer).__name__ != "TfidfVectorizer":
+        raise ValueError(f"Compact export needs a TfidfVectorizer, got {type(vectorizer).__name__}")
+    if vectorizer.analyzer != "word" or vectorizer.tokenizer is not None or vectorizer.preprocessor is not None:
+        raise ValueError("Compact export only supports the default word analyzer")
+    if vectorizer.strip_accents is not None:
+        raise ValueError("Compact export does not support strip_accents")
+    if not hasattr(model, "coef_") or not hasattr(model, "intercept_"):
+        raise ValueError(f"Compact export needs a linear classifier, got {type(model).__name__}")
+
+    terms = np.array(sorted(vectorizer.vocabulary_, key=lambda t: t.encode("utf-8")), dtype=object)
+    order = np.array([vectorizer.vocabulary_[t] for t in terms], dtype=np.int64)
+    vocab = np.array([t.encode("utf-8") for t in terms], dtype=bytes)
+
+    if vectorizer.use_idf:
+        idf = np.asarray(vectorizer.idf_, dtype=np.float64)[order]
+    else:
+        idf = np.ones(len(order), dtype=np.float64)
+    coef = np.ascontiguousarray(np.asarray(model.coef_, dtype=np.float64)[:, order])
+    classes = np.asarray(model.classes_)
+
+    stop_words = vectorizer.get_stop_words()
+    meta = {
+        "format_version": FORMAT_VERSION,
+        "source_version": source_version,
+        "n_features": int(len(vocab)),
+        "lowercase": bool(vectorizer.lowercase),
+        "token_pattern": vectorizer.token_pattern,
+        "ngram_range": list(vectorizer.ngram_range),
+        "stop_words": sorted(stop_words) if stop_words else None,
+        "binary": bool(vectorizer.binary),
+        "sublinear_tf": bool(vectorizer.sublinear_tf),
+        "norm": vectorizer.norm,
+        "multi_class": _multi_class(model, len(classes)),
+    }
+
+    os.makedirs(out_dir, exist_ok=True)
+    np.save(os.path.join(out_dir, "vocab.npy"), vocab)
+    np.save(os.path.join(out_dir, "idf.npy"), idf)
+    np.save(os.path.join(out_dir, "coef.npy"), coef)
+    np.save(os.path.join(out_dir, "intercept.npy"), np.asarray(model.intercept_, dtype=np.float64))
+    np.save(os.path.join(out_dir, "classes.npy"), classes)
+    # meta.json last: a directory without it is incomplete
+    with open(os.path.join(out_dir, "meta.json"), "w") as f:
+        json.dump(meta, f, indent=2)
+    return out_dir
+
+
+class CompactModel:
+    """
+    Scorer for the compact format that reproduces
+    vectorizer.transform -> model.predict_proba without scikit-learn.
+    The only implementation of the analyzer, tf-idf weighting and linear
+    scoring outside scikit-learn (eco_inference.py builds on it).
+    """
+
+    def __init__(self, meta, vocab, idf, coef, intercept, classes):
+        if meta.get("format_version") != FORMAT_VERSION:
+            raise ValueError(f"Unsupported compact format version: {meta.get('format_version')}")
+        self.meta = meta
+        self.version = meta.get("source_version")
+        # Plain ndarray views (still backed by the mapped file): indexing a
+        # np.memmap creates memmap objects, which costs more than the math here
+        self.vocab = np.asarray(vocab)
+        self.idf = np.asarray(idf)
+        self.coef = np.asarray(coef)
+        self.intercept = np.asarray(intercept)
+        self.classes_ = np.asarray(classes)
+        self._token_re = re.compile(meta["token_pattern"])
+        self._stop_words = frozenset(meta["stop_words"] or ())
+        min_n, max_n = meta["ngram_range"]
+        self._unigrams = min_n == 1
+        self._ngram_sizes = range(max(min_n, 2), max_n + 1)
+        self._vocabulary = None
+
+    @classmethod
+    def load(cls, directory=DEFAULT_DIR, mmap=True):
+        """Load a compact export; arrays are memory-mapped unless mmap=False"""
+        with open(os.path.join(directory, "meta.json"), "r") as f:
+            meta = json.load(f)
+        mode = "r" if mmap else None
+        arrays = {
+            name: np.load(os.path.join(directory, f"{name}.npy"), mmap_mode=mode, allow_pickle=False)
+            for name in ("vocab", "idf", "coef", "intercept", "classes")
+        }
+        return cls(meta, **arrays)
+
+    @property
+    def vocabulary(self):
+        """term -> feature index (O(1) lookups per n-gram), built on first use"""
+        if self._vocabulary is None:
+            self._vocabulary = {term.decode("utf-8"): i for i, term in enumerate(self.vocab.tolist())}
+        return self._vocabulary
+
+    def analyze(self, text):
+        """Word n-grams exactly as TfidfVectorizer's default analyzer builds them"""
+        if self.meta["lowercase"]:
+            text = text.lower()
+        tokens = [t for t in self._token_re.findall(text) if t not in self._stop_words]
+
+        ngrams = list(tokens) if self._unigrams else []
+        for n in self._ngram_sizes:
+            ngrams.extend(map(" ".join, zip(*(tokens[i:] for i in range(n)))))
+        return ngrams
+
+    def features(self, text):
+        """(feature indices, tf-idf values) of one document, normalized like sklearn"""
+        lookup = self.vocabulary.get
+        counts = Counter([i for i in map(lookup, self.analyze(text)) if i is not None])
+        if not counts:
+            return np.empty(0, dtype=np.intp), np.empty(0, dtype=np.float64)
+
+        # Sorted like sklearn's CSR columns, so sums are accumulated in the same order
+        items = sorted(counts.items())
+        indices = np.fromiter((i for i, _ in items), dtype=np.intp, count=len(items))
+        values = np.fromiter((c for _, c in items), dtype=np.float64, count=len(items))
+        if self.meta["binary"]:
+            values[:] = 1.0
+        elif self.meta["sublinear_tf"]:
+            values = np.log(values) + 1.0
+        values *= self.idf[indices]
+
+        norm = self.meta["norm"]
+        if norm == "l2":
+            length = np.sqrt(np.dot(values, values))
+        elif norm == "l1":
+            length = np.abs(values).sum()
+        else:
+            length = 0.0
+        if length > 0:
+            values /= length
+        return indices, values
+
+    def decision_function(self, texts):
+        scores = np.empty((len(texts), len(self.intercept)), dtype=np.float64)
+        for row, text in enumerate(texts):
+            indices, values = self.features(text)
+            scores[row] = self.coef[:, indices] @ values + self.intercept
+        return scores
+
+    def predict_proba(self, texts):
+        return self._probabilities(self.decision_function(texts))
+
+    def _probabilities(self, scores):
+        multi_class = self.meta["multi_class"]
+        if multi_class == "binary":
+            positive = 1.0 / (1.0 + np.exp(-scores[:, 0]))
+            return np.column_stack([1.0 - positive, positive])
+        if multi_class == "multinomial":
+            scores -= scores.max(axis=1, keepdims=True)
+            np.exp(scores, out=scores)
+        else:
+            scores = 1.0 / (1.0 + np.exp(-scores))
+        scores /= scores.sum(axis=1, keepdims=True)
+        return scores
+
+    def predict(self, texts):
+        scores = self.decision_function(texts)
+        if self.meta["multi_class"] == "binary":
+            return self.classes_[(scores[:, 0] > 0).astype(int)]
+        return self.classes_[scores.argmax(axis=1)]
+
+    def predict_one(self, text):
+        """(label, confidence) for one cleaned title, from a single scoring pass"""
+        indices, values = self.features(text)
+        proba = self._probabilities((self.coef[:, indices] @ values + self.intercept)[None, :])[0]
+        best = int(proba.argmax())
+        label = self.classes_[best]
+        return (label.item() if hasattr(label, "item") else label), float(proba[best])
+
+
+def _load_served_artifacts(directory="."):
+    """(version, model, vectorizer) currently published in `directory`"""
+    import joblib
+    from artifact_store import read_manifest, MODEL_NAME, VECTORIZER_NAME
+
+    manifest = read_manifest(directory)
+    if manifest:
+        model_path = os.path.join(directory, manifest["model"])
+        vectorizer_path = os.path.join(directory, manifest["vectorizer"])
+        version = manifest["version"]
+    else:
+        model_path = os.path.join(directory, MODEL_NAME)
+        vectorizer_path = os.path.join(directory, VECTORIZER_NAME)
+        version = None
+    return version, joblib.load(model_path), joblib.load(vectorizer_path)
+
+
+def verify(compact, model, vectorizer, titles):
+    """Compare compact and sklearn predictions; returns (label mismatches, max probability difference)"""
+    from text_preprocessing import clean_texts
+
+    cleaned = clean_texts(titles)
+    expected = model.predict_proba(vectorizer.transform(cleaned))
+    actual = compact.predict_proba(cleaned)
+    mismatches = int((model.classes_[expected.argmax(axis=1)] != compact.predict(cleaned)).sum())
+    return mismatches, float(np.abs(expected - actual).max())
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Export/verify the compact eco-label model")
+    parser.add_argument("command", choices=["export", "verify"])
+    parser.add_argument("--artifacts-dir", default=".", help="directory with the served .pkl artifacts")
+    parser.add_argument("--out", default=DEFAULT_DIR, help="compact model directory")
+    parser.add_argument("--data", default=DATA_PATH, help="CSV whose titles are used by verify")
+    args = parser.parse_args()
+
+    version, model, vectorizer = _load_served_artifacts(args.artifacts_dir)
+
+    if args.command == "export":
+        export_compact(vectorizer, model, args.out, source_version=version)
+        size = sum(os.path.getsize(os.path.join(args.out, f)) for f in os.listdir(args.out))
+        print(f"📦 Compact model written to {args.out} ({size / 1024:.0f} KiB)")
+    else:
+        import pandas as pd
+
+        titles = pd.read_csv(args.data)["title"].astype(str).tolist()
+        mismatches, max_diff = verify(CompactModel.load(args.out), model, vectorizer, titles)
+        print(f"🔎 {len(titles)} titles: {mismatches} label mismatches, max probability difference {max_diff:.2e}")
+        if mismatches:
+            raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,100 @@
+"""
+Single-item eco-label inference without scikit-learn.
+
+EcoInferenceEngine cleans a raw title and scores it with the CompactModel
+of a compact export (compact_artifacts.py), which holds the one
+sklearn-compatible analyzer and scorer: label and confidence come back
+from a single pass, so there is no second predict_proba call.
+
+    python eco_inference.py verify      # compare with sklearn on the whole dataset + latency
+"""
+import os
+import time
+import argparse
+import numpy as np
+from compact_artifacts import CompactModel, DEFAULT_DIR, DATA_PATH
+from text_preprocessing import clean_text
+
+
+class EcoInferenceEngine:
+    """Fast single-title scorer: title cleaning + CompactModel (same predictions as sklearn)"""
+
+    def __init__(self, compact):
+        self.compact = compact
+        self.version = compact.version
+        self.classes = [c.item() if hasattr(c, "item") else c for c in compact.classes_]
+        # Build the term lookup now rather than on the first request
+        compact.vocabulary
+
+    @classmethod
+    def load(cls, directory=DEFAULT_DIR):
+        return cls(CompactModel.load(directory, mmap=True))
+
+    def predict_proba(self, text, clean=True):
+        """Class probabilities (in self.classes order) for one title"""
+        text = clean_text(text) if clean else text
+        return self.compact.predict_proba([text])[0].tolist()
+
+    def predict_one(self, title, clean=True):
+        """(label, confidence) for one raw title"""
+        return self.compact.predict_one(clean_text(title) if clean else title)
+
+    def predict_many(self, titles, clean=True):
+        """Lists of labels and confidences for raw titles"""
+        labels, confidences = [], []
+        for title in titles:
+            label, confidence = self.predict_one(title, clean)
+            labels.append(label)
+            confidences.append(confidence)
+        return labels, confidences
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Verify the sklearn-free eco-label engine")
+    parser.add_argument("command", choices=["verify"])
+    parser.add_argument("--artifacts-dir", default=".", help="directory with the served .pkl artifacts")
+    parser.add_argument("--compact", default=None, help="compact model directory (default: from the manifest)")
+    parser.add_argument("--data", default=DATA_PATH, help="CSV whose titles are scored")
+    args = parser.parse_args()
+
+    import pandas as pd
+    from compact_artifacts import _load_served_artifacts
+    from artifact_store import read_manifest
+    from text_preprocessing import clean_texts
+
+    manifest = read_manifest(args.artifacts_dir) or {}
+    compact_dir = args.compact or os.path.join(args.artifacts_dir, manifest.get("compact") or DEFAULT_DIR)
+    engine = EcoInferenceEngine.load(compact_dir)
+    _, model, vectorizer = _load_served_artifacts(args.artifacts_dir)
+
+    titles = pd.read_csv(args.data)["title"].astype(str).tolist()
+    cleaned = clean_texts(titles)
+
+    expected = model.predict_proba(vectorizer.transform(cleaned))
+    expected_labels = model.classes_[expected.argmax(axis=1)]
+    labels, confidences = engine.predict_many(cleaned, clean=False)
+    mismatches = int((np.asarray(labels) != expected_labels).sum())
+    max_diff = float(np.abs(expected.max(axis=1) - np.asarray(confidences)).max())
+    print(f"🔎 {len(titles)} titles: {mismatches} label mismatches, max confidence difference {max_diff:.2e}")
+
+    # Single-item latency, raw titles (cleaning included)
+    sample = titles[:500]
+    started = time.perf_counter()
+    for title in sample:
+        engine.predict_one(title)
+    engine_us = (time.perf_counter() - started) / len(sample) * 1e6
+
+    started = time.perf_counter()
+    for title in sample:
+        X = vectorizer.transform([clean_text(title)])
+        model.predict(X)
+        model.predict_proba(X)
+    sklearn_us = (time.perf_counter() - started) / len(sample) * 1e6
+    print(f"⏱️  per title: engine {engine_us:.1f} µs, sklearn {sklearn_us:.1f} µs")
+
+    if mismatches:
+        raise SystemExit(1)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,236 @@
+"""
+Incremental (online) training for the eco-label classifier.
+
+Instead of retraining from scratch, new labelled rows are streamed into a
+HashingVectorizer + SGDClassifier(log_loss) model with partial_fit:
+
+    python incremental_training.py init                      # bootstrap from finalwebsite_with_ecolabel.csv
+    python incremental_training.py ingest new_labels.csv     # learn from a delta (title, EcoLabel columns)
+    python incremental_training.py evaluate                  # accuracy on the held-out set
+    python incremental_training.py publish --min-accuracy 0.9
+
+The hashing vectorizer is stateless, so it never needs refitting as the
+catalog grows. `publish` writes artifacts through artifact_store, which the
+backend's model registry hot-swaps.
+"""
+import os
+import json
+import time
+import hashlib
+import argparse
+import numpy as np
+import pandas as pd
+import joblib
+from sklearn.feature_extraction.text import HashingVectorizer
+from sklearn.linear_model import SGDClassifier
+from sklearn.metrics import accuracy_score, classification_report
+from sklearn.model_selection import train_test_split
+from text_preprocessing import check_preprocessing, clean_texts, preprocessing_mode
+from artifact_store import atomic_dump, publish_artifacts
+
+DATA_PATH = "finalwebsite_with_ecolabel.csv"
+STATE_DIR = "incremental_state"
+CLASSES = np.array([0, 1, 2])  # 0=Harmful, 1=Moderate, 2=Eco-friendly
+
+HASHING_PARAMS = {
+    "n_features": 2 ** 20,
+    "ngram_range": (1, 3),
+    "stop_words": "english",
+    "alternate_sign": False,
+    "norm": "l2",
+}
+
+SGD_PARAMS = {
+    "loss": "log_loss",
+    "alpha": 1e-5,
+    "class_weight": None,
+    "random_state": 42,
+}
+
+
+class IncrementalTrainer:
+    """Online classifier state persisted under `state_dir`"""
+
+    def __init__(self, state_dir=STATE_DIR):
+        self.state_dir = state_dir
+        self.vectorizer = HashingVectorizer(**HASHING_PARAMS)
+        self.model = None
+        self.heldout = None
+        self.state = {"samples_seen": 0, "batches": [], "published_version": None,
+                      "preprocessing": preprocessing_mode()}
+
+    @property
+    def _model_path(self):
+        return os.path.join(self.state_dir, "classifier.joblib")
+
+    @property
+    def _heldout_path(self):
+        return os.path.join(self.state_dir, "heldout.csv")
+
+    @property
+    def _state_path(self):
+        return os.path.join(self.state_dir, "state.json")
+
+    def load(self):
+        if not os.path.exists(self._model_path):
+            raise FileNotFoundError(f"No incremental model in {self.state_dir}. Run `init` first.")
+        self.model = joblib.load(self._model_path)
+        self.heldout = pd.read_csv(self._heldout_path)
+        with open(self._state_path, "r") as f:
+            self.state = json.load(f)
+        # Every batch must be cleaned like the ones the model has already seen
+        check_preprocessing(self.state.get("preprocessing"), what="incremental model")
+        return self
+
+    def save(self):
+        os.makedirs(self.state_dir, exist_ok=True)
+        atomic_dump(self.model, self._model_path)
+        self.heldout.to_csv(self._heldout_path, index=False)
+        with open(self._state_path, "w") as f:
+            json.dump(self.state, f, indent=2)
+
+    def _features(self, titles):
+        return self.vectorizer.transform(clean_texts(titles))
+
+    def partial_fit(self, df, batch_size=256, epochs=1):
+        """Feed labelled rows to the classifier in mini-batches"""
+        if self.model is None:
+            self.model = SGDClassifier(**SGD_PARAMS)
+
+        X = self._features(df["title"].tolist())
+        y = df["EcoLabel"].to_numpy()
+        rng = np.random.default_rng(self.state["samples_seen"])
+
+        for _ in range(epochs):
+            order = rng.permutation(len(y))
+            for start in range(0, len(y), batch_size):
+                idx = order[start:start + batch_size]
+                self.model.partial_fit(X[idx], y[idx], classes=CLASSES)
+
+        self.state["samples_seen"] += len(y)
+
+    def evaluate(self):
+        """Accuracy on the held-out set (and the classification report)"""
+        X = self._features(self.heldout["title"].tolist())
+        y_true = self.heldout["EcoLabel"].to_numpy()
+        y_pred = self.model.predict(X)
+        return accuracy_score(y_true, y_pred), classification_report(y_true, y_pred, zero_division=0)
+
+
+def _batch_id(df):
+    return hashlib.sha256(pd.util.hash_pandas_object(df[["title", "EcoLabel"]], index=False).values.tobytes()).hexdigest()[:16]
+
+
+def _read_labelled(path):
+    df = pd.read_csv(path)
+    missing = {"title", "EcoLabel"} - set(df.columns)
+    if missing:
+        raise ValueError(f"{path} is missing columns: {', '.join(sorted(missing))}")
+    return df.dropna(subset=["title", "EcoLabel"]).astype({"EcoLabel": int})
+
+
+def cmd_init(args):
+    df = _read_labelled(args.data)
+    train, heldout = train_test_split(df, test_size=args.holdout, random_state=42, stratify=df["EcoLabel"])
+
+    trainer = IncrementalTrainer(args.state_dir)
+    trainer.heldout = heldout[["title", "EcoLabel"]]
+    started = time.perf_counter()
+    trainer.partial_fit(train, batch_size=args.batch_size, epochs=args.epochs)
+    trainer.state["batches"].append({"id": _batch_id(df), "source": args.data, "rows": len(train), "at": time.time()})
+    trainer.save()
+
+    accuracy, report = trainer.evaluate()
+    print(f"🌱 Bootstrapped on {len(train)} rows in {time.perf_counter() - started:.2f}s")
+    print(f"✅ Held-out accuracy: {accuracy:.4f} ({len(heldout)} rows)")
+    print(report)
+
+
+def cmd_ingest(args):
+    trainer = IncrementalTrainer(args.state_dir).load()
+    delta = _read_labelled(args.delta)
+
+    batch_id = _batch_id(delta)
+    if not args.force and any(b["id"] == batch_id for b in trainer.state["batches"]):
+        print(f"⏭️  {args.delta} was already ingested (batch {batch_id}); use --force to train on it again")
+        return
+
+    # Grow the held-out set with a slice of every delta so evaluation tracks new data
+    train = delta
+    if args.holdout > 0 and len(delta) >= 10:
+        train, heldout = train_test_split(delta, test_size=args.holdout, random_state=42)
+        trainer.heldout = pd.concat([trainer.heldout, heldout[["title", "EcoLabel"]]], ignore_index=True)
+
+    before, _ = trainer.evaluate()
+    started = time.perf_counter()
+    trainer.partial_fit(train, batch_size=args.batch_size, epochs=args.epochs)
+    after, report = trainer.evaluate()
+
+    trainer.state["batches"].append({"id": batch_id, "source": args.delta, "rows": len(train), "at": time.time()})
+    trainer.save()
+
+    print(f"📥 Ingested {len(train)} rows in {time.perf_counter() - started:.2f}s")
+    print(f"✅ Held-out accuracy: {before:.4f} -> {after:.4f}")
+    print(report)
+
+
+def cmd_evaluate(args):
+    trainer = IncrementalTrainer(args.state_dir).load()
+    accuracy, report = trainer.evaluate()
+    print(f"✅ Held-out accuracy: {accuracy:.4f} ({len(trainer.heldout)} rows, {trainer.state['samples_seen']} samples seen)")
+    print(report)
+
+
+def cmd_publish(args):
+    trainer = IncrementalTrainer(args.state_dir).load()
+    accuracy, _ = trainer.evaluate()
+    if accuracy < args.min_accuracy:
+        print(f"❌ Held-out accuracy {accuracy:.4f} is below --min-accuracy {args.min_accuracy}; not publishing")
+        raise SystemExit(1)
+
+    metadata = {
+        "trainer": "incremental",
+        "heldout_accuracy": accuracy,
+        "samples_seen": trainer.state["samples_seen"],
+    }
+    version = publish_artifacts(trainer.model, trainer.vectorizer, args.output_dir, metadata=metadata,
+                                preprocessing=trainer.state.get("preprocessing"))
+    trainer.state["published_version"] = version
+    trainer.save()
+    print(f"🚀 Published version {version} (held-out accuracy {accuracy:.4f})")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Incremental training for the eco-label classifier")
+    parser.add_argument("--state-dir", default=STATE_DIR, help="where the online model and held-out set live")
+    sub = parser.add_subparsers(dest="command", required=True)
+
+    init = sub.add_parser("init", help="bootstrap the online model from a labelled CSV")
+    init.add_argument("--data", default=DATA_PATH)
+    init.add_argument("--holdout", type=float, default=0.2, help="fraction kept for evaluation")
+    init.add_argument("--batch-size", type=int, default=256)
+    init.add_argument("--epochs", type=int, default=5)
+    init.set_defaults(func=cmd_init)
+
+    ingest = sub.add_parser("ingest", help="learn from a CSV of new labelled rows")
+    ingest.add_argument("delta")
+    ingest.add_argument("--holdout", type=float, default=0.1, help="fraction of the delta added to the held-out set")
+    ingest.add_argument("--batch-size", type=int, default=256)
+    ingest.add_argument("--epochs", type=int, default=1)
+    ingest.add_argument("--force", action="store_true", help="ingest even if this exact delta was seen")
+    ingest.set_defaults(func=cmd_ingest)
+
+    evaluate = sub.add_parser("evaluate", help="report held-out accuracy")
+    evaluate.set_defaults(func=cmd_evaluate)
+
+    publish = sub.add_parser("publish", help="publish the online model for serving")
+    publish.add_argument("--min-accuracy", type=float, default=0.0)
+    publish.add_argument("--output-dir", default=".", help="ml_models directory read by the backend")
+    publish.set_defaults(func=cmd_publish)
+
+    args = parser.parse_args()
+    args.func(args)
+
+
+if __name__ == "__main__":
+    main()
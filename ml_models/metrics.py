@@ -0,0 +1,376 @@
+"""
+Prometheus metrics for the backend and the AI assistant, without extra
+dependencies.
+
+Counters, gauges and histograms live in the process-wide REGISTRY and are
+rendered in the Prometheus text format (GET /api/metrics on both services).
+Collectors added with REGISTRY.add_collector() report values owned by other
+objects (cache counters, model version) at scrape time.
+
+    with timed("vectorize"):            # ecomarket_stage_duration_seconds{stage="vectorize"}
+        X = vectorizer.transform(titles)
+
+Several worker processes (gunicorn): set METRICS_DIR to a directory shared by
+the workers. Every process writes a snapshot of its samples there (every
+METRICS_FLUSH_INTERVAL seconds, and when it serves a scrape), and a
+scrape returns the counters and histograms summed over all snapshots; gauges
+only come from processes that are still alive.
+"""
+import os
+import json
+import time
+import uuid
+import bisect
+import threading
+from contextlib import contextmanager
+
+PREFIX = "ecomarket_"
+
+# Seconds; covers sub-millisecond inference up to slow LLM calls
+DEFAULT_BUCKETS = (0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+
+METRICS_DIR = os.getenv("METRICS_DIR") or None
+FLUSH_INTERVAL = float(os.getenv("METRICS_FLUSH_INTERVAL", "5"))
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+
+def _escape(value):
+    return str(value).replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _format_value(value):
+    if value == float("inf"):
+        return "+Inf"
+    if float(value).is_integer():
+        return str(int(value))
+    return repr(float(value))
+
+
+class _Metric:
+    kind = None
+
+    def __init__(self, name, help_text, labelnames=()):
+        self.name = name
+        self.help = help_text
+        self.labelnames = tuple(labelnames)
+        self._values = {}
+        self._lock = threading.Lock()
+
+    def _key(self, labels):
+        if set(labels) != set(self.labelnames):
+            raise ValueError(f"{self.name} expects labels {self.labelnames}, got {tuple(labels)}")
+        return tuple(str(labels[name]) for name in self.labelnames)
+
+    def reset(self):
+        with self._lock:
+            self._values = {}
+
+    def samples(self):
+        """[(sample name, labels dict, value)]"""
+        with self._lock:
+            values = dict(self._values)
+        return [(self.name, dict(zip(self.labelnames, key)), value) for key, value in values.items()]
+
+
+class Counter(_Metric):
+    kind = "counter"
+
+    def inc(self, amount=1, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+
+class Gauge(_Metric):
+    kind = "gauge"
+
+    def set(self, value, **labels):
+        key = self._key(labels)
+        with self._lock:
+            self._values[key] = value
+
+
+class Histogram(_Metric):
+    kind = "histogram"
+
+    def __init__(self, name, help_text, labelnames=(), buckets=DEFAULT_BUCKETS):
+        super().__init__(name, help_text, labelnames)
+        self.buckets = tuple(sorted(buckets))
+
+    def observe(self, value, **labels):
+        key = self._key(labels)
+        slot = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            state = self._values.get(key)
+            if state is None:
+                # Per-bucket counts (last one is +Inf), sum, count
+                state = self._values[key] = [[0] * (len(self.buckets) + 1), 0.0, 0]
+            state[0][slot] += 1
+            state[1] += value
+            state[2] += 1
+
+    @contextmanager
+    def time(self, **labels):
+        started = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - started, **labels)
+
+    def samples(self):
+        with self._lock:
+            values = {key: (list(state[0]), state[1], state[2]) for key, state in self._values.items()}
+        samples = []
+        for key, (counts, total, count) in values.items():
+            labels = dict(zip(self.labelnames, key))
+            cumulative = 0
+            for bound, bucket_count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += bucket_count
+                samples.append((f"{self.name}_bucket", dict(labels, le=_format_value(bound)), cumulative))
+            samples.append((f"{self.name}_sum", labels, total))
+            samples.append((f"{self.name}_count", labels, count))
+        return samples
+
+
+class Registry:
+    """All metrics of this process, plus collectors evaluated at scrape time"""
+
+    def __init__(self, directory=METRICS_DIR, flush_interval=FLUSH_INTERVAL):
+        self.directory = directory
+        self.flush_interval = flush_interval
+        self._metrics = {}
+        self._collectors = []
+        self._lock = threading.Lock()
+        self._flusher_pid = None
+
+    def _get_or_create(self, cls, name, help_text, labelnames, **kwargs):
+        name = PREFIX + name
+        with self._lock:
+            metric = self._metrics.get(name)
+            if metric is None:
+                metric = self._metrics[name] = cls(name, help_text, labelnames, **kwargs)
+            elif not isinstance(metric, cls):
+                raise ValueError(f"{name} is already registered as a {metric.kind}")
+            return metric
+
+    def counter(self, name, help_text, labelnames=()):
+        return self._get_or_create(Counter, name, help_text, labelnames)
+
+    def gauge(self, name, help_text, labelnames=()):
+        return self._get_or_create(Gauge, name, help_text, labelnames)
+
+    def histogram(self, name, help_text, labelnames=(), buckets=DEFAULT_BUCKETS):
+        return self._get_or_create(Histogram, name, help_text, labelnames, buckets=buckets)
+
+    def add_collector(self, collector):
+        """
+        `collector()` returns [(name, kind, help, [(labels dict, value), ...])]
+        with kind "counter" or "gauge"; called on every scrape.
+        """
+        if collector not in self._collectors:
+            self._collectors.append(collector)
+
+    def reset(self):
+        """Forget every value (a forked worker must not report its master's)"""
+        for metric in list(self._metrics.values()):
+            metric.reset()
+
+    def collect(self):
+        """{family name: {"kind", "help", "samples": [[sample name, labels, value], ...]}}"""
+        families = {}
+        for metric in list(self._metrics.values()):
+            families[metric.name] = {
+                "kind": metric.kind,
+                "help": metric.help,
+                "samples": [list(sample) for sample in metric.samples()],
+            }
+        for collector in self._collectors:
+            try:
+                collected = collector()
+            except Exception:
+                continue
+            for name, kind, help_text, samples in collected:
+                name = PREFIX + name
+                family = families.setdefault(name, {"kind": kind, "help": help_text, "samples": []})
+                family["samples"].extend([name, labels, value] for labels, value in samples)
+        return families
+
+    # ------------------------
+    # Multi-process snapshots (METRICS_DIR)
+    # ------------------------
+    def _snapshot_path(self, pid=None):
+        return os.path.join(self.directory, f"metrics-{pid or os.getpid()}.json")
+
+    def flush(self):
+        """Write this process's snapshot to METRICS_DIR (atomically)"""
+        if not self.directory:
+            return
+        os.makedirs(self.directory, exist_ok=True)
+        path = self._snapshot_path()
+        tmp_path = f"{path}.tmp-{uuid.uuid4().hex[:6]}"
+        with open(tmp_path, "w") as f:
+            json.dump(self.collect(), f)
+        os.replace(tmp_path, path)
+
+    def start_flusher(self):
+        """
+        Flush every flush interval from a daemon thread of this process. Started
+        lazily by the first request, so forked workers each get their own.
+        """
+        if not self.directory or self._flusher_pid == os.getpid():
+            return
+        with self._lock:
+            if self._flusher_pid == os.getpid():
+                return
+            self._flusher_pid = os.getpid()
+
+        def flush_forever():
+            while True:
+                time.sleep(self.flush_interval)
+                try:
+                    self.flush()
+                except OSError:
+                    pass
+
+        threading.Thread(target=flush_forever, name="metrics-flusher", daemon=True).start()
+
+    def _merged(self):
+        self.flush()
+        merged = {}
+        for entry in os.scandir(self.directory):
+            if not (entry.name.startswith("metrics-") and entry.name.endswith(".json")):
+                continue
+            try:
+                pid = int(entry.name[len("metrics-"):-len(".json")])
+                with open(entry.path, "r") as f:
+                    families = json.load(f)
+            except (ValueError, OSError):
+                continue
+            alive = _is_alive(pid)
+
+            for name, family in families.items():
+                if family["kind"] == "gauge" and not alive:
+                    continue
+                target = merged.setdefault(name, {"kind": family["kind"], "help": family["help"], "values": {}})
+                for sample_name, labels, value in family["samples"]:
+                    key = (sample_name, tuple(sorted(labels.items())))
+                    if family["kind"] == "gauge":
+                        target["values"][key] = max(target["values"].get(key, value), value)
+                    else:
+                        target["values"][key] = target["values"].get(key, 0) + value
+
+        return {
+            name: {
+                "kind": family["kind"],
+                "help": family["help"],
+                "samples": [[sample_name, dict(labels), value] for (sample_name, labels), value in family["values"].items()],
+            }
+            for name, family in merged.items()
+        }
+
+    def render(self):
+        """Prometheus text exposition of every metric"""
+        families = self._merged() if self.directory else self.collect()
+        lines = []
+        for name in sorted(families):
+            family = families[name]
+            lines.append(f"# HELP {name} {family['help']}")
+            lines.append(f"# TYPE {name} {family['kind']}")
+            for sample_name, labels, value in family["samples"]:
+                if labels:
+                    label_text = ",".join(f"{k}=\"{_escape(v)}\"" for k, v in labels.items())
+                    lines.append(f"{sample_name}{{{label_text}}} {_format_value(value)}")
+                else:
+                    lines.append(f"{sample_name} {_format_value(value)}")
+        return "\n".join(lines) + "\n"
+
+
+def _is_alive(pid):
+    if pid == os.getpid():
+        return True
+    try:
+        os.kill(pid, 0)
+    except ProcessLookupError:
+        return False
+    except PermissionError:
+        return True
+    return True
+
+
+def clear_directory(directory=METRICS_DIR):
+    """Remove old snapshots (call once when the server starts)"""
+    if not directory or not os.path.isdir(directory):
+        return
+    for entry in os.scandir(directory):
+        if entry.name.startswith("metrics-"):
+            try:
+                os.remove(entry.path)
+            except OSError:
+                pass
+
+
+REGISTRY = Registry()
+os.register_at_fork(after_in_child=REGISTRY.reset)
+
+REQUESTS = REGISTRY.counter(
+    "http_requests_total", "HTTP requests by route, method and status", ("method", "endpoint", "status"))
+REQUEST_SECONDS = REGISTRY.histogram(
+    "http_request_duration_seconds", "Time to produce the response (headers for streams)", ("method", "endpoint"))
+STAGE_SECONDS = REGISTRY.histogram(
+    "stage_duration_seconds", "Time spent in one step of a request", ("stage",))
+
+
+def timed(stage):
+    """Context manager timing a hot-path step into stage_duration_seconds"""
+    return STAGE_SECONDS.time(stage=stage)
+
+
+def observe_request(method, endpoint, status, seconds):
+    REQUESTS.inc(method=method, endpoint=endpoint, status=status)
+    REQUEST_SECONDS.observe(seconds, method=method, endpoint=endpoint)
+    REGISTRY.start_flusher()
+
+
+def cache_samples(cache, stats):
+    """Collector entries for a cache's stats() dict (hits, misses, entries)"""
+    labels = {"cache": cache}
+    return [
+        ("cache_hits_total", "counter", "Cache lookups answered from the cache", [(labels, stats.get("hits", 0))]),
+        ("cache_misses_total", "counter", "Cache lookups that had to compute", [(labels, stats.get("misses", 0))]),
+        ("cache_entries", "gauge", "Entries currently cached", [(labels, stats.get("entries", 0))]),
+    ]
+
+
+def instrument_flask(app, path="/api/metrics", registry=REGISTRY):
+    """
+    Count and time every request of a Flask app, time JSON serialization,
+    and serve the metrics at `path`.
+    """
+    from flask import Response, g, request
+    from flask.json.provider import DefaultJSONProvider
+
+    class TimedJSONProvider(DefaultJSONProvider):
+        def dumps(self, obj, **kwargs):
+            with timed("json_serialize"):
+                return super().dumps(obj, **kwargs)
+
+    app.json = TimedJSONProvider(app)
+
+    @app.before_request
+    def _start_timer():
+        g.metrics_started = time.perf_counter()
+
+    @app.after_request
+    def _record_request(response):
+        started = g.pop("metrics_started", None)
+        if started is not None:
+            endpoint = request.url_rule.rule if request.url_rule is not None else "unmatched"
+            observe_request(request.method, endpoint, response.status_code, time.perf_counter() - started)
+        return response
+
+    def metrics():
+        return Response(registry.render(), mimetype=None, content_type=CONTENT_TYPE)
+
+    app.add_url_rule(path, "metrics", metrics, methods=["GET"])
+    return app
@@ -1,12 +1,29 @@
+import os
 import joblib
+from text_preprocessing import check_preprocessing, clean_text
+from artifact_store import read_manifest
+from eco_inference import EcoInferenceEngine
 
 class EcoClassifier:
     def __init__(self):
         self.model = joblib.load("eco_model.pkl")
         self.vectorizer = joblib.load("vectorizer.pkl")
 
+        # sklearn-free scoring when the published manifest has a compact export
+        manifest = read_manifest(".") or {}
+        check_preprocessing(manifest.get("preprocessing"))
+        compact = manifest.get("compact")
+        self.engine = EcoInferenceEngine.load(compact) if compact and os.path.isdir(compact) else None
+
     def predict(self, title):
-        X = self.vectorizer.transform([title])
+        if self.engine is not None:
+            label, confidence = self.engine.predict_one(title)
+            return {
+                "eco_friendly": int(label),
+                "confidence": float(confidence)
+            }
+
+        X = self.vectorizer.transform([clean_text(title)])
         y_pred = self.model.predict(X)[0]
         y_prob = self.model.predict_proba(X)[0].max()  # confidence
         return {
@@ -0,0 +1,316 @@
+"""
+Opt-in request profiling for the Flask apps (backend and AI assistant).
+
+Two independent triggers, both off by default:
+
+    PROFILE_SAMPLE_RATE=0.01   cProfile 1% of requests -> <dir>/*.prof (pstats)
+    PROFILE_SLOW_MS=500        sample the stacks of every request and keep those
+                               taking longer than 500 ms -> <dir>/*.collapsed
+
+A slow request is only known to be slow at the end, so the second trigger
+uses a background thread that records the stack of each running request
+every PROFILE_INTERVAL_MS (default 5) instead of a deterministic profiler;
+the output is one "frame;frame;frame count" line per stack, ready for
+flamegraph.pl or speedscope. With both triggers off a request costs a
+clock read and an attribute check.
+
+Files go to PROFILE_DIR (default: profiles/ in the working directory);
+only the newest PROFILE_MAX_FILES (default 200) are kept.
+
+    python -m pstats profiles/<file>.prof
+
+The settings can be changed at runtime through GET/POST
+/api/admin/profiling (see install_profiler). The endpoint only exists when
+ADMIN_TOKEN is set, and requests must carry it in an X-Admin-Token header.
+A POST writes <dir>/settings.json, which every worker process re-reads
+when its mtime changes (checked at most every PROFILE_SETTINGS_CHECK
+seconds, default 1); it overrides the PROFILE_* variables until removed.
+"""
+import os
+import re
+import sys
+import hmac
+import json
+import time
+import random
+import cProfile
+import threading
+from collections import Counter
+
+_FILENAME_RE = re.compile(r"[^A-Za-z0-9_.-]+")
+
+# Runtime settings shared by the worker processes, in the profile directory
+SETTINGS_FILE = "settings.json"
+SETTINGS_CHECK = float(os.getenv("PROFILE_SETTINGS_CHECK", "1"))
+
+
+class ProfilerSettings:
+    """Runtime-adjustable profiling settings, shared by the processes through SETTINGS_FILE"""
+
+    def __init__(self, sample_rate=0.0, slow_ms=0.0, interval_ms=5.0, directory="profiles", max_files=200,
+                 check_interval=SETTINGS_CHECK):
+        self.sample_rate = sample_rate
+        self.slow_ms = slow_ms
+        self.interval_ms = interval_ms
+        self.directory = directory
+        self.max_files = max_files
+        self.check_interval = check_interval
+        self.profiled = 0
+        self.slow_captured = 0
+        self._next_check = 0.0
+        self._file_mtime = None
+
+    @classmethod
+    def from_env(cls):
+        return cls(
+            sample_rate=float(os.getenv("PROFILE_SAMPLE_RATE", "0")),
+            slow_ms=float(os.getenv("PROFILE_SLOW_MS", "0")),
+            interval_ms=float(os.getenv("PROFILE_INTERVAL_MS", "5")),
+            directory=os.getenv("PROFILE_DIR", "profiles"),
+            max_files=int(os.getenv("PROFILE_MAX_FILES", "200")),
+        )
+
+    @property
+    def enabled(self):
+        return self.sample_rate > 0 or self.slow_ms > 0
+
+    def update(self, values):
+        """Apply a dict of new settings (sample_rate, slow_ms, interval_ms); raises ValueError"""
+        sample_rate = float(values.get("sample_rate", self.sample_rate))
+        slow_ms = float(values.get("slow_ms", self.slow_ms))
+        interval_ms = float(values.get("interval_ms", self.interval_ms))
+        if not 0 <= sample_rate <= 1:
+            raise ValueError("sample_rate must be between 0 and 1")
+        if slow_ms < 0 or interval_ms <= 0:
+            raise ValueError("slow_ms must be >= 0 and interval_ms > 0")
+        self.sample_rate, self.slow_ms, self.interval_ms = sample_rate, slow_ms, interval_ms
+
+    @property
+    def path(self):
+        return os.path.join(self.directory, SETTINGS_FILE)
+
+    def refresh(self, force=False):
+        """Apply SETTINGS_FILE if another process changed it (at most every check_interval seconds)"""
+        now = time.monotonic()
+        if not force and now < self._next_check:
+            return
+        self._next_check = now + self.check_interval
+        try:
+            mtime = os.stat(self.path).st_mtime_ns
+        except OSError:
+            return
+        if mtime == self._file_mtime:
+            return
+        try:
+            with open(self.path, "r") as f:
+                self.update(json.load(f))
+        except (OSError, TypeError, ValueError, AttributeError):
+            # Half-written or invalid: keep the current settings, retry on the next change
+            return
+        self._file_mtime = mtime
+
+    def save(self):
+        """Write the current settings to SETTINGS_FILE (atomically) for the other processes"""
+        os.makedirs(self.directory, exist_ok=True)
+        tmp_path = f"{self.path}.{os.getpid()}.tmp"
+        with open(tmp_path, "w") as f:
+            json.dump({"sample_rate": self.sample_rate, "slow_ms": self.slow_ms, "interval_ms": self.interval_ms}, f)
+        os.replace(tmp_path, self.path)
+        self._file_mtime = os.stat(self.path).st_mtime_ns
+
+    def to_dict(self):
+        return {
+            "sample_rate": self.sample_rate,
+            "slow_ms": self.slow_ms,
+            "interval_ms": self.interval_ms,
+            "directory": os.path.abspath(self.directory),
+            "max_files": self.max_files,
+            "profiled": self.profiled,
+            "slow_captured": self.slow_captured,
+        }
+
+
+class StackSampler:
+    """Background thread recording the stacks of registered threads"""
+
+    def __init__(self, settings):
+        self.settings = settings
+        self._active = {}
+        self._lock = threading.Lock()
+        self._thread_pid = None
+
+    def _ensure_thread(self):
+        # One sampler per process, started lazily (forked workers start their own)
+        if self._thread_pid == os.getpid():
+            return
+        with self._lock:
+            if self._thread_pid == os.getpid():
+                return
+            self._thread_pid = os.getpid()
+        threading.Thread(target=self._run, name="profiling-sampler", daemon=True).start()
+
+    def start(self, thread_id):
+        self._ensure_thread()
+        stacks = Counter()
+        with self._lock:
+            self._active[thread_id] = stacks
+        return stacks
+
+    def stop(self, thread_id):
+        with self._lock:
+            return self._active.pop(thread_id, None)
+
+    def _run(self):
+        while True:
+            time.sleep(self.settings.interval_ms / 1000.0)
+            if self.settings.slow_ms <= 0:
+                # Turned off at runtime; the next profiled request starts a new thread
+                with self._lock:
+                    self._thread_pid = None
+                    self._active.clear()
+                return
+            with self._lock:
+                active = dict(self._active)
+            if not active:
+                continue
+            frames = sys._current_frames()
+            collapsed = {thread_id: _collapse(frames[thread_id]) for thread_id in active if thread_id in frames}
+            with self._lock:
+                # Requests that ended meanwhile were popped by stop(): their counts are final
+                for thread_id, stack in collapsed.items():
+                    stacks = self._active.get(thread_id)
+                    if stacks is not None:
+                        stacks[stack] += 1
+
+
+def _collapse(frame):
+    names = []
+    while frame is not None:
+        code = frame.f_code
+        names.append(f"{code.co_name} ({os.path.basename(code.co_filename)})")
+        frame = frame.f_back
+    return ";".join(reversed(names))
+
+
+def _prune(directory, max_files):
+    entries = sorted(
+        (e for e in os.scandir(directory) if e.is_file() and e.name.endswith((".prof", ".collapsed"))),
+        key=lambda e: e.stat().st_mtime,
+    )
+    for entry in entries[:max(0, len(entries) - max_files)]:
+        try:
+            os.remove(entry.path)
+        except OSError:
+            pass
+
+
+def _output_path(settings, method, endpoint, elapsed_ms, extension):
+    os.makedirs(settings.directory, exist_ok=True)
+    name = _FILENAME_RE.sub("_", f"{method}{endpoint}").strip("_")
+    stamp = time.strftime("%Y%m%d-%H%M%S")
+    return os.path.join(settings.directory, f"{stamp}-{name}-{elapsed_ms:.0f}ms-{os.getpid()}-{threading.get_ident()}{extension}")
+
+
+class RequestProfiler:
+    """Starts and stops the profiling of one request according to the settings"""
+
+    def __init__(self, settings=None):
+        self.settings = settings or ProfilerSettings.from_env()
+        self.sampler = StackSampler(self.settings)
+        # cProfile is process-wide on newer Pythons: one profiled request at a time
+        self._cprofile_lock = threading.Lock()
+
+    def begin(self):
+        """Returns a token for end(), or None when this request is not profiled"""
+        settings = self.settings
+        settings.refresh()
+        if not settings.enabled:
+            return None
+
+        profiler = None
+        if settings.sample_rate > 0 and random.random() < settings.sample_rate:
+            if self._cprofile_lock.acquire(blocking=False):
+                profiler = cProfile.Profile()
+                profiler.enable()
+        stacks = self.sampler.start(threading.get_ident()) if settings.slow_ms > 0 else None
+        if profiler is None and stacks is None:
+            return None
+        return profiler, stacks, time.perf_counter()
+
+    def end(self, token, method, endpoint):
+        profiler, stacks, started = token
+        elapsed_ms = (time.perf_counter() - started) * 1000.0
+        # Stop both before writing anything, so the output is not profiled
+        if stacks is not None:
+            self.sampler.stop(threading.get_ident())
+        if profiler is not None:
+            profiler.disable()
+            self._cprofile_lock.release()
+
+        settings = self.settings
+        slow = stacks is not None and elapsed_ms >= settings.slow_ms and bool(stacks)
+        try:
+            if profiler is not None:
+                profiler.dump_stats(_output_path(settings, method, endpoint, elapsed_ms, ".prof"))
+                settings.profiled += 1
+            if slow:
+                with open(_output_path(settings, method, endpoint, elapsed_ms, ".collapsed"), "w") as f:
+                    for stack, count in stacks.most_common():
+                        f.write(f"{stack} {count}\n")
+                settings.slow_captured += 1
+            if profiler is not None or slow:
+                _prune(settings.directory, settings.max_files)
+        except OSError:
+            pass
+
+
+def _is_admin(request, token):
+    # Behind a proxy every request comes from localhost: only the token counts
+    return hmac.compare_digest(request.headers.get("X-Admin-Token", ""), token)
+
+
+def install_profiler(app, path="/api/admin/profiling", profiler=None):
+    """
+    Profile the requests of a Flask app according to PROFILE_* settings and
+    serve GET (current settings, this worker's counters) / POST (JSON with
+    sample_rate, slow_ms and/or interval_ms, applied by every worker through
+    SETTINGS_FILE) at `path`, answering 404 while ADMIN_TOKEN is unset.
+    """
+    from flask import g, jsonify, request
+
+    profiler = profiler or RequestProfiler()
+
+    @app.before_request
+    def _start_profiling():
+        if profiler.settings.enabled:
+            g.profile_token = profiler.begin()
+
+    @app.teardown_request
+    def _stop_profiling(exception=None):
+        # Runs even when the view raised (and after a streamed body is sent)
+        token = g.pop("profile_token", None)
+        if token is not None:
+            endpoint = request.url_rule.rule if request.url_rule is not None else "unmatched"
+            profiler.end(token, request.method, endpoint)
+
+    def profiling_settings():
+        token = os.getenv("ADMIN_TOKEN")
+        if not token:
+            return jsonify({"error": "Not found"}), 404
+        if not _is_admin(request, token):
+            return jsonify({"error": "Forbidden"}), 403
+        profiler.settings.refresh(force=True)
+        if request.method == "POST":
+            try:
+                profiler.settings.update(request.get_json(silent=True) or {})
+            except (TypeError, ValueError, AttributeError) as e:
+                return jsonify({"error": str(e)}), 400
+            try:
+                # Every worker applies it, not just the one answering
+                profiler.settings.save()
+            except OSError as e:
+                return jsonify({"error": f"Settings not shared with the other workers: {e}"}), 500
+        return jsonify(dict(profiler.settings.to_dict(), pid=os.getpid())), 200
+
+    app.add_url_rule(path, "profiling_settings", profiling_settings, methods=["GET", "POST"])
+    return profiler
@@ -0,0 +1,180 @@
+"""
+Title cleaning shared by training (train_model.py) and every prediction path
+(backend services, assistant, predict.py), so the model always sees text
+preprocessed the same way it was trained on.
+
+    clean_text("Organic Cotton T-Shirts")          -> "organic cotton tshirt"
+    clean_texts(titles, n_jobs=-1)                   -> list of cleaned titles
+
+The NLTK corpora are a deploy-time requirement, never downloaded while
+serving:
+
+    python text_preprocessing.py download            # stopwords, wordnet, omw-1.4
+
+Without them cleaning falls back to scikit-learn's stop words and no
+lemmatization, which is a different preprocessing. preprocessing_mode()
+describes the one in use; training records it with the artifacts and
+check_preprocessing() refuses a model trained with another one.
+"""
+import os
+import re
+import logging
+from functools import lru_cache
+from concurrent.futures import ProcessPoolExecutor
+
+logger = logging.getLogger(__name__)
+
+_NON_LETTERS_RE = re.compile(r"[^a-z\s]")
+
+# Below this many titles a process pool costs more than it saves
+PARALLEL_THRESHOLD = 5000
+
+# NLTK corpora used when installed: (resource path, package name)
+CORPORA = (
+    ("corpora/stopwords", "stopwords"),
+    ("corpora/wordnet", "wordnet"),
+    ("corpora/omw-1.4", "omw-1.4"),
+)
+
+# What the shipped model (and anything published without a recorded mode) was trained with
+DEFAULT_MODE = {"stopwords": "nltk", "lemmatizer": True}
+
+# ALLOW_PREPROCESSING_MISMATCH=1 logs a mismatch instead of refusing the model
+ALLOW_MISMATCH = os.getenv("ALLOW_PREPROCESSING_MISMATCH", "0") == "1"
+
+_stop_words = None
+_lemmatizer = None
+_mode = None
+
+
+class PreprocessingMismatch(RuntimeError):
+    """The model was trained with another preprocessing than this host provides"""
+
+
+def _has_corpus(resource):
+    """True if an NLTK corpus is installed (it is never downloaded here)"""
+    import nltk
+
+    try:
+        nltk.data.find(resource)
+        return True
+    except LookupError:
+        return False
+
+
+def download_corpora():
+    """Download the NLTK corpora (deploy time; needs network access)"""
+    import nltk
+
+    for resource, package in CORPORA:
+        if not _has_corpus(resource) and not nltk.download(package, quiet=True):
+            raise RuntimeError(f"Failed to download the NLTK corpus {package}")
+
+
+def _load_resources():
+    """Build the stopword frozenset and lemmatizer once per process"""
+    global _stop_words, _lemmatizer, _mode
+    if _stop_words is not None:
+        return
+
+    lemmatizer = None
+    source = "nltk"
+    try:
+        from nltk.corpus import stopwords
+        from nltk.stem import WordNetLemmatizer
+
+        if not _has_corpus("corpora/stopwords"):
+            raise LookupError("stopwords")
+        stop_words = frozenset(stopwords.words("english"))
+
+        if _has_corpus("corpora/wordnet"):
+            lemmatizer = WordNetLemmatizer()
+            lemmatizer.lemmatize("warmup")
+        else:
+            logger.warning("WordNet corpus not installed; titles will not be lemmatized "
+                           "(run `python text_preprocessing.py download` in ml_models/)")
+    except (ImportError, LookupError):
+        from sklearn.feature_extraction.text import ENGLISH_STOP_WORDS
+
+        logger.warning("NLTK stopwords not installed; falling back to scikit-learn's English stop words "
+                       "(run `python text_preprocessing.py download` in ml_models/)")
+        stop_words = frozenset(ENGLISH_STOP_WORDS)
+        source = "sklearn"
+
+    _lemmatizer = lemmatizer
+    _mode = {"stopwords": source, "lemmatizer": lemmatizer is not None}
+    _stop_words = stop_words
+
+
+def preprocessing_mode():
+    """{"stopwords": "nltk" | "sklearn", "lemmatizer": bool} of this process"""
+    _load_resources()
+    return dict(_mode)
+
+
+def check_preprocessing(expected, what="model"):
+    """
+    Raise PreprocessingMismatch if `expected` (the mode recorded at training
+    time; None means DEFAULT_MODE) differs from this host's preprocessing.
+    """
+    expected = dict(expected or DEFAULT_MODE)
+    actual = preprocessing_mode()
+    if expected == actual:
+        return
+    message = (f"The {what} was trained with preprocessing {expected} but this host provides {actual}; "
+               f"install the NLTK corpora (`python text_preprocessing.py download` in ml_models/)")
+    if ALLOW_MISMATCH:
+        logger.error(f"{message} (serving anyway: ALLOW_PREPROCESSING_MISMATCH=1)")
+        return
+    raise PreprocessingMismatch(message)
+
+
+@lru_cache(maxsize=200000)
+def lemmatize(word):
+    """Memoized WordNet lemma (titles reuse a small vocabulary)"""
+    if _lemmatizer is None:
+        return word
+    return _lemmatizer.lemmatize(word)
+
+
+def clean_text(text):
+    """Lowercase, keep only letters, drop stopwords and lemmatize"""
+    if text is None or text != text:  # None or NaN
+        return ""
+    _load_resources()
+    text = _NON_LETTERS_RE.sub("", str(text).lower())
+    stop_words = _stop_words
+    return " ".join([lemmatize(w) for w in text.split() if w not in stop_words])
+
+
+def _clean_chunk(texts):
+    return [clean_text(t) for t in texts]
+
+
+def clean_texts(texts, n_jobs=1, chunk_size=2000):
+    """
+    Clean a list of titles.
+    With n_jobs != 1 and more than PARALLEL_THRESHOLD titles, chunks are cleaned
+    in a process pool (n_jobs=-1 uses every CPU).
+    """
+    texts = list(texts)
+    if n_jobs == 1 or len(texts) <= PARALLEL_THRESHOLD:
+        return _clean_chunk(texts)
+
+    workers = (os.cpu_count() or 1) if n_jobs < 0 else n_jobs
+    chunks = [texts[i:i + chunk_size] for i in range(0, len(texts), chunk_size)]
+    cleaned = []
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        for part in executor.map(_clean_chunk, chunks):
+            cleaned.extend(part)
+    return cleaned
+
+
+if __name__ == "__main__":
+    import sys
+
+    if sys.argv[1:] != ["download"]:
+        print("Usage: python text_preprocessing.py download")
+        raise SystemExit(2)
+    download_corpora()
+    print(f"✅ NLTK corpora installed: {preprocessing_mode()}")
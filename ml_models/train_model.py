@@ -1,103 +1,241 @@
-import re
+import os
+import json
+import time
+import hashlib
+import argparse
+import numpy as np
 import pandas as pd
-import nltk
-from nltk.corpus import stopwords
-from nltk.stem import WordNetLemmatizer
-from sklearn.model_selection import train_test_split, GridSearchCV
+from sklearn.model_selection import train_test_split, GridSearchCV, RandomizedSearchCV, StratifiedKFold, ParameterGrid
 from sklearn.feature_extraction.text import TfidfVectorizer
 from sklearn.linear_model import LogisticRegression
 from sklearn.metrics import classification_report, accuracy_score
+from scipy.stats import loguniform
 import joblib
+from text_preprocessing import clean_texts, preprocessing_mode
+from artifact_store import publish_artifacts
 
-# ------------------------
-# Setup NLTK
-# ------------------------s
-nltk.download('stopwords')
-nltk.download('wordnet')
-nltk.download('omw-1.4')
-
-stop_words = set(stopwords.words('english'))
-lemmatizer = WordNetLemmatizer()
-
-# ------------------------
-# Custom Preprocessing
-# ------------------------
-def clean_text(text):
-    if pd.isna(text):
-        return ""
-    text = text.lower()                               # lowercase
-    text = re.sub(r'[^a-z\s]', '', text)              # keep only letters
-    words = text.split()
-    words = [lemmatizer.lemmatize(w) for w in words if w not in stop_words]  # remove stopwords + lemmatize
-    return " ".join(words)
+DATA_PATH = "finalwebsite_with_ecolabel.csv"
+CACHE_DIR = ".feature_cache"
 
-# ------------------------
-# Load dataset
-# ------------------------
-df = pd.read_csv("finalwebsite_with_ecolabel.csv")
-
-# Clean product titles
-df['title'] = df['title'].apply(clean_text)
-
-# Features (X) and Labels (y)
-X = df['title']
-y = df['EcoLabel']
-
-# ------------------------
-# Train-Test Split
-# ------------------------
-X_train, X_test, y_train, y_test = train_test_split(
-    X, y, test_size=0.2, random_state=42
-)
-
-# ------------------------
-# TF-IDF Vectorizer
-# ------------------------
-vectorizer = TfidfVectorizer(
-    stop_words="english",
-    max_features=15000,
-    ngram_range=(1, 3)
-)
-X_train_tfidf = vectorizer.fit_transform(X_train)
-X_test_tfidf = vectorizer.transform(X_test)
+VECTORIZER_PARAMS = {
+    "stop_words": "english",
+    "max_features": 15000,
+    "ngram_range": (1, 3),
+}
 
-# ------------------------
-# Hyperparameter Tuning with GridSearchCV
-# ------------------------
-param_grid = {
+PARAM_GRID = {
     "C": [0.5, 1.0, 2.0, 3.0, 5.0],
     "solver": ["liblinear", "saga"],
     "penalty": ["l1", "l2"],
     "class_weight": [None, "balanced"]
 }
 
-grid = GridSearchCV(
-    LogisticRegression(max_iter=2000),
-    param_grid,
-    cv=5,
-    scoring="accuracy",
-    n_jobs=-1,
-    verbose=2
-)
+# Randomized search samples C continuously over the grid's range
+PARAM_DISTRIBUTIONS = {
+    "C": loguniform(0.5, 5.0),
+    "solver": PARAM_GRID["solver"],
+    "penalty": PARAM_GRID["penalty"],
+    "class_weight": PARAM_GRID["class_weight"]
+}
 
-grid.fit(X_train_tfidf, y_train)
+# Solvers that can continue from the previous coefficients when C changes
+WARM_START_SOLVERS = {"saga", "sag", "lbfgs", "newton-cg", "newton-cholesky"}
+
+CV_FOLDS = 5
+TEST_SIZE = 0.2
+RANDOM_STATE = 42
 
-print("🔍 Best Parameters:", grid.best_params_)
-print("✅ Best CV Accuracy:", grid.best_score_)
 
 # ------------------------
-# Evaluate Best Model
+# Features (cached on disk)
 # ------------------------
-best_model = grid.best_estimator_
-y_pred = best_model.predict(X_test_tfidf)
+def _feature_cache_key(df):
+    """Hash of titles + labels + preprocessing mode + vectorizer/split parameters"""
+    digest = hashlib.sha256()
+    digest.update(pd.util.hash_pandas_object(df[["title", "EcoLabel"]], index=False).values.tobytes())
+    digest.update(json.dumps(
+        {"vectorizer": VECTORIZER_PARAMS, "test_size": TEST_SIZE, "random_state": RANDOM_STATE,
+         "preprocessing": preprocessing_mode()},
+        sort_keys=True, default=str
+    ).encode("utf-8"))
+    return digest.hexdigest()[:16]
+
+
+def build_features(df, cache_dir=CACHE_DIR):
+    """
+    Clean, split and vectorize the dataset.
+    The fitted vectorizer and TF-IDF matrices are cached under cache_dir, keyed
+    by data hash + preprocessing mode + vectorizer params, so reruns on
+    unchanged data (cleaned the same way) skip this step.
+    """
+    cache_path = None
+    if cache_dir:
+        os.makedirs(cache_dir, exist_ok=True)
+        cache_path = os.path.join(cache_dir, f"features_{_feature_cache_key(df)}.joblib")
+        if os.path.exists(cache_path):
+            print(f"📦 Using cached features: {cache_path}")
+            return joblib.load(cache_path)
+
+    # Clean product titles (same preprocessing as serving, in parallel)
+    X = clean_texts(df['title'].tolist(), n_jobs=-1)
+    y = df['EcoLabel']
+
+    # ------------------------
+    # Train-Test Split
+    # ------------------------
+    X_train, X_test, y_train, y_test = train_test_split(
+        X, y, test_size=TEST_SIZE, random_state=RANDOM_STATE
+    )
+
+    # ------------------------
+    # TF-IDF Vectorizer
+    # ------------------------
+    vectorizer = TfidfVectorizer(**VECTORIZER_PARAMS)
+    X_train_tfidf = vectorizer.fit_transform(X_train)
+    X_test_tfidf = vectorizer.transform(X_test)
+
+    features = (vectorizer, X_train_tfidf, X_test_tfidf, y_train.to_numpy(), y_test.to_numpy())
+    if cache_path:
+        joblib.dump(features, cache_path)
+        print(f"📦 Cached features: {cache_path}")
+    return features
 
-print("\nTest Accuracy:", accuracy_score(y_test, y_pred))
-print(classification_report(y_test, y_pred))
 
 # ------------------------
-# Save model + vectorizer separately
+# Hyperparameter search
 # ------------------------
-joblib.dump(best_model, "eco_model.pkl")     # Logistic Regression model
-joblib.dump(vectorizer, "vectorizer.pkl")    # TF-IDF Vectorizer
-
-print("🚀 Best model and vectorizer saved as eco_model.pkl and vectorizer.pkl")
\ No newline at end of file
+def run_sklearn_search(search, X_train, y_train, n_iter):
+    """GridSearchCV / HalvingGridSearchCV / RandomizedSearchCV; returns (best_model, rows)"""
+    common = dict(cv=CV_FOLDS, scoring="accuracy", n_jobs=-1, verbose=1)
+    estimator = LogisticRegression(max_iter=2000)
+
+    if search == "grid":
+        searcher = GridSearchCV(estimator, PARAM_GRID, **common)
+    elif search == "halving":
+        from sklearn.experimental import enable_halving_search_cv  # noqa: F401
+        from sklearn.model_selection import HalvingGridSearchCV
+
+        searcher = HalvingGridSearchCV(estimator, PARAM_GRID, factor=3, random_state=RANDOM_STATE, **common)
+    else:
+        searcher = RandomizedSearchCV(
+            estimator, PARAM_DISTRIBUTIONS, n_iter=n_iter, random_state=RANDOM_STATE, **common
+        )
+
+    searcher.fit(X_train, y_train)
+
+    results = searcher.cv_results_
+    rows = [
+        {
+            "params": params,
+            "score": results["mean_test_score"][i],
+            "seconds": (results["mean_fit_time"][i] + results["mean_score_time"][i]) * CV_FOLDS,
+        }
+        for i, params in enumerate(results["params"])
+    ]
+    print("🔍 Best Parameters:", searcher.best_params_)
+    print("✅ Best CV Accuracy:", searcher.best_score_)
+    return searcher.best_estimator_, rows
+
+
+def run_warm_start_search(X_train, y_train):
+    """
+    Same grid as GridSearchCV, but for every (solver, penalty, class_weight)
+    the C values are fitted in ascending order on each fold, each fit starting
+    from the previous coefficients (warm_start) when the solver supports it.
+    Returns (best_model, rows).
+    """
+    folds = list(StratifiedKFold(n_splits=CV_FOLDS, shuffle=True, random_state=RANDOM_STATE).split(X_train, y_train))
+    c_values = sorted(PARAM_GRID["C"])
+    path_grid = {k: v for k, v in PARAM_GRID.items() if k != "C"}
+
+    rows = []
+    for base_params in ParameterGrid(path_grid):
+        warm = base_params["solver"] in WARM_START_SOLVERS
+        scores = {c: [] for c in c_values}
+        seconds = {c: 0.0 for c in c_values}
+
+        for train_idx, valid_idx in folds:
+            model = LogisticRegression(max_iter=2000, warm_start=warm, **base_params)
+            for c in c_values:
+                model.set_params(C=c)
+                started = time.perf_counter()
+                try:
+                    model.fit(X_train[train_idx], y_train[train_idx])
+                    scores[c].append(accuracy_score(y_train[valid_idx], model.predict(X_train[valid_idx])))
+                except ValueError as e:
+                    # Unsupported solver/penalty combination (as error_score=nan in GridSearchCV)
+                    scores[c].append(np.nan)
+                    print(f"⚠️  Skipping {base_params} C={c}: {e}")
+                seconds[c] += time.perf_counter() - started
+
+        for c in c_values:
+            rows.append({"params": dict(base_params, C=c), "score": float(np.mean(scores[c])), "seconds": seconds[c]})
+
+    valid_rows = [r for r in rows if not np.isnan(r["score"])]
+    if not valid_rows:
+        raise RuntimeError("No parameter combination could be fitted")
+    best = max(valid_rows, key=lambda r: r["score"])
+    print("🔍 Best Parameters:", best["params"])
+    print("✅ Best CV Accuracy:", best["score"])
+
+    best_model = LogisticRegression(max_iter=2000, **best["params"]).fit(X_train, y_train)
+    return best_model, rows
+
+
+def report_timings(rows):
+    """Print wall time per candidate (summed over CV folds), best scores first"""
+    print("\n⏱️  Wall time per candidate:")
+    ordered = sorted(rows, key=lambda r: (np.nan_to_num(r["score"], nan=-1.0), -r["seconds"]), reverse=True)
+    for row in ordered:
+        print(f"  {row['score']:.4f}  {row['seconds']:8.2f}s  {row['params']}")
+    print(f"  total fit time: {sum(r['seconds'] for r in rows):.2f}s over {len(rows)} candidates")
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Train the eco-label classifier")
+    parser.add_argument("--search", choices=["grid", "halving", "random", "warm"], default="grid",
+                        help="hyperparameter search strategy (default: full grid)")
+    parser.add_argument("--n-iter", type=int, default=20, help="candidates sampled by --search random")
+    parser.add_argument("--data", default=DATA_PATH, help="labelled CSV with title and EcoLabel columns")
+    parser.add_argument("--cache-dir", default=CACHE_DIR, help="feature cache directory ('' disables)")
+    args = parser.parse_args()
+
+    # ------------------------
+    # Load dataset
+    # ------------------------
+    df = pd.read_csv(args.data)
+
+    started = time.perf_counter()
+    vectorizer, X_train_tfidf, X_test_tfidf, y_train, y_test = build_features(df, args.cache_dir)
+    print(f"🧮 Features ready in {time.perf_counter() - started:.2f}s")
+
+    started = time.perf_counter()
+    if args.search == "warm":
+        best_model, rows = run_warm_start_search(X_train_tfidf, y_train)
+    else:
+        best_model, rows = run_sklearn_search(args.search, X_train_tfidf, y_train, args.n_iter)
+    print(f"⏱️  Search ({args.search}) took {time.perf_counter() - started:.2f}s")
+    report_timings(rows)
+
+    # ------------------------
+    # Evaluate Best Model
+    # ------------------------
+    y_pred = best_model.predict(X_test_tfidf)
+
+    print("\nTest Accuracy:", accuracy_score(y_test, y_pred))
+    print(classification_report(y_test, y_pred))
+
+    # ------------------------
+    # Publish model + vectorizer (atomically, picked up by the backend)
+    # ------------------------
+    version = publish_artifacts(best_model, vectorizer, metadata={
+        "trainer": "train_model",
+        "search": args.search,
+        "test_accuracy": accuracy_score(y_test, y_pred),
+    })
+
+    print(f"🚀 Best model and vectorizer published as version {version} (eco_model.pkl, vectorizer.pkl)")
+
+
+if __name__ == "__main__":
+    main()
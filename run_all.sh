@@ -0,0 +1,95 @@
+#!/usr/bin/env bash
+# Start ecoMarket on Linux/macOS (production servers; run_all.bat is the Windows dev launcher).
+#
+#   ./run_all.sh            start backend, assistant and frontend
+#   ./run_all.sh reload     graceful restart of the backend and assistant on new code
+#   ./run_all.sh stop       stop the backend and assistant
+#
+# Worker counts and the rest come from the environment, see backend/gunicorn.conf.py
+# and assistant_service/gunicorn.conf.py (e.g. ASSISTANT_SERVER=asgi).
+# The NLTK corpora must be installed first: python ml_models/text_preprocessing.py download
+set -euo pipefail
+
+ROOT="$(cd "$(dirname "${BASH_SOURCE[0]}")" && pwd)"
+RUN_DIR="${RUN_DIR:-$ROOT/.run}"
+mkdir -p "$RUN_DIR"
+
+signal_all() {
+    for service in backend assistant; do
+        pidfile="$RUN_DIR/$service.pid"
+        if [ -f "$pidfile" ] && kill -0 "$(cat "$pidfile")" 2>/dev/null; then
+            kill "-$1" "$(cat "$pidfile")"
+            echo "Sent $1 to $service ($(cat "$pidfile"))"
+        else
+            echo "$service is not running"
+        fi
+    done
+}
+
+# The masters preload the app, so HUP would re-fork the code already loaded.
+# USR2 starts a new master (new code) next to the old one on the same socket;
+# once it is up, the old master is stopped gracefully.
+reload_all() {
+    for service in backend assistant; do
+        pidfile="$RUN_DIR/$service.pid"
+        if ! { [ -f "$pidfile" ] && kill -0 "$(cat "$pidfile")" 2>/dev/null; }; then
+            echo "$service is not running"
+            continue
+        fi
+        old="$(cat "$pidfile")"
+        rm -f "$pidfile.2"
+        kill -USR2 "$old"
+        # The new master writes $pidfile.2 once started (and renames it when the old one is gone)
+        for _ in $(seq 120); do
+            [ -s "$pidfile.2" ] && break
+            sleep 0.5
+        done
+        if [ -s "$pidfile.2" ]; then
+            kill -TERM "$old"
+            echo "Reloaded $service ($old -> $(cat "$pidfile.2"))"
+        else
+            echo "$service: the new master did not start, keeping $old (see $RUN_DIR/$service.log)" >&2
+        fi
+    done
+}
+
+case "${1:-start}" in
+    reload)
+        reload_all
+        exit 0
+        ;;
+    stop)
+        signal_all TERM
+        exit 0
+        ;;
+    start)
+        ;;
+    *)
+        echo "Usage: $0 [start|reload|stop]" >&2
+        exit 1
+        ;;
+esac
+
+echo "Starting ecoMarket Application..."
+
+echo
+echo "Starting Backend (Port 5001)..."
+(cd "$ROOT/backend" && GUNICORN_PIDFILE="$RUN_DIR/backend.pid" \
+    gunicorn -c gunicorn.conf.py --daemon --error-logfile "$RUN_DIR/backend.log" \
+    --access-logfile "$RUN_DIR/backend.access.log")
+
+echo
+echo "Starting Assistant Service (Port 5002)..."
+(cd "$ROOT/assistant_service" && GUNICORN_PIDFILE="$RUN_DIR/assistant.pid" \
+    gunicorn -c gunicorn.conf.py --daemon --error-logfile "$RUN_DIR/assistant.log" \
+    --access-logfile "$RUN_DIR/assistant.access.log")
+
+echo
+echo "All services are starting (logs in $RUN_DIR)..."
+echo "Backend: http://localhost:5001"
+echo "Assistant: http://localhost:5002"
+echo "Frontend: http://localhost:5173"
+echo
+
+echo "Starting Frontend (Port 5173)..."
+cd "$ROOT/frontend" && exec npm run dev